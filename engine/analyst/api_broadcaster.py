@@ -1,11 +1,11 @@
 """
 API Broadcaster — Posts curated picks to the production @EasyPolyBot via its /broadcast endpoint.
 """
-import requests
 from datetime import datetime, timezone
 
 from config import EASYPOLY_BOT_URL, EASYPOLY_BOT_API_SECRET
-from db.queries import MarketQueries
+from core.market_cache import market_cache
+from utils.http import transport
 from utils.logger import log
 
 
@@ -22,7 +22,7 @@ class ApiBroadcaster:
         sent = 0
         for pick in picks:
             try:
-                market = MarketQueries.get_market_by_id(pick["market_id"])
+                market = market_cache.get(pick["market_id"])
                 question = market.get("question", pick["market_id"]) if market else pick["market_id"]
 
                 payload = {
@@ -38,7 +38,7 @@ class ApiBroadcaster:
                     }]
                 }
 
-                response = requests.post(
+                response = await transport.post(
                     f"{self.base_url}/broadcast",
                     json=payload,
                     headers={"x-api-key": self.api_secret, "Content-Type": "application/json"},
@@ -10,39 +10,22 @@ import anthropic
 from datetime import datetime, timezone
 
 from config import ANTHROPIC_API_KEY, PERPLEXITY_API_KEY, CONVICTION_CONFIG, PERPLEXITY_CONFIG
-from db.queries import OpportunityQueries, PickQueries, MarketQueries, AuditLog
+from core.category_map import LANDING_CATEGORIES, category_map, gamma_category
+from core.market_cache import market_cache
+from core.signal_engine import signal_engine
+from db.queries import OpportunityQueries, PickQueries, AuditLog
+from utils.http import transport
 from utils.logger import log
 from utils.rate_limiter import rate_limiter
 
 # ── Category normalizer ──────────────────────────────────────
-# Maps Gamma API categories to landing-site tab categories
-_CATEGORY_MAP = {
-    "crypto": "crypto", "nfts": "crypto", "defi": "crypto",
-    "bitcoin": "crypto", "ethereum": "crypto",
-    "politics": "politics", "global politics": "politics",
-    "us politics": "politics", "elections": "politics",
-    "sports": "sports", "nba": "sports", "nba playoffs": "sports",
-    "nfl": "sports", "mlb": "sports", "soccer": "sports",
-    "mls": "sports", "nhl": "sports", "tennis": "sports",
-    "chess": "sports", "esports": "sports", "olympics": "sports",
-    "formula 1": "sports", "boxing": "sports", "mma": "sports",
-    "golf": "sports", "cricket": "sports",
-    "culture": "culture", "entertainment": "culture", "art": "culture",
-    "music": "culture", "movies": "culture", "tv": "culture",
-    "social media": "culture", "celebrity": "culture",
-    "finance": "finance", "business": "finance", "economics": "finance",
-    "stocks": "finance", "fed": "finance", "markets": "finance",
-    "coronavirus": "culture",  # legacy Polymarket category
-    "coronavirus-": "culture",
-}
-
-
-def normalize_category(raw: str | None) -> str:
-    """Normalize Gamma API category to landing-site category."""
-    if not raw:
-        return "culture"  # default fallback
-    key = raw.strip().lower()
-    return _CATEGORY_MAP.get(key, "culture")
+def normalize_category(raw: str | None, market_id: str | None = None) -> str:
+    """Landing-site category: the Gamma category, then the shared category map, else "culture"."""
+    mapped = gamma_category(raw)
+    if mapped:
+        return mapped
+    known = category_map.for_market(market_id) if market_id else None
+    return known if known in LANDING_CATEGORIES else "culture"  # default fallback
 
 
 class ConvictionEngine:
@@ -73,7 +56,7 @@ class ConvictionEngine:
                 continue
 
             # Skip boring extreme-odds markets (99¢ NO / 1¢ YES)
-            market = MarketQueries.get_market_by_id(opp["market_id"])
+            market = market_cache.get(opp["market_id"])
             if market:
                 yes_price = market.get("yes_price", 0.5)
                 if yes_price > 0.92 or yes_price < 0.08:
@@ -90,6 +73,7 @@ class ConvictionEngine:
                         if pick:
                             picks.append(pick)
                             recent_market_ids.add(opp["market_id"])
+                            signal_engine.record_pick(opp.get("signal_type"))
                             log("info",
                                 f"NEW PICK: {opp['market_id'][:50]} — {result['direction']} @ {result['entry_price']*100:.1f}¢ — score={result['conviction_score']}",
                                 source="conviction_engine")
@@ -103,7 +87,7 @@ class ConvictionEngine:
 
     def _analyze_opportunity(self, opp: dict) -> dict | None:
         """Use Claude to analyze a single opportunity."""
-        market = MarketQueries.get_market_by_id(opp["market_id"])
+        market = market_cache.get(opp["market_id"])
         if not market:
             return None
 
@@ -175,9 +159,8 @@ Respond with ONLY valid JSON (no markdown, no explanation):
         if not PERPLEXITY_API_KEY:
             return ""
         try:
-            import requests
             rate_limiter.wait("perplexity")
-            response = requests.post(
+            response = transport.sync_client().post(
                 "https://api.perplexity.ai/chat/completions",
                 headers={
                     "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
@@ -207,7 +190,7 @@ Respond with ONLY valid JSON (no markdown, no explanation):
         correctly (question, category, slug, token_id, composite_score, tier).
         """
         # Fetch market data for enrichment
-        market = MarketQueries.get_market_by_id(opp["market_id"])
+        market = market_cache.get(opp["market_id"])
 
         # Determine token_id based on direction
         token_id = None
@@ -284,7 +267,7 @@ Respond with ONLY valid JSON (no markdown, no explanation):
             "status": "active",
             # ── Landing-site compatibility fields (NEW) ───────
             "question": market.get("question") if market else None,
-            "category": normalize_category(market.get("category")) if market else None,
+            "category": normalize_category(market.get("category"), opp["market_id"]) if market else None,
             "slug": opp["market_id"],
             "token_id": token_id,
             "composite_score": composite,
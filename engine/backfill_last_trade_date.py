@@ -5,21 +5,24 @@ Fetches latest trade timestamp from Polymarket API and updates DB.
 Deactivates traders with no trade in 30+ days.
 """
 import asyncio
-import httpx
 from datetime import datetime, timezone
+from config import DATA_API
 from db.client import get_supabase
+from utils.http import transport
+from utils.rate_limiter import Priority
 
-DATA_API = "https://data-api.polymarket.com"
 MIN_DAYS_SINCE_LAST_TRADE = 30
 
 
-async def get_latest_trade_date(client: httpx.AsyncClient, wallet: str) -> datetime | None:
+async def get_latest_trade_date(wallet: str) -> datetime | None:
     """Fetch the most recent trade timestamp for a wallet."""
     try:
-        resp = await client.get(
+        # Not get_cached: the newest trade must be current, not hours old
+        resp = await transport.get(
             f"{DATA_API}/trades",
             params={"user": wallet, "limit": 1},
             timeout=15,
+            priority=Priority.BULK,
         )
         if resp.status_code == 200:
             trades = resp.json()
@@ -54,42 +57,39 @@ async def main():
     no_trades = 0
     now = datetime.now(timezone.utc)
 
-    async with httpx.AsyncClient() as client:
-        for i, trader in enumerate(traders):
-            wallet = trader["wallet_address"]
-            alias = trader.get("alias") or wallet[:10]
-
-            # Rate limit
-            await asyncio.sleep(0.3)
-
-            last_trade = await get_latest_trade_date(client, wallet)
-
-            if last_trade is None:
-                print(f"  [{i+1}/{len(traders)}] {alias:20s} — no trades found")
-                no_trades += 1
-                # Deactivate if we can't find any trades
-                sb.table("ep_tracked_traders").update({
-                    "active": False,
-                    "last_trade_date": None,
-                }).eq("id", trader["id"]).execute()
-                deactivated += 1
-                continue
-
-            days_since = (now - last_trade).total_seconds() / 86400
-
-            if days_since > MIN_DAYS_SINCE_LAST_TRADE:
-                print(f"  [{i+1}/{len(traders)}] {alias:20s} — last trade {days_since:.0f}d ago → DEACTIVATED")
-                sb.table("ep_tracked_traders").update({
-                    "active": False,
-                    "last_trade_date": last_trade.isoformat(),
-                }).eq("id", trader["id"]).execute()
-                deactivated += 1
-            else:
-                print(f"  [{i+1}/{len(traders)}] {alias:20s} — last trade {days_since:.1f}d ago ✓")
-                sb.table("ep_tracked_traders").update({
-                    "last_trade_date": last_trade.isoformat(),
-                }).eq("id", trader["id"]).execute()
-                updated += 1
+    for i, trader in enumerate(traders):
+        wallet = trader["wallet_address"]
+        alias = trader.get("alias") or wallet[:10]
+
+        last_trade = await get_latest_trade_date(wallet)
+
+        if last_trade is None:
+            print(f"  [{i+1}/{len(traders)}] {alias:20s} — no trades found")
+            no_trades += 1
+            # Deactivate if we can't find any trades
+            sb.table("ep_tracked_traders").update({
+                "active": False,
+                "last_trade_date": None,
+            }).eq("id", trader["id"]).execute()
+            deactivated += 1
+            continue
+
+        days_since = (now - last_trade).total_seconds() / 86400
+
+        if days_since > MIN_DAYS_SINCE_LAST_TRADE:
+            print(f"  [{i+1}/{len(traders)}] {alias:20s} — last trade {days_since:.0f}d ago → DEACTIVATED")
+            sb.table("ep_tracked_traders").update({
+                "active": False,
+                "last_trade_date": last_trade.isoformat(),
+            }).eq("id", trader["id"]).execute()
+            deactivated += 1
+        else:
+            print(f"  [{i+1}/{len(traders)}] {alias:20s} — last trade {days_since:.1f}d ago ✓")
+            sb.table("ep_tracked_traders").update({
+                "last_trade_date": last_trade.isoformat(),
+            }).eq("id", trader["id"]).execute()
+            updated += 1
+    await transport.aclose()
 
     print(f"\n{'='*50}")
     print(f"Backfill complete:")
@@ -1,71 +1,32 @@
 #!/usr/bin/env python3
 """
-One-off script: Categorize active traders by keyword-matching their trade titles.
-No extra API calls to Gamma — just fetches recent trades and classifies by title.
+One-off script: Categorize active traders from the markets in their recent trades.
+Market categories come from the shared category map (core/category_map.py): the
+trade title's keywords, with Gamma's category taking over unless the keywords found a
+finer one ("mentions"). Markets the map hasn't seen cost one batched Gamma lookup per
+trader.
 """
 import asyncio
-import httpx
 from collections import Counter
+from config import DATA_API
+from core.category_map import category_map
 from db.client import get_supabase
+from utils.http import transport
+from utils.rate_limiter import Priority
 
-DATA_API = "https://data-api.polymarket.com"
-
-# Same keywords as in trader_discovery.py
-CATEGORY_KEYWORDS = {
-    "politics": [
-        "election", "president", "congress", "senate", "vote", "biden", "trump",
-        "democrat", "republican", "white house", "governor", "mayor", "campaign",
-        "political", "legislation", "bill", "law", "policy", "government",
-        "supreme court", "impeach", "primary", "nominee", "cabinet",
-    ],
-    "sports": [
-        "nfl", "nba", "mlb", "nhl", "soccer", "football", "basketball", "baseball",
-        "hockey", "championship", "playoff", "super bowl", "world series", "finals",
-        "mvp", "player", "team", "game", "match", "tournament", "olympics",
-        "ufc", "boxing", "tennis", "golf", "f1", "formula 1", "world cup",
-    ],
-    "crypto": [
-        "bitcoin", "btc", "ethereum", "eth", "solana", "sol", "crypto", "coinbase",
-        "binance", "blockchain", "defi", "nft", "token", "coin", "wallet", "mining",
-        "satoshi", "altcoin", "stablecoin", "usdc", "usdt", "doge", "memecoin",
-        "airdrop", "polymarket",
-    ],
-    "culture": [
-        "movie", "film", "actor", "actress", "box office", "oscar", "grammy",
-        "emmy", "music", "album", "artist", "celebrity", "pop culture", "tv show",
-        "series", "streaming", "netflix", "spotify", "youtube", "influencer",
-        "tiktok", "viral", "meme",
-    ],
-    "finance": [
-        "stock", "market", "nasdaq", "s&p", "dow", "trading", "earnings", "ipo",
-        "acquisition", "merger", "fed", "interest rate", "inflation", "gdp",
-        "unemployment", "bond", "treasury", "recession", "bull market", "bear market",
-    ],
-    "mentions": [
-        "elon musk", "jeff bezos", "mark zuckerberg", "tim cook", "satya nadella",
-        "jensen huang", "sam altman", "vitalik buterin", "cz", "sbf",
-        "tweet", "post", "follower", "x.com", "twitter",
-    ],
-}
-
-
-def classify_title(title: str) -> str:
-    text = title.lower()
-    scores = {}
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        scores[category] = sum(1 for kw in keywords if kw in text)
-    if max(scores.values()) == 0:
-        return "other"
-    return max(scores, key=scores.get)
-
-
-async def get_trader_category(client: httpx.AsyncClient, wallet: str) -> tuple[str, list[str]]:
-    """Fetch recent trades and classify by title keywords."""
+
+def classify_title(condition_id: str, title: str) -> str:
+    return category_map.category(condition_id, title)
+
+
+async def get_trader_category(wallet: str) -> tuple[str, list[str]]:
+    """Fetch recent trades and classify their markets."""
     try:
-        resp = await client.get(
+        resp = await transport.get_cached(
             f"{DATA_API}/trades",
             params={"user": wallet, "limit": 20},
             timeout=15,
+            priority=Priority.BULK,
         )
         if resp.status_code != 200:
             return "other", []
@@ -74,7 +35,9 @@ async def get_trader_category(client: httpx.AsyncClient, wallet: str) -> tuple[s
         if not trades or not isinstance(trades, list):
             return "other", []
 
-        # Classify each unique market title
+        await category_map.prefetch({t["conditionId"]: t.get("title", "") for t in trades if t.get("conditionId")})
+
+        # Classify each unique market
         seen_slugs = set()
         categories = []
         for t in trades:
@@ -84,7 +47,7 @@ async def get_trader_category(client: httpx.AsyncClient, wallet: str) -> tuple[s
             seen_slugs.add(slug)
             title = t.get("title", "")
             if title:
-                categories.append(classify_title(title))
+                categories.append(classify_title(t.get("conditionId", ""), title))
 
         if not categories:
             return "other", []
@@ -114,22 +77,22 @@ async def main():
 
     distribution = Counter()
 
-    async with httpx.AsyncClient() as client:
-        for i, trader in enumerate(traders):
-            wallet = trader["wallet_address"]
-            alias = trader.get("alias") or wallet[:10]
+    for i, trader in enumerate(traders):
+        wallet = trader["wallet_address"]
+        alias = trader.get("alias") or wallet[:10]
 
-            await asyncio.sleep(0.2)
-            primary, all_cats = await get_trader_category(client, wallet)
+        primary, all_cats = await get_trader_category(wallet)
 
-            cat_value = primary if primary != "other" else None
-            sb.table("ep_tracked_traders").update({
-                "category": cat_value,
-                "market_categories": all_cats,
-            }).eq("id", trader["id"]).execute()
+        cat_value = primary if primary != "other" else None
+        sb.table("ep_tracked_traders").update({
+            "category": cat_value,
+            "market_categories": all_cats,
+        }).eq("id", trader["id"]).execute()
 
-            distribution[primary] += 1
-            print(f"  [{i+1}/{len(traders)}] {alias:25s} → {primary:10s} {all_cats}")
+        distribution[primary] += 1
+        print(f"  [{i+1}/{len(traders)}] {alias:25s} → {primary:10s} {all_cats}")
+    category_map.flush()
+    await transport.aclose()
 
     print(f"\n{'='*50}")
     print("Category distribution:")
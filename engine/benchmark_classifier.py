@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Classifier benchmark — per-keyword substring scan vs the compiled matcher.
+
+Generates market titles shaped like Polymarket's (a pool of distinct titles,
+sampled with repetition the way one market's title recurs across trades and
+positions), then classifies all of them three ways: the old `kw in text` loop,
+the compiled matcher with the memo bypassed, and the memoized matcher. Also
+reports how often the word-boundary matching changed the answer.
+
+    python benchmark_classifier.py [--titles 1000000] [--distinct 20000]
+"""
+import argparse
+import random
+import time
+
+from utils.classifier import CATEGORY_KEYWORDS, KeywordClassifier
+
+SUBJECTS = [
+    "Bitcoin", "Ethereum", "Solana", "Trump", "Biden", "the Fed", "the Chiefs", "the Lakers", "Taylor Swift",
+    "Elon Musk", "Nvidia", "the S&P 500", "Oppenheimer", "Real Madrid", "the Senate", "Dogecoin", "Netflix",
+    "Zelensky", "the Celtics", "OpenAI", "Apple", "the Supreme Court", "Coinbase", "Macron", "the Yankees",
+]
+TEMPLATES = [
+    "Will {s} win the {y} election?", "Will {s} reach a new all-time high by {m}?", "{s} vs {o}: who wins?",
+    "Will {s} tweet more than {n} times this week?", "Will {s} be above ${n} on {m} {d}?",
+    "Will {s} win the {y} championship?", "Will {s} announce a merger before {m}?",
+    "Will {s} be nominated for an Oscar in {y}?", "Will the resolution on {s} pass the House?",
+    "Will {s} cut interest rates in {m}?", "Whether {s} gets an ETF approved by {m} {d}",
+    "Will {s} top the box office on {m} {d}?", "Will {s} make the NBA Finals?",
+]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October"]
+
+
+def make_titles(count: int, distinct: int) -> list[str]:
+    rng = random.Random(3)
+    pool = [
+        rng.choice(TEMPLATES).format(
+            s=rng.choice(SUBJECTS), o=rng.choice(SUBJECTS), y=rng.randint(2024, 2028),
+            m=rng.choice(MONTHS), d=rng.randint(1, 28), n=rng.randint(10, 200_000),
+        )
+        for _ in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def classify_substring(title: str) -> str:
+    """The pre-compiled implementation: one `in` scan per keyword."""
+    text = title.lower()
+    scores = {}
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        scores[category] = sum(1 for kw in keywords if kw in text)
+    if max(scores.values()) == 0:
+        return "other"
+    return max(scores, key=scores.get)
+
+
+def bench(label: str, fn, titles: list[str]) -> tuple[float, list[str]]:
+    start = time.perf_counter()
+    out = [fn(t) for t in titles]
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:8.2f} s   {len(titles) / elapsed / 1e6:6.2f} M titles/s")
+    return elapsed, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=20_000)
+    args = parser.parse_args()
+
+    titles = make_titles(args.titles, args.distinct)
+    print(f"{args.titles:,} titles ({args.distinct:,} distinct), "
+          f"{sum(len(v) for v in CATEGORY_KEYWORDS.values())} keywords in {len(CATEGORY_KEYWORDS)} categories")
+
+    t_old, old = bench("substring scan", classify_substring, titles)
+    uncached = KeywordClassifier(CATEGORY_KEYWORDS)
+    t_re, new = bench("compiled, no memo", uncached._classify, titles)
+    memoized = KeywordClassifier(CATEGORY_KEYWORDS)
+    t_memo, _ = bench("compiled + memo", memoized.classify, titles)
+
+    changed = sum(a != b for a, b in zip(old, new))
+    print(f"  speed-up {t_old / t_re:.1f}x compiled, {t_old / t_memo:.1f}x memoized "
+          f"({memoized.classify.cache_info().hits:,} memo hits)")
+    print(f"  word-boundary matching changed {changed:,} of {len(titles):,} labels ({changed / len(titles):.1%})")
+    examples = {}
+    for title, a, b in zip(titles, old, new):
+        if a != b and len(examples) < 5:
+            examples.setdefault((a, b), title)
+    for (a, b), title in examples.items():
+        print(f"    {a} -> {b}: {title}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Decode benchmark — generic json + dataclass walk vs typed msgspec records.
+
+Builds a synthetic 10k-trade /trades page and a 10k-row /closed-positions page
+shaped like the Data API, then times each path end to end (bytes -> records)
+and reports peak allocation via tracemalloc.
+
+    python benchmark_decode.py [--rows 10000] [--repeat 20]
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from utils.schemas import Position, Trade, decode_list
+
+
+@dataclass
+class _DictTrade:
+    side: str
+    size: float
+    price: float
+    timestamp: int
+    condition_id: str
+    title: str = ""
+    outcome: str = ""
+    asset: str = ""
+
+
+@dataclass
+class _DictPosition:
+    condition_id: str
+    title: str
+    outcome: str
+    size: float
+    avg_price: float
+    current_price: float
+    initial_value: float
+    current_value: float
+    cash_pnl: float
+    pct_pnl: float
+    is_closed: bool = False
+    realized_pnl: float = 0.0
+
+
+def make_trades(n: int) -> bytes:
+    rng = random.Random(7)
+    rows = [{
+        "proxyWallet": "0x" + "ab" * 20,
+        "side": rng.choice(["BUY", "SELL"]),
+        "asset": str(rng.getrandbits(250)),
+        "conditionId": "0x" + format(rng.getrandbits(256), "064x"),
+        "size": round(rng.uniform(1, 5000), 4),
+        "price": round(rng.uniform(0.01, 0.99), 4),
+        "timestamp": 1_700_000_000 + i * 37,
+        "title": f"Will event #{rng.randint(1, 5000)} happen by year end?",
+        "slug": f"event-{i}",
+        "icon": "https://polymarket-upload.s3.us-east-2.amazonaws.com/icon.png",
+        "eventSlug": f"event-{i}",
+        "outcome": rng.choice(["Yes", "No"]),
+        "outcomeIndex": rng.randint(0, 1),
+        "name": "trader",
+        "pseudonym": "Some-Pseudonym",
+        "bio": "",
+        "profileImage": "",
+        "transactionHash": "0x" + format(rng.getrandbits(256), "064x"),
+    } for i in range(n)]
+    return json.dumps(rows).encode()
+
+
+def make_positions(n: int) -> bytes:
+    rng = random.Random(11)
+    rows = [{
+        "proxyWallet": "0x" + "cd" * 20,
+        "asset": str(rng.getrandbits(250)),
+        "conditionId": "0x" + format(rng.getrandbits(256), "064x"),
+        "avgPrice": round(rng.uniform(0.01, 0.99), 4),
+        "totalBought": round(rng.uniform(1, 5000), 2),
+        "realizedPnl": round(rng.uniform(-500, 500), 2),
+        "curPrice": rng.choice([0, 1]),
+        "timestamp": 1_700_000_000 + i * 91,
+        "title": f"Will event #{rng.randint(1, 5000)} happen by year end?",
+        "slug": f"event-{i}",
+        "outcome": rng.choice(["Yes", "No"]),
+        "outcomeIndex": rng.randint(0, 1),
+        "endDate": "2025-12-31T00:00:00Z",
+    } for i in range(n)]
+    return json.dumps(rows).encode()
+
+
+def trades_generic(body: bytes) -> list:
+    out = []
+    for t in json.loads(body):
+        try:
+            out.append(_DictTrade(
+                side=t.get("side", ""),
+                size=float(t.get("size", 0)),
+                price=float(t.get("price", 0)),
+                timestamp=int(t.get("timestamp", 0)),
+                condition_id=t.get("conditionId", t.get("market", "")),
+                title=t.get("title", ""),
+                outcome=t.get("outcome", ""),
+                asset=t.get("asset", ""),
+            ))
+        except (ValueError, TypeError):
+            continue
+    return out
+
+
+def positions_generic(body: bytes) -> list:
+    out = []
+    for pos in json.loads(body):
+        try:
+            out.append(_DictPosition(
+                condition_id=pos.get("conditionId", pos.get("market", "")),
+                title=pos.get("title", ""),
+                outcome=pos.get("outcome", ""),
+                size=float(pos.get("size", 0)),
+                avg_price=float(pos.get("avgPrice", 0)),
+                current_price=float(pos.get("curPrice", pos.get("price", 0))),
+                initial_value=float(pos.get("initialValue", 0)),
+                current_value=float(pos.get("currentValue", 0)),
+                cash_pnl=float(pos.get("cashPnl", 0)),
+                pct_pnl=float(pos.get("percentPnl", 0)),
+                is_closed=True,
+                realized_pnl=float(pos.get("realizedPnl", 0)),
+            ))
+        except (ValueError, TypeError):
+            continue
+    return out
+
+
+def bench(label: str, fn, body: bytes, repeat: int) -> tuple[float, int]:
+    fn(body)  # warm up (decoder construction, caches)
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn(body)
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    result = fn(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = min(times)
+    print(f"  {label:<24} {best * 1000:8.2f} ms   peak {peak / 1e6:7.2f} MB   rows {len(result)}")
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, body, generic, record in (
+        ("trades", make_trades(args.rows), trades_generic, Trade),
+        ("closed-positions", make_positions(args.rows), positions_generic, Position),
+    ):
+        print(f"\n{name}: {args.rows} rows, {len(body) / 1e6:.1f} MB payload")
+        t_old, m_old = bench("json + dataclass walk", generic, body, args.repeat)
+        t_new, m_new = bench("msgspec typed decode", lambda b, r=record: decode_list(b, r), body, args.repeat)
+        print(f"  speed-up {t_old / t_new:.1f}x, peak allocation {m_old / m_new:.1f}x lower")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Signal benchmark — per-market history checks vs the batch signal engine.
+
+Fills a price history with synthetic 48h random walks (some trending, some
+with volume spikes), then computes the history signals for every market two
+ways: the per-market reference checks below (the detector's original loop,
+which test_signals.py also holds the engine to) and core/signal_engine.py's
+signal registry, one NumPy pass per signal. Checks that both give identical
+signals and prints the registry's per-signal timings.
+
+    python benchmark_signals.py [--markets 200,2000,20000] [--snapshots 96]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from core.price_history import VOLUME, YES, PriceHistory
+from core.signal_engine import SignalEngine
+
+
+def check_statistical_edge(history: PriceHistory, market: dict) -> list[dict]:
+    """Check for statistical signals: mean reversion, momentum, liquidity imbalance."""
+    signals = []
+    window = history.window(market["market_id"], hours=48)
+
+    yes_prices = window[:, YES].tolist()
+    if len(yes_prices) < 4:
+        return signals
+
+    # Mean reversion: price deviated >10% from recent mean
+    mean_price = sum(yes_prices) / len(yes_prices)
+    current = yes_prices[-1]
+    deviation = abs(current - mean_price) / max(mean_price, 0.01)
+
+    if deviation > 0.10:
+        signals.append({
+            "signal_type": "mean_reversion",
+            "strength": min(deviation, 1.0),
+            "data": {"mean": mean_price, "current": current, "deviation": deviation},
+        })
+
+    # Momentum: 3+ consecutive moves in same direction
+    if len(yes_prices) >= 4:
+        diffs = [yes_prices[i] - yes_prices[i-1] for i in range(1, len(yes_prices))]
+        pos_streak = sum(1 for d in diffs[-3:] if d > 0)
+        neg_streak = sum(1 for d in diffs[-3:] if d < 0)
+
+        if pos_streak >= 3 or neg_streak >= 3:
+            direction = "up" if pos_streak >= 3 else "down"
+            signals.append({
+                "signal_type": "momentum",
+                "strength": 0.6,
+                "data": {"direction": direction, "streak": max(pos_streak, neg_streak)},
+            })
+
+    # Liquidity imbalance over the last 4 stored rows (each snapshot is a YES row and a NO row)
+    volumes = np.repeat(window[-2:, VOLUME], 2).tolist()
+    if volumes and max(volumes) > 0:
+        vol_ratio = volumes[-1] / (sum(volumes[:-1]) / max(len(volumes) - 1, 1)) if sum(volumes[:-1]) > 0 else 0
+        if vol_ratio > 2.0:
+            signals.append({
+                "signal_type": "liquidity_imbalance",
+                "strength": min(vol_ratio / 5, 1.0),
+                "data": {"volume_ratio": vol_ratio},
+            })
+
+    return signals
+
+
+def check_crowd_behavior(history: PriceHistory, market: dict) -> list[dict]:
+    """Check for extreme sentiment or overreaction."""
+    signals = []
+    price = market.get("yes_price", 0.5)
+
+    # Extreme sentiment: require >2% price movement AND interesting odds
+    if (0.10 <= price <= 0.90) and market.get("volume", 0) > 50000:
+        yes_prices = history.window(market["market_id"], hours=24)[:, YES].tolist()
+        if len(yes_prices) >= 2 and abs(yes_prices[-1] - yes_prices[0]) > 0.02:
+            signals.append({
+                "signal_type": "extreme_sentiment",
+                "strength": 0.7,
+                "data": {"price": price, "movement": abs(yes_prices[-1] - yes_prices[0])},
+            })
+
+    return signals
+
+
+def make_history(markets: int, snapshots: int, now: float) -> tuple[PriceHistory, list[dict]]:
+    rng = np.random.default_rng(7)
+    history = PriceHistory({"initial_markets": markets, "capacity": max(snapshots, 4)})
+    ids = [f"market-{i}" for i in range(markets)]
+    drift = rng.choice([0.0, 0.0, 0.01, -0.01], size=markets)
+    yes = rng.uniform(0.05, 0.95, size=markets)
+    volume = rng.uniform(1e3, 5e5, size=markets)
+    step = 48 * 3600 / snapshots
+    for k in range(snapshots):
+        yes = np.clip(yes + drift + rng.normal(0, 0.02, size=markets), 0.01, 0.99)
+        volume = volume * np.where(rng.random(markets) < 0.05, 4.0, 1.0) + rng.uniform(0, 1e3, size=markets)
+        history.record([
+            {"market_id": m, "yes_price": float(p), "no_price": float(1 - p), "volume": float(v), "liquidity": 5000.0}
+            for m, p, v in zip(ids, yes, volume)
+        ], ts=now - step * (snapshots - 0.5 - k))  # Half a step off, so no snapshot sits on a window edge
+    latest = [{"market_id": m, "yes_price": float(p), "volume": float(v)} for m, p, v in zip(ids, yes, volume)]
+    return history, latest
+
+
+def bench(markets: int, snapshots: int):
+    now = time.time()
+    history, latest = make_history(markets, snapshots, now)
+
+    start = time.perf_counter()
+    reference = [(check_statistical_edge(history, m), check_crowd_behavior(history, m)) for m in latest]
+    t_loop = time.perf_counter() - start
+
+    engine = SignalEngine(history)
+    start = time.perf_counter()
+    per_market = engine.evaluate(latest, now=now)
+    t_batch = time.perf_counter() - start
+
+    mismatched = sum(s + c != signals for (s, c), signals in zip(reference, per_market))
+    fired = sum(len(signals) for signals in per_market)
+    print(f"  {markets:>7,} markets   per-market {t_loop * 1000:9.1f} ms   batch {t_batch * 1000:7.1f} ms   "
+          f"{t_loop / t_batch:6.1f}x   {fired:,} signals, {mismatched} mismatched")
+    print(f"      {engine.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--markets", default="200,2000,20000")
+    parser.add_argument("--snapshots", type=int, default=96)
+    args = parser.parse_args()
+
+    print(f"{args.snapshots} snapshots per market over 48h")
+    for markets in (int(n) for n in args.markets.split(",")):
+        bench(markets, args.snapshots)
+
+
+if __name__ == "__main__":
+    main()
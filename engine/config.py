@@ -29,10 +29,122 @@ LIVE_CAPITAL = 5000.0
 # API ENDPOINTS
 # ============================================================================
 
-CLOB_HOST = "https://clob.polymarket.com"
-GAMMA_API = "https://gamma-api.polymarket.com"
+# Overridable so the engine can run against the local replay stand-in (utils/replay.py)
+CLOB_HOST = os.environ.get("CLOB_HOST", "https://clob.polymarket.com")
+GAMMA_API = os.environ.get("GAMMA_API", "https://gamma-api.polymarket.com")
+DATA_API = os.environ.get("DATA_API", "https://data-api.polymarket.com")
+CLOB_WS = os.environ.get("CLOB_WS", "wss://ws-subscriptions-clob.polymarket.com/ws")  # + /market channel
 CHAIN_ID = 137  # Polygon mainnet
 
+# ============================================================================
+# HTTP TRANSPORT (shared pooled client — utils/http.py)
+# ============================================================================
+
+HTTP_CONFIG = {
+    "timeout_seconds": 30.0,
+    "connect_timeout_seconds": 10.0,
+    "max_connections": 100,          # Total pooled connections across all hosts
+    "max_keepalive": 40,             # Idle connections kept warm between calls
+    "keepalive_expiry_seconds": 60.0,
+    "max_per_host": 20,              # Concurrent in-flight requests per upstream host
+    "bulk_max_per_host": 15,         # Bulk lane's share, so realtime calls always find a free slot
+    "http2": True,                   # Used only when the h2 package is installed
+    "record_dir": os.environ.get("HTTP_RECORD_DIR", ""),  # Capture Polymarket responses as replay fixtures
+}
+
+# Adaptive per-host token buckets (AIMD): rates climb while responses are clean,
+# halve on 429 and pause the host for Retry-After.
+RATE_LIMIT_CONFIG = {
+    "default_rps": 5.0,              # Starting rate for hosts not listed below
+    "hosts": {
+        "data-api.polymarket.com": 5.0,
+        "gamma-api.polymarket.com": 5.0,
+        "clob.polymarket.com": 5.0,
+    },
+    "min_rps": 0.5,
+    "max_rps": 50.0,
+    "increase_rps": 0.5,             # Additive increase per second of clean traffic
+    "decrease_factor": 0.5,          # Multiplicative decrease on 429
+    "burst": 10,                     # Bucket capacity
+    "host_burst": {
+        "gamma-api.polymarket.com": 50,  # Lets a full-universe /markets scan go out in one wave
+    },
+    "default_retry_after": 5.0,      # Pause when a 429 carries no Retry-After header
+}
+
+# Hedged GETs: if a request is still running after the endpoint's recent p95,
+# send one duplicate and take whichever answers first.
+HEDGE_CONFIG = {
+    "enabled": True,
+    "percentile": 0.95,
+    "min_samples": 20,               # No hedging until an endpoint has this much history
+    "window": 200,                   # Latency samples kept per endpoint
+    "min_delay_seconds": 0.25,
+    "max_delay_seconds": 5.0,
+    "budget": 0.10,                  # Hedges may add at most 10% extra requests
+}
+
+# Per-endpoint circuit breaker: after N consecutive failures (timeouts,
+# connection errors, 5xx) calls fail fast until a single probe succeeds.
+CIRCUIT_BREAKER_CONFIG = {
+    "failure_threshold": 5,
+    "reset_seconds": 30.0,           # How long the circuit stays open before a probe
+}
+
+# ============================================================================
+# MARKET SCANNER CONFIG (core/market_scanner.py)
+# ============================================================================
+MARKET_SCANNER_CONFIG = {
+    "page_size": 100,                # Gamma /markets max per page
+    "max_concurrent_pages": 16,      # Pages in flight at once (still paced by the gamma-api bucket)
+    "max_retries": 3,                # Attempts per page on 429
+    "sync_chunk_size": 500,          # Rows per upsert statement in core/market_sync.py
+    "min_sync_fraction": 0.5,        # A scan smaller than this share of the active rows deactivates nothing
+    # Markets this long past their endDate are pruned (core/resolved_markets.py). Many keep trading past it
+    # (a sports market's endDate is often kickoff) until they resolve, which PickResolver reports directly
+    "expiry_grace_hours": 48,
+    "resolved_retention_days": 7,    # Resolved market ids are remembered this long
+}
+
+# Process-wide market snapshot (core/market_cache.py), refreshed after every sync
+MARKET_CACHE_CONFIG = {
+    # Rows only change when a scan syncs, which replaces the whole snapshot. Entries outlive one
+    # scan interval (CONVICTION_CONFIG["scan_interval_minutes"]) so a late scan doesn't send every
+    # lookup to Supabase; an id the scan never saw still costs one query per TTL.
+    "ttl_scan_intervals": 2,
+}
+
+# In-memory price history per market (core/price_history.py), fed by every snapshot
+PRICE_HISTORY_CONFIG = {
+    "capacity": 128,                 # Snapshots kept per market (a 48h window at 30-minute scans needs 96)
+    "window_hours": 48,              # Longest lookback the detector reads; older snapshots are dropped
+    "initial_markets": 1024,         # Preallocated market slots; the buffer doubles when full
+    # "memory": hydrate each market from Supabase once, then keep it current from our own snapshots.
+    # "database": re-read every cycle (another process also writes ep_price_snapshots).
+    "source": os.environ.get("PRICE_HISTORY_SOURCE", "memory"),
+    "hydrate_ids_per_query": 100,    # Markets per bulk history query (in_ filter size)
+    "pair_window_seconds": 60,       # A YES and a NO row this close together are one snapshot when hydrating
+}
+
+# In-memory L2 order books (core/book_cache.py), fed by batched CLOB POST /books
+BOOK_CACHE_CONFIG = {
+    "ttl_seconds": 15,               # Per token; older books are refetched on the next lookup
+    "batch_size": 100,               # Token ids per /books request
+    "max_concurrent_batches": 4,     # Batches in flight at once (still paced by the CLOB bucket)
+    "warm_min_liquidity": 5000,      # Scans prefetch books for markets at least this liquid
+}
+
+# Live prices from the CLOB market channel (core/market_stream.py)
+MARKET_STREAM_CONFIG = {
+    "enabled": os.environ.get("MARKET_STREAM_ENABLED", "true").lower() == "true",
+    "tokens_per_connection": 500,    # Asset ids subscribed per websocket; more tokens open more connections
+    "ping_interval_seconds": 10,     # The market channel expects a text PING at least this often
+    "stale_seconds": 30,             # No frame (not even PONG) for this long = dead connection
+    "reconnect_min_seconds": 1.0,    # Backoff doubles per failed attempt, with jitter
+    "reconnect_max_seconds": 60.0,
+    "mid_max_spread": 0.10,          # Wider books price at the last trade instead of the midpoint
+}
+
 # ============================================================================
 # TRADER DISCOVERY CONFIG
 # ============================================================================
@@ -248,6 +360,42 @@ WHALE_WALLETS_FILE = os.path.join(DATA_DIR, "whale_wallets.json")
 MARKET_HISTORY_FILE = os.path.join(DATA_DIR, "market_history.json")
 LEARNED_PARAMS_FILE = os.path.join(DATA_DIR, "learned_params.json")
 POSITIONS_FILE = os.path.join(DATA_DIR, "active_positions.json")
+TRADE_HISTORY_DB = os.path.join(DATA_DIR, "trade_history.sqlite3")  # Per-wallet trades + watermarks
+CATEGORY_MAP_DB = os.path.join(DATA_DIR, "category_map.sqlite3")    # condition_id -> category (core/category_map.py)
+REPLAY_FIXTURES_DIR = os.path.join(DATA_DIR, "fixtures")             # Recorded API responses for the stand-in
+
+# ============================================================================
+# HTTP RESPONSE CACHE (SQLite, utils/response_cache.py)
+# ============================================================================
+
+# TTLs are matched on URL path (longest prefix wins). 0 = never cached.
+# Expired entries are revalidated with If-None-Match / If-Modified-Since.
+RESPONSE_CACHE_CONFIG = {
+    "enabled": os.environ.get("HTTP_CACHE_ENABLED", "true").lower() == "true",
+    "path": os.path.join(DATA_DIR, "http_cache.sqlite3"),
+    "max_bytes": 512 * 1024 * 1024,
+    "ttl_seconds": {
+        "/closed-positions": 12 * 3600,   # Resolved history only grows at the tail
+        "/trades": 6 * 3600,              # Matches DISCOVERY_INTERVAL_HOURS in run.py
+        "/v1/leaderboard": 3600,
+        "/markets": 300,
+        "/positions": 300,
+        "/value": 300,
+        "/book": 0,                       # Order books are never cached
+    },
+}
+
+# ============================================================================
+# WARM START (core/warm_start.py)
+# ============================================================================
+
+# Market universe, scheduler timestamps and in-memory buffers, saved after every
+# full pipeline and restored when the engine boots
+WARM_START_CONFIG = {
+    "enabled": os.environ.get("WARM_START_ENABLED", "true").lower() == "true",
+    "path": os.path.join(DATA_DIR, "engine_state.msgpack"),
+    "max_age_hours": 24,             # Older state is ignored (cold start)
+}
 
 # ============================================================================
 # UTILITY FUNCTIONS
@@ -276,7 +424,8 @@ def get_strategy_allocation(strategy_name: str) -> float:
 
 __all__ = [
     "WALLET_ADDRESS", "PRIVATE_KEY", "PAPER_MODE",
-    "CLOB_HOST", "GAMMA_API",
+    "CLOB_HOST", "CLOB_WS", "GAMMA_API", "DATA_API", "HTTP_CONFIG", "RATE_LIMIT_CONFIG",
+    "HEDGE_CONFIG", "CIRCUIT_BREAKER_CONFIG",
     "ANTHROPIC_API_KEY", "PERPLEXITY_API_KEY",
     "TELEGRAM_BOT_TOKEN", "TELEGRAM_ADMIN_CHAT_ID",
     "EASYPOLY_BOT_URL", "EASYPOLY_BOT_API_SECRET",
@@ -286,6 +435,8 @@ __all__ = [
     "WHALE_WALLETS", "WHALE_COPY_CONFIG",
     "BOND_CONFIG", "NEWS_CONFIG",
     "RISK_LIMITS", "LEARNING_CONFIG", "LOGGING_CONFIG",
-    "TRADER_DISCOVERY_CONFIG",
+    "MARKET_SCANNER_CONFIG", "MARKET_CACHE_CONFIG", "PRICE_HISTORY_CONFIG", "BOOK_CACHE_CONFIG",
+    "MARKET_STREAM_CONFIG",
+    "TRADER_DISCOVERY_CONFIG", "RESPONSE_CACHE_CONFIG", "WARM_START_CONFIG",
     "get_capital", "get_max_position_size", "get_strategy_allocation"
 ]
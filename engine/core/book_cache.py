@@ -0,0 +1,202 @@
+"""
+Book Cache — In-memory L2 order books for every liquid market.
+
+Books are fetched in batches through the CLOB multi-book endpoint
+(POST /books, up to `batch_size` token ids per request) and kept per token
+for `ttl_seconds`. Depth, spread and slippage are answered from the cached
+levels; only tokens whose book is missing or stale go back to the network,
+and those are refetched together in one round of batches. Books for tokens
+the market stream (core/market_stream.py) subscribes to are kept current in
+place from its snapshots and level changes. Books for tokens that are no
+longer scanned, streamed or picked are dropped each time run.py re-points
+the stream.
+
+Levels are re-sorted on load (bids high→low, asks low→high) so queries don't
+depend on the order the API sends them in.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from config import BOOK_CACHE_CONFIG, CLOB_HOST
+from utils.http import transport
+from utils.logger import log
+from utils.rate_limiter import Priority
+from utils.schemas import OrderBook, decode_list
+
+
+class L2Book:
+    """One token's book as (price, size) levels, best first."""
+
+    __slots__ = ("token_id", "bids", "asks", "fetched_at")
+
+    def __init__(self, token_id: str, bids: list[tuple[float, float]], asks: list[tuple[float, float]]):
+        self.token_id = token_id
+        self.bids = bids
+        self.asks = asks
+        self.fetched_at = time.time()
+
+    @classmethod
+    def from_orderbook(cls, book: OrderBook) -> L2Book:
+        bids = sorted(((l.price, l.size) for l in book.bids if l.size > 0), reverse=True)
+        asks = sorted((l.price, l.size) for l in book.asks if l.size > 0)
+        return cls(book.asset_id, bids, asks)
+
+    @property
+    def best_bid(self) -> float:
+        return self.bids[0][0] if self.bids else 0.0
+
+    @property
+    def best_ask(self) -> float:
+        return self.asks[0][0] if self.asks else 1.0
+
+    @property
+    def spread(self) -> float:
+        return self.best_ask - self.best_bid
+
+    @property
+    def mid(self) -> float:
+        return (self.best_bid + self.best_ask) / 2
+
+    def depth(self, side: str, within: float | None = None) -> float:
+        """Shares resting on one side ("bid"/"ask"), optionally only within `within` of the touch."""
+        levels = self.bids if side == "bid" else self.asks
+        if not levels:
+            return 0.0
+        if within is None:
+            return sum(size for _, size in levels)
+        touch = levels[0][0]
+        return sum(size for price, size in levels if abs(price - touch) <= within + 1e-9)
+
+    def fill_price(self, side: str, shares: float) -> float | None:
+        """Average price to buy ("buy" walks asks) or sell ("sell" walks bids) `shares`; None if the book is too thin."""
+        levels = self.asks if side == "buy" else self.bids
+        remaining, cost = shares, 0.0
+        for price, size in levels:
+            take = min(size, remaining)
+            cost += take * price
+            remaining -= take
+            if remaining <= 1e-9:
+                return cost / shares
+        return None
+
+    def slippage(self, side: str, shares: float) -> float | None:
+        """How far the average fill for `shares` lands from the touch, in price units."""
+        fill = self.fill_price(side, shares)
+        if fill is None:
+            return None
+        return fill - self.best_ask if side == "buy" else self.best_bid - fill
+
+    def apply(self, side: str, price: float, size: float):
+        """Set one level from a market-channel price_change ("BUY" = bid side); size 0 removes it."""
+        bid = side.upper() == "BUY"
+        levels = [lvl for lvl in (self.bids if bid else self.asks) if abs(lvl[0] - price) > 1e-9]
+        if size > 0:
+            levels.append((price, size))
+        levels.sort(reverse=bid)
+        if bid:
+            self.bids = levels
+        else:
+            self.asks = levels
+        self.fetched_at = time.time()
+
+    def top(self) -> dict:
+        """Top-of-book summary (the shape MarketScanner.get_orderbook returns)."""
+        return {
+            "best_bid": self.best_bid,
+            "best_ask": self.best_ask,
+            "spread": self.spread,
+            "bid_size": self.bids[0][1] if self.bids else 0.0,
+            "ask_size": self.asks[0][1] if self.asks else 0.0,
+        }
+
+
+class BookCache:
+    def __init__(self, config: dict | None = None):
+        cfg = {**BOOK_CACHE_CONFIG, **(config or {})}
+        self.ttl = cfg["ttl_seconds"]
+        self.batch_size = cfg["batch_size"]
+        self.max_concurrent_batches = cfg["max_concurrent_batches"]
+        self._books: dict[str, L2Book] = {}
+        self.stats = {"hits": 0, "misses": 0, "batches": 0, "books_fetched": 0, "errors": 0}
+
+    def _fresh(self, book: L2Book | None) -> bool:
+        return book is not None and time.time() - book.fetched_at < self.ttl
+
+    def put(self, book: OrderBook):
+        if book.asset_id:
+            self._books[book.asset_id] = L2Book.from_orderbook(book)
+
+    def apply_change(self, token_id: str, side: str, price: float, size: float):
+        """Keep a cached book current from a streamed level change (ignored if the book isn't cached)."""
+        book = self._books.get(token_id)
+        if book is not None:
+            book.apply(side, price, size)
+
+    def peek(self, token_id: str) -> L2Book | None:
+        """Cached book if still fresh, without touching the network."""
+        book = self._books.get(token_id)
+        return book if self._fresh(book) else None
+
+    async def _fetch_batch(self, token_ids: list[str], priority: Priority):
+        resp = await transport.post(
+            f"{CLOB_HOST}/books", json=[{"token_id": t} for t in token_ids], priority=priority, timeout=10
+        )
+        resp.raise_for_status()
+        books = decode_list(resp.content, OrderBook)
+        for book in books:
+            self.put(book)
+        self.stats["batches"] += 1
+        self.stats["books_fetched"] += len(books)
+
+    async def refresh(self, token_ids: list[str], priority: Priority = Priority.INTERACTIVE, force: bool = False):
+        """Fetch every missing or stale book among token_ids in batches of `batch_size`."""
+        wanted = list(dict.fromkeys(t for t in token_ids if t and (force or not self._fresh(self._books.get(t)))))
+        if not wanted:
+            return
+        gate = asyncio.Semaphore(self.max_concurrent_batches)
+
+        async def run(batch: list[str]):
+            async with gate:
+                try:
+                    await self._fetch_batch(batch, priority)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    log("warning", f"Order book batch of {len(batch)} failed: {e}", source="book_cache")
+
+        await asyncio.gather(*(
+            run(wanted[i:i + self.batch_size]) for i in range(0, len(wanted), self.batch_size)
+        ))
+
+    async def get_many(self, token_ids: list[str], priority: Priority = Priority.INTERACTIVE) -> dict[str, L2Book]:
+        """Books for token_ids (fresh from memory, the rest fetched together). Unknown tokens are left out."""
+        stale = [t for t in token_ids if not self._fresh(self._books.get(t))]
+        self.stats["hits"] += len(token_ids) - len(stale)
+        self.stats["misses"] += len(stale)
+        await self.refresh(stale, priority)
+        return {t: self._books[t] for t in token_ids if t in self._books}
+
+    async def get(self, token_id: str, priority: Priority = Priority.INTERACTIVE) -> L2Book | None:
+        return (await self.get_many([token_id], priority)).get(token_id)
+
+    def invalidate(self, token_ids: list[str] | None = None):
+        if token_ids is None:
+            self._books.clear()
+            return
+        for token_id in token_ids:
+            self._books.pop(token_id, None)
+
+    def retain(self, token_ids) -> int:
+        """Drop books for tokens outside token_ids (markets that left the scan or resolved); returns how many."""
+        keep = set(token_ids)
+        gone = [t for t in self._books if t not in keep]
+        for token_id in gone:
+            del self._books[token_id]
+        return len(gone)
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+
+book_cache = BookCache()
@@ -0,0 +1,243 @@
+"""
+Category Map — One category per market (condition_id), shared by every trader.
+
+A market is categorized once and the answer is reused by discovery, the
+backfill scripts and the conviction engine. Gamma's own category is kept when
+it maps onto a landing-site category (GAMMA_CATEGORIES); otherwise the
+market's title goes through the keyword classifier (utils/classifier.py).
+Entries live in memory and in SQLite (CATEGORY_MAP_DB), so they survive
+restarts.
+
+Lookups answer in the caller's taxonomy, from the map wherever it already
+holds that answer. Gamma's category only replaces the caller's keyword
+answer when the taxonomy has that category and the keywords didn't find a
+finer one than the landing-site tabs (the shared "mentions", v2's "nfl"),
+which Gamma has no way to say.
+
+Entries come from three places:
+  - MarketScanner.scan records every scanned market's Gamma category (no extra requests);
+  - prefetch() looks up condition ids Gamma hasn't been asked about, in batches;
+  - category() classifies the title of anything still unknown, so a lookup
+    never waits on the network. prefetch() later replaces those with Gamma's answer.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable
+
+from config import CATEGORY_MAP_DB, GAMMA_API
+from utils.classifier import KeywordClassifier, category_classifier
+from utils.http import transport
+from utils.logger import log
+from utils.rate_limiter import Priority
+from utils.schemas import MarketRecord, decode_list
+
+# Maps Gamma API categories to landing-site tab categories
+GAMMA_CATEGORIES = {
+    "crypto": "crypto", "nfts": "crypto", "defi": "crypto",
+    "bitcoin": "crypto", "ethereum": "crypto",
+    "politics": "politics", "global politics": "politics",
+    "us politics": "politics", "elections": "politics",
+    "sports": "sports", "nba": "sports", "nba playoffs": "sports",
+    "nfl": "sports", "mlb": "sports", "soccer": "sports",
+    "mls": "sports", "nhl": "sports", "tennis": "sports",
+    "chess": "sports", "esports": "sports", "olympics": "sports",
+    "formula 1": "sports", "boxing": "sports", "mma": "sports",
+    "golf": "sports", "cricket": "sports",
+    "culture": "culture", "entertainment": "culture", "art": "culture",
+    "music": "culture", "movies": "culture", "tv": "culture",
+    "social media": "culture", "celebrity": "culture",
+    "finance": "finance", "business": "finance", "economics": "finance",
+    "stocks": "finance", "fed": "finance", "markets": "finance",
+    "coronavirus": "culture",  # legacy Polymarket category
+    "coronavirus-": "culture",
+}
+LANDING_CATEGORIES = frozenset(GAMMA_CATEGORIES.values())
+
+# Where an entry's category came from
+SOURCE_GAMMA = "gamma"         # Gamma category, mapped
+SOURCE_KEYWORDS = "keywords"   # Gamma had nothing usable; title keywords
+SOURCE_TITLE = "title"         # Title keywords; Gamma not asked yet
+
+
+def gamma_category(raw: str | None) -> str | None:
+    """Landing-site category for a Gamma category, or None if it doesn't map onto one."""
+    if not raw:
+        return None
+    return GAMMA_CATEGORIES.get(raw.strip().lower())
+
+
+class CategoryMap:
+    def __init__(self, path: str = CATEGORY_MAP_DB, batch_size: int = 50, max_concurrent_batches: int = 4):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_concurrent_batches = max_concurrent_batches
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[str, str]] | None = None  # condition_id -> (category, source)
+        self._by_market: dict[str, str] = {}                      # market slug -> condition_id
+        self._pending: dict[str, tuple] = {}                      # Rows changed since the last flush
+        self._answers: dict[str, dict[KeywordClassifier, str]] = {}  # condition_id -> answer per taxonomy
+        self.stats = {"hits": 0, "classified": 0, "fetched": 0, "fetch_errors": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS categories ("
+                " condition_id TEXT PRIMARY KEY, market_id TEXT, category TEXT NOT NULL,"
+                " source TEXT NOT NULL, gamma_category TEXT, updated_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS categories_market ON categories(market_id)")
+            self._db = db
+        return self._db
+
+    def _load(self) -> dict[str, tuple[str, str]]:
+        if self._entries is None:
+            with self._lock:
+                rows = self._conn().execute(
+                    "SELECT condition_id, market_id, category, source FROM categories"
+                ).fetchall()
+            self._entries = {cid: (category, source) for cid, _, category, source in rows}
+            self._by_market = {market_id: cid for cid, market_id, _, _ in rows if market_id}
+        return self._entries
+
+    def _set(self, condition_id: str, category: str, source: str, market_id: str = "", gamma: str | None = None):
+        entries = self._load()
+        if entries.get(condition_id) == (category, source) and (
+            not market_id or self._by_market.get(market_id) == condition_id
+        ):
+            return
+        entries[condition_id] = (category, source)
+        self._answers.pop(condition_id, None)
+        if market_id:
+            self._by_market[market_id] = condition_id
+        self._pending[condition_id] = (condition_id, market_id or None, category, source, gamma, time.time())
+
+    def _from_gamma(self, condition_id: str, raw: str | None, title: str, market_id: str = ""):
+        mapped = gamma_category(raw)
+        if mapped:
+            self._set(condition_id, mapped, SOURCE_GAMMA, market_id, raw)
+        else:
+            self._set(condition_id, category_classifier.classify(title), SOURCE_KEYWORDS, market_id, raw)
+
+    def flush(self):
+        """Write entries added or changed since the last flush."""
+        if not self._pending:
+            return
+        rows = list(self._pending.values())
+        self._pending.clear()
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN")
+            db.executemany(
+                "INSERT INTO categories VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(condition_id) DO UPDATE SET "
+                "market_id = COALESCE(excluded.market_id, market_id), category = excluded.category, "
+                "source = excluded.source, gamma_category = excluded.gamma_category, "
+                "updated_at = excluded.updated_at",
+                rows,
+            )
+            db.execute("COMMIT")
+
+    # --- Filling ---
+
+    def put_many(self, markets: Iterable[tuple[str, str, str | None, str]]):
+        """Record (condition_id, market_id, gamma_category, title) rows that came with a Gamma response."""
+        for condition_id, market_id, raw, title in markets:
+            if condition_id:
+                self._from_gamma(condition_id, raw, title, market_id)
+        self.flush()
+
+    async def prefetch(self, titles: dict[str, str], priority: Priority = Priority.BULK):
+        """Ask Gamma about condition ids (condition_id -> title) it hasn't been asked about yet."""
+        entries = self._load()
+        wanted = sorted(cid for cid in titles if cid and entries.get(cid, ("", SOURCE_TITLE))[1] == SOURCE_TITLE)
+        if not wanted:
+            return
+        gate = asyncio.Semaphore(self.max_concurrent_batches)
+
+        async def run(batch: list[str]):
+            async with gate:
+                try:
+                    resp = await transport.get(
+                        f"{GAMMA_API}/markets",
+                        params={"condition_ids": batch, "limit": len(batch)},
+                        priority=priority,
+                        timeout=15,
+                    )
+                    resp.raise_for_status()
+                    records = decode_list(resp.content, MarketRecord)
+                except Exception as e:
+                    self.stats["fetch_errors"] += 1
+                    log("warning", f"Gamma category lookup for {len(batch)} markets failed: {e}",
+                        source="category_map")
+                    return
+            found = set()
+            for record in records:
+                if record.condition_id in titles:
+                    found.add(record.condition_id)
+                    self._from_gamma(record.condition_id, record.category,
+                                     record.question or titles[record.condition_id], record.slug)
+            for cid in batch:
+                if cid not in found:  # Unknown to Gamma: the title is all there is
+                    self._set(cid, category_classifier.classify(titles[cid]), SOURCE_KEYWORDS)
+            self.stats["fetched"] += len(found)
+
+        await asyncio.gather(*(
+            run(wanted[i:i + self.batch_size]) for i in range(0, len(wanted), self.batch_size)
+        ))
+        self.flush()
+
+    # --- Lookups ---
+
+    def category(self, condition_id: str, title: str, classifier: KeywordClassifier | None = None) -> str:
+        """
+        Category for a market in classifier's taxonomy (default: the shared one).
+
+        Known markets answer from the map. A stored keyword category is already the
+        shared taxonomy's answer. Otherwise the title is classified once per market
+        and taxonomy, and Gamma's category replaces the keyword answer only if the
+        taxonomy has it and the keywords landed on a landing-site tab or nothing.
+        Unknown markets are classified and remembered so prefetch() asks Gamma
+        about them later.
+        """
+        classifier = classifier or category_classifier
+        entry = self._load().get(condition_id) if condition_id else None
+        if entry is None:
+            keywords = classifier.classify(title)
+            if condition_id and classifier is category_classifier:
+                self._set(condition_id, keywords, SOURCE_TITLE)
+                self.stats["classified"] += 1
+            return keywords
+        self.stats["hits"] += 1
+        stored, source = entry
+        if source != SOURCE_GAMMA and classifier is category_classifier:
+            return stored
+        answers = self._answers.setdefault(condition_id, {})
+        answer = answers.get(classifier)
+        if answer is None:
+            keywords = classifier.classify(title)
+            finer = keywords != classifier.default and keywords not in LANDING_CATEGORIES
+            gamma_stands = source == SOURCE_GAMMA and stored in classifier.categories and not finer
+            answer = answers[classifier] = stored if gamma_stands else keywords
+        return answer
+
+    def for_market(self, market_id: str) -> str | None:
+        """Category for a market slug, if the map has seen it."""
+        entries = self._load()
+        cid = self._by_market.get(market_id)
+        entry = entries.get(cid) if cid else None
+        return entry[0] if entry else None
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+
+category_map = CategoryMap()
@@ -0,0 +1,82 @@
+"""
+Market Cache — Process-wide snapshot of market rows shared by every pipeline stage.
+
+One entry per market, reachable by slug (market_id), YES/NO token id and
+condition id. After each scan, MarketScanner.sync_to_supabase replaces the
+snapshot with the rows it just wrote. Entries live `ttl_scan_intervals` scan
+intervals, so between scans every scanned market is served from memory.
+Lookups that miss (or whose entry has outlived the TTL) fall back to
+MarketQueries.get_market_by_id. Misses are cached too, so an unknown id costs
+one query per TTL, not one per caller.
+
+Entries are shared dicts — treat them as read-only.
+"""
+from __future__ import annotations
+
+import time
+
+from config import CONVICTION_CONFIG, MARKET_CACHE_CONFIG
+from db.queries import MarketQueries
+
+
+class MarketCache:
+    def __init__(self, ttl_seconds: float | None = None):
+        if ttl_seconds is None:
+            scan_interval = CONVICTION_CONFIG.get("scan_interval_minutes", 360) * 60
+            ttl_seconds = MARKET_CACHE_CONFIG["ttl_scan_intervals"] * scan_interval
+        self.ttl = ttl_seconds
+        self._entries: dict[str, tuple[float, dict | None]] = {}
+        self.stats = {"hits": 0, "misses": 0, "loads": 0, "invalidations": 0}
+
+    @staticmethod
+    def _keys(market: dict, condition_id: str | None = None) -> list[str]:
+        keys = [market.get("market_id"), market.get("yes_token"), market.get("no_token"), condition_id]
+        return [k for k in keys if k]
+
+    def put(self, market: dict, condition_id: str | None = None):
+        """Index one market row under all of its ids."""
+        expires = time.time() + self.ttl
+        for key in self._keys(market, condition_id):
+            self._entries[key] = (expires, market)
+
+    def replace(self, markets: list[dict], condition_ids: dict[str, str] | None = None):
+        """Drop the whole snapshot and load a fresh one (condition_ids maps market_id -> condition id)."""
+        self.invalidate()
+        condition_ids = condition_ids or {}
+        for market in markets:
+            self.put(market, condition_ids.get(market.get("market_id")))
+
+    def invalidate(self, keys: list[str] | None = None):
+        """Forget everything, or just the given ids."""
+        self.stats["invalidations"] += 1
+        if keys is None:
+            self._entries.clear()
+            return
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def peek(self, key: str) -> dict | None:
+        """Cached market for any of its ids, without falling back to the database."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.time():
+            return entry[1]
+        return None
+
+    def get(self, key: str) -> dict | None:
+        """Market row by slug, token id or condition id; loads from Supabase on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.time():
+            self.stats["hits"] += 1
+            return entry[1]
+        self.stats["misses"] += 1
+        market = MarketQueries.get_market_by_id(key)
+        self.stats["loads"] += 1
+        if market is None:
+            self._entries[key] = (time.time() + self.ttl, None)
+        else:
+            self.put(market)
+            self._entries[key] = (time.time() + self.ttl, market)
+        return market
+
+
+market_cache = MarketCache()
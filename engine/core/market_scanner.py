@@ -3,13 +3,21 @@ Market Scanner - Discover and filter Polymarket markets
 """
 from __future__ import annotations
 
-import requests
 import time
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
-from config import GAMMA_API, CLOB_HOST
+from config import GAMMA_API, MARKET_SCANNER_CONFIG, BOOK_CACHE_CONFIG
+from utils.http import transport
+from core.book_cache import book_cache
+from core.category_map import category_map
+from core.market_cache import market_cache
+from core.market_table import table_for
+from core.resolved_markets import resolved_markets
+from utils.pagination import iter_pages
+from utils.rate_limiter import Priority
+from utils.schemas import MarketRecord, decode, decode_list
 
 
 @dataclass
@@ -26,6 +34,7 @@ class Market:
     no_price: float
     category: str
     description: str = ""
+    condition_id: str = ""
     
     @property
     def hours_to_resolution(self) -> float:
@@ -50,34 +59,26 @@ class MarketScanner:
     """
     
     def __init__(self):
-        self.cache = {}
-        self.cache_ttl = 60  # Cache for 60 seconds
         self.last_scan = 0
+        self.condition_ids: dict[str, str] = {}  # slug -> condition id from the last scan
     
-    def get_all_markets(self, limit: int = 500) -> List[Market]:
+    async def get_all_markets(self, limit: int | None = 500) -> List[Market]:
         """
-        Fetch all active markets with pagination.
+        Fetch all active markets, several Gamma pages in flight at once.
+
+        Pages are parsed in offset order as they arrive, overlapping parsing
+        with the requests still on the wire.
 
         Args:
-            limit: Target number of markets to return
+            limit: Number of usable (parsed, not pruned) markets to return (None = the whole active universe)
 
         Returns:
             List of Market objects
         """
         try:
-            # Check cache
-            cache_key = "all_markets"
-            if cache_key in self.cache:
-                cached_time, cached_data = self.cache[cache_key]
-                if time.time() - cached_time < self.cache_ttl:
-                    return cached_data
-
-            markets = []
-            page_size = 100  # Gamma API max per page
-            offset = 0
+            page_size = MARKET_SCANNER_CONFIG["page_size"]
 
-            while len(markets) < limit:
-                url = f"{GAMMA_API}/markets"
+            async def fetch_page(offset: int) -> list[MarketRecord]:
                 params = {
                     "limit": page_size,
                     "offset": offset,
@@ -85,47 +86,58 @@ class MarketScanner:
                     "active": True,
                     "_sort": "-volume24hr"  # Sort by volume
                 }
-
-                response = requests.get(url, params=params, timeout=15)
+                for _ in range(MARKET_SCANNER_CONFIG["max_retries"]):
+                    response = await transport.get(
+                        f"{GAMMA_API}/markets", params=params, timeout=15, priority=Priority.INTERACTIVE
+                    )
+                    if response.status_code != 429:  # The transport already paused the host for Retry-After
+                        break
                 response.raise_for_status()
+                return decode_list(response.content, MarketRecord)
 
-                markets_data = response.json()
-                if not markets_data:
-                    break  # No more markets
-
-                for m in markets_data:
-                    try:
-                        market = self._parse_market(m)
-                        if market:
-                            markets.append(market)
-                    except Exception as e:
-                        continue
-
-                offset += page_size
-
-                # If we got fewer than page_size, we've reached the end
-                if len(markets_data) < page_size:
-                    break
-
-            # Cache results
-            self.cache[cache_key] = (time.time(), markets)
+            # A universe scan knows it needs many pages, so it skips the lone first page. A limited
+            # scan keeps no more pages in flight than the limit needs.
+            fan_out = MARKET_SCANNER_CONFIG["max_concurrent_pages"]
+            if limit is not None:
+                fan_out = max(1, min(fan_out, -(-limit // page_size)))
+            # No offset cap: rows that don't parse or are pruned don't count, so paging goes on
+            # until `limit` markets are accepted (or Gamma runs out)
+            pages = iter_pages(fetch_page, page_size=page_size, max_items=None, fan_out=fan_out, initial=fan_out)
+            markets = []
+            pruned = 0
+            now = time.time()
+            try:
+                async for page in pages:
+                    for m in page:
+                        try:
+                            market = self._parse_market(m)
+                            if market and resolved_markets.is_done(market.slug, market.end_date, now):
+                                pruned += 1  # Resolved or past its end date: no snapshot, book or signal work
+                            elif market:
+                                markets.append(market)
+                        except Exception as e:
+                            continue
+                    if limit is not None and len(markets) >= limit:
+                        break
+            finally:
+                await pages.aclose()
+            if limit is not None:
+                markets = markets[:limit]
 
-            print(f"✅ Scanned {len(markets)} active markets")
+            print(f"✅ Scanned {len(markets)} active markets ({pruned} resolved/expired pruned)")
             return markets
 
         except Exception as e:
+            # Raised, not swallowed into []: an empty universe would be synced as "every market closed"
             print(f"❌ Error scanning markets: {e}")
-            return []
+            raise
     
-    def _parse_market(self, data: Dict) -> Optional[Market]:
-        """Parse market data from API"""
+    def _parse_market(self, data: MarketRecord) -> Optional[Market]:
+        """Parse a decoded Gamma market record"""
         try:
-            import json as json_lib
-            
             # Extract token IDs from clobTokenIds (JSON string)
-            token_ids_str = data.get("clobTokenIds", "[]")
             try:
-                token_ids = json_lib.loads(token_ids_str)
+                token_ids = decode(data.clob_token_ids or "[]", list[str])
             except:
                 return None
             
@@ -136,15 +148,14 @@ class MarketScanner:
             no_token = token_ids[1]
             
             # Parse end date (endDate, not end_date_iso)
-            end_date_str = data.get("endDate")
+            end_date_str = data.end_date
             if not end_date_str:
                 return None
             end_date = datetime.fromisoformat(end_date_str.replace("Z", "+00:00"))
             
             # Get prices from outcomePrices (JSON string)
-            prices_str = data.get("outcomePrices", "[0.5, 0.5]")
             try:
-                prices = json_lib.loads(prices_str)
+                prices = decode(data.outcome_prices or "[0.5, 0.5]", list[float])
                 yes_price = float(prices[0]) if prices else 0.5
                 no_price = float(prices[1]) if len(prices) > 1 else 0.5
             except:
@@ -152,84 +163,84 @@ class MarketScanner:
                 no_price = 0.5
             
             return Market(
-                slug=data.get("slug", ""),
-                question=data.get("question", ""),
+                slug=data.slug,
+                question=data.question,
                 yes_token=yes_token,
                 no_token=no_token,
                 end_date=end_date,
-                volume=float(data.get("volume", 0)),
-                liquidity=float(data.get("liquidity", 0)),
+                volume=data.volume,
+                liquidity=data.liquidity,
                 yes_price=yes_price,
                 no_price=no_price,
-                category=data.get("category", "other"),
-                description=data.get("description", "")
+                category=data.category,
+                description=data.description,
+                condition_id=data.condition_id
             )
         
         except Exception as e:
             print(f"⚠️ Error parsing market: {e}")
             return None
     
+    # Filters run as NumPy masks over a columnar table built once per scan (core/market_table.py);
+    # combine masks directly on table_for(markets) for multi-condition screens.
+
     def filter_crypto_markets(self, markets: List[Market]) -> List[Market]:
         """Filter for crypto-related markets"""
-        keywords = ["bitcoin", "btc", "ethereum", "eth", "crypto", "blockchain", 
-                   "defi", "nft", "token", "coin", "binance", "coinbase"]
-        
-        return [m for m in markets if any(kw in m.question.lower() for kw in keywords)]
+        table = table_for(markets)
+        return table.select(table.crypto())
     
     def filter_high_volume(self, markets: List[Market], min_volume: float = 10000) -> List[Market]:
         """Filter for high-volume markets"""
-        return [m for m in markets if m.volume >= min_volume]
+        table = table_for(markets)
+        return table.select(table.high_volume(min_volume))
     
     def filter_near_resolution(self, markets: List[Market], max_hours: float = 72) -> List[Market]:
         """Filter for markets resolving soon"""
-        return [m for m in markets if m.hours_to_resolution <= max_hours]
+        table = table_for(markets)
+        return table.select(table.near_resolution(max_hours))
     
     def filter_high_confidence(self, markets: List[Market], min_prob: float = 0.95) -> List[Market]:
         """Filter for near-certain outcomes (bond opportunities)"""
-        return [m for m in markets if m.yes_price >= min_prob or m.no_price >= min_prob]
+        table = table_for(markets)
+        return table.select(table.high_confidence(min_prob))
     
     def filter_mispriced(self, markets: List[Market], max_sum: float = 0.98, min_sum: float = 1.02) -> List[Market]:
         """Filter for probability sum anomalies"""
-        return [m for m in markets if (m.yes_price + m.no_price) < max_sum or 
-                                       (m.yes_price + m.no_price) > min_sum]
+        table = table_for(markets)
+        return table.select(table.mispriced(max_sum, min_sum))
     
-    def get_orderbook(self, token_id: str) -> Dict:
+    async def get_orderbook(self, token_id: str) -> Dict:
         """
-        Get orderbook for a token
+        Get orderbook for a token (served from the L2 book cache while fresh)
         
         Returns:
             {"best_bid": float, "best_ask": float, "spread": float}
         """
-        try:
-            url = f"{CLOB_HOST}/book"
-            response = requests.get(url, params={"token_id": token_id}, timeout=5)
-            response.raise_for_status()
-            
-            book = response.json()
-            bids = book.get("bids", [])
-            asks = book.get("asks", [])
-            
-            best_bid = float(bids[0]["price"]) if bids else 0.0
-            best_ask = float(asks[0]["price"]) if asks else 1.0
-            
-            return {
-                "best_bid": best_bid,
-                "best_ask": best_ask,
-                "spread": best_ask - best_bid,
-                "bid_size": float(bids[0]["size"]) if bids else 0.0,
-                "ask_size": float(asks[0]["size"]) if asks else 0.0
-            }
-        
-        except Exception as e:
-            print(f"⚠️ Error fetching orderbook: {e}")
+        book = await book_cache.get(token_id)
+        if book is None:
             return {"best_bid": 0, "best_ask": 1.0, "spread": 1.0}
+        return book.top()
     
-    def scan(self, limit: int = 200) -> list[dict]:
+    async def warm_books(self, markets: List[Market], min_liquidity: float | None = None):
+        """Batch-fetch YES/NO books for every liquid market into the shared L2 book cache."""
+        if min_liquidity is None:
+            min_liquidity = BOOK_CACHE_CONFIG["warm_min_liquidity"]
+        table = table_for(markets)
+        tokens = []
+        for m in table.select(table.liquidity >= min_liquidity):
+            tokens.extend((m.yes_token, m.no_token))
+        await book_cache.refresh(tokens, priority=Priority.INTERACTIVE)
+    
+    async def scan(self, limit: int | None = 200) -> list[dict]:
         """
         Scan markets and return as dicts for the EasyPoly pipeline.
         Bridge between the original Market dataclass and the dict-based pipeline.
+        limit=None scans the full active universe.
         """
-        markets = self.get_all_markets(limit=limit)
+        markets = await self.get_all_markets(limit=limit)
+        await self.warm_books(markets)
+        self.condition_ids = {m.slug: m.condition_id for m in markets if m.condition_id}
+        category_map.put_many((m.condition_id, m.slug, m.category, m.question) for m in markets)
         return [
             {
                 "market_id": m.slug,
@@ -248,25 +259,36 @@ class MarketScanner:
             for m in markets
         ]
 
-    def sync_to_supabase(self, markets: list[dict]) -> None:
-        """Upsert scanned markets to Supabase."""
+    def sync_to_supabase(self, markets: list[dict]) -> dict:
+        """Write changed markets to Supabase, then swap them into the shared market cache."""
         try:
-            from db.queries import MarketQueries
-            MarketQueries.upsert_markets(markets)
+            from core.market_sync import market_sync
+            stats = market_sync.sync(markets)
+            if stats["held"]:
+                # A partial scan: the markets it missed are still active, so keep their cache entries
+                for market in markets:
+                    market_cache.put(market, self.condition_ids.get(market["market_id"]))
+            else:
+                market_cache.replace(markets, self.condition_ids)
             from utils.logger import log
-            log("info", f"Synced {len(markets)} markets to Supabase", source="market_scanner")
+            log("info",
+                f"Synced markets to Supabase: {stats['written']} written, {stats['skipped']} unchanged, "
+                f"{stats['deactivated']} deactivated, {stats['held']} held (partial scan)",
+                source="market_scanner")
+            return stats
         except Exception as e:
             from utils.logger import log
             log("warning", f"Failed to sync markets: {e}", source="market_scanner")
+            return {"written": 0, "skipped": 0, "deactivated": 0, "held": 0}
 
     def get_market_details(self, slug: str) -> Optional[Market]:
         """Get details for a specific market"""
         try:
             url = f"{GAMMA_API}/markets"
-            response = requests.get(url, params={"slug": slug}, timeout=5)
+            response = transport.sync_client().get(url, params={"slug": slug}, timeout=5)
             response.raise_for_status()
             
-            markets = response.json()
+            markets = decode_list(response.content, MarketRecord)
             if markets:
                 return self._parse_market(markets[0])
             return None
@@ -281,6 +303,8 @@ class MarketScanner:
 # ============================================================================
 
 if __name__ == "__main__":
+    import asyncio
+
     scanner = MarketScanner()
     
     print("\n" + "="*70)
@@ -288,7 +312,7 @@ if __name__ == "__main__":
     print("="*70)
     
     # Scan all markets
-    markets = scanner.get_all_markets(limit=50)
+    markets = asyncio.run(scanner.get_all_markets(limit=50))
     print(f"\n✅ Found {len(markets)} active markets")
     
     # Filter crypto markets
@@ -0,0 +1,358 @@
+"""
+Market Stream — Live YES/NO prices from the CLOB market channel.
+
+Subscribes to the websocket market channel for every tracked token and keeps
+best bid, best ask and last trade per token in memory. A token's price is the
+midpoint while the spread is at most `mid_max_spread`, otherwise the last
+trade (the rule Polymarket itself displays). Listeners get
+(market_id, yes_price) whenever a market's YES price moves; PickResolver and
+OpportunityDetector register here from run.py.
+
+Tokens are spread over connections of `tokens_per_connection`. Changing the
+tracked set only restarts the connections whose tokens changed. Each
+connection sends a text PING every `ping_interval_seconds` and is treated as
+dead after `stale_seconds` of silence. A dead connection reconnects with
+jittered exponential backoff. On reconnect, its tokens are resynced: the
+channel replays a book snapshot per token, and tokens it missed are refetched
+through the batched REST book endpoint. Prices only count as live while their
+connection is up. A malformed event is counted and skipped without touching its
+connection. Callers fall back to the last scan when yes_price returns
+None.
+
+Run against the replay stand-in with CLOB_WS=ws://127.0.0.1:8787/ws (see
+utils/replay.py).
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import random
+import time
+from typing import Any, Callable
+
+import msgspec
+import websockets
+
+from config import CLOB_WS, MARKET_STREAM_CONFIG
+from core.book_cache import L2Book, book_cache
+from utils.http import transport
+from utils.logger import log
+from utils.rate_limiter import Priority
+from utils.schemas import OrderBook
+
+
+class _TokenState:
+    __slots__ = ("best_bid", "best_ask", "last_trade", "updated_at")
+
+    def __init__(self):
+        self.best_bid: float | None = None
+        self.best_ask: float | None = None
+        self.last_trade: float | None = None
+        self.updated_at = 0.0
+
+
+class MarketStream:
+    def __init__(self, url: str | None = None, config: dict | None = None):
+        cfg = {**MARKET_STREAM_CONFIG, **(config or {})}
+        self.url = (url or CLOB_WS).rstrip("/") + "/market"
+        self.enabled = cfg["enabled"]
+        self.per_connection = cfg["tokens_per_connection"]
+        self.ping_interval = cfg["ping_interval_seconds"]
+        self.stale_seconds = cfg["stale_seconds"]
+        self.backoff_min = cfg["reconnect_min_seconds"]
+        self.backoff_max = cfg["reconnect_max_seconds"]
+        self.mid_max_spread = cfg["mid_max_spread"]
+
+        self._outcomes: dict[str, tuple[str, str]] = {}        # token_id -> (market_id, "YES"/"NO")
+        self._markets: dict[str, tuple[str, str]] = {}         # market_id -> (yes_token, no_token)
+        self._state: dict[str, _TokenState] = {}
+        self._yes: dict[str, float] = {}                       # market_id -> last YES price handed to listeners
+        self._shards: list[tuple[frozenset[str], asyncio.Task | None]] = []
+        self._token_shard: dict[str, int] = {}
+        self._live: set[asyncio.Task] = set()                 # Connection tasks that are currently subscribed
+        self._listeners: list[Callable[[str, float], Any]] = []
+        self._background: set[asyncio.Task] = set()           # Resyncs and async listeners still running
+        self._running = False
+        self.counters = {
+            "connects": 0, "reconnects": 0, "messages": 0, "updates": 0, "resyncs": 0, "errors": 0, "bad_events": 0,
+        }
+
+    # --- Tracking ---
+
+    def track(self, markets: list[dict]):
+        """Follow the YES/NO tokens of these markets (replaces the tracked set)."""
+        outcomes, pairs = {}, {}
+        for m in markets:
+            market_id, yes, no = m.get("market_id"), m.get("yes_token"), m.get("no_token")
+            if not market_id or not yes:
+                continue
+            pairs[market_id] = (yes, no or "")
+            outcomes[yes] = (market_id, "YES")
+            if no:
+                outcomes[no] = (market_id, "NO")
+        self._outcomes, self._markets = outcomes, pairs
+        for token in [t for t in self._state if t not in outcomes]:
+            del self._state[token]
+        if self._running:
+            self._reshard()
+
+    def add_listener(self, listener: Callable[[str, float], Any]):
+        """Call listener(market_id, yes_price) on every YES price move (coroutine functions are scheduled)."""
+        self._listeners.append(listener)
+
+    # --- Prices ---
+
+    def _is_live(self, token_id: str) -> bool:
+        shard = self._token_shard.get(token_id)
+        return shard is not None and self._shards[shard][1] in self._live
+
+    def price(self, token_id: str) -> float | None:
+        """Live price for a token, or None if it isn't streamed right now."""
+        state = self._state.get(token_id)
+        if state is None or not self._is_live(token_id):
+            return None
+        bid, ask = state.best_bid, state.best_ask
+        if bid is not None and ask is not None and ask - bid <= self.mid_max_spread:
+            return (bid + ask) / 2
+        if state.last_trade is not None:
+            return state.last_trade
+        if bid is not None and ask is not None:
+            return (bid + ask) / 2
+        return None
+
+    def yes_price(self, market_id: str) -> float | None:
+        """Live YES price for a market (derived from the NO token if that's all there is)."""
+        pair = self._markets.get(market_id)
+        if pair is None:
+            return None
+        yes = self.price(pair[0])
+        if yes is not None:
+            return yes
+        no = self.price(pair[1]) if pair[1] else None
+        return None if no is None else 1 - no
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        """Open connections for the tracked tokens; later track() calls re-balance them."""
+        if not self.enabled or self._running:
+            return
+        self._running = True
+        self._reshard()
+        log("info", f"Market stream started ({len(self._outcomes)} tokens, {len(self._shards)} connections)",
+            source="market_stream")
+
+    async def stop(self):
+        self._running = False
+        tasks = [task for _, task in self._shards if task is not None] + list(self._background)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._shards, self._token_shard = [], {}
+        self._live.clear()
+
+    def _spawn(self, awaitable, what: str):
+        """Run a fire-and-forget task, holding a reference until it finishes and logging its failure."""
+        task = asyncio.ensure_future(awaitable)
+        self._background.add(task)
+
+        def done(t: asyncio.Task):
+            self._background.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                self.counters["errors"] += 1
+                log("warning", f"{what} failed: {t.exception()!r}", source="market_stream")
+
+        task.add_done_callback(done)
+        return task
+
+    def _reshard(self):
+        """Keep each token on its current connection; only connections whose token set changed restart."""
+        wanted = set(self._outcomes)
+        shards = [set(tokens & wanted) for tokens, _ in self._shards]
+        placed = set().union(*shards) if shards else set()
+        new = sorted(wanted - placed)
+        for tokens in shards:
+            while new and len(tokens) < self.per_connection:
+                tokens.add(new.pop())
+        while new:
+            shards.append(set(new[:self.per_connection]))
+            new = new[self.per_connection:]
+
+        updated: list[tuple[frozenset[str], asyncio.Task | None]] = []
+        for i, tokens in enumerate(shards):
+            frozen = frozenset(tokens)
+            old_tokens, task = self._shards[i] if i < len(self._shards) else (frozenset(), None)
+            if frozen != old_tokens or task is None or task.done():
+                if task is not None:
+                    task.cancel()
+                task = asyncio.ensure_future(self._run_connection(i, frozen)) if frozen else None
+            updated.append((frozen, task))
+        self._shards = updated
+        self._token_shard = {token: i for i, (tokens, _) in enumerate(updated) for token in tokens}
+
+    async def _run_connection(self, shard: int, tokens: frozenset[str]):
+        me = asyncio.current_task()
+        delay = self.backoff_min
+        connected_before = False
+        while True:
+            try:
+                async with websockets.connect(self.url, ping_interval=None, open_timeout=10, max_size=None) as ws:
+                    await ws.send(msgspec.json.encode({"assets_ids": sorted(tokens), "type": "market"}).decode())
+                    connected_at = time.time()
+                    self.counters["connects"] += 1
+                    self._live.add(me)
+                    delay = self.backoff_min
+                    if connected_before:
+                        self.counters["reconnects"] += 1
+                        self._spawn(self._resync(tokens, connected_at), f"Resync of connection {shard}")
+                    connected_before = True
+                    await self._pump(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters["errors"] += 1
+                log("warning", f"Market stream connection {shard} dropped: {e!r}; retrying in ~{delay:.0f}s",
+                    source="market_stream")
+            finally:
+                self._live.discard(me)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            delay = min(self.backoff_max, delay * 2)
+
+    async def _pump(self, ws):
+        async def ping():
+            while True:
+                await asyncio.sleep(self.ping_interval)
+                await ws.send("PING")
+
+        pinger = self._spawn(ping(), "Keepalive ping")  # Its failure is logged, not left on the task
+        try:
+            while True:
+                raw = await asyncio.wait_for(ws.recv(), timeout=self.stale_seconds)
+                if raw == "PONG":
+                    continue
+                self.counters["messages"] += 1
+                if transport.recorder is not None:
+                    transport.recorder.record_ws("market", raw)
+                self._handle(raw)
+        finally:
+            pinger.cancel()
+
+    async def _resync(self, tokens: frozenset[str], connected_at: float):
+        """Refill tokens the reconnect snapshot didn't cover, from the REST book endpoint."""
+        await asyncio.sleep(min(self.ping_interval, 5))
+        missed = [
+            t for t in tokens
+            if t in self._outcomes and (t not in self._state or self._state[t].updated_at < connected_at)
+        ]
+        if not missed:
+            return
+        self.counters["resyncs"] += 1
+        await book_cache.refresh(missed, priority=Priority.REALTIME, force=True)
+        touched = set()
+        for token in missed:
+            book = book_cache.peek(token)
+            if book is not None:
+                self._set_book(token, book)
+                touched.add(token)
+        self._notify(touched)
+
+    # --- Events ---
+
+    def _handle(self, raw: str | bytes):
+        try:
+            payload = msgspec.json.decode(raw)
+        except msgspec.DecodeError:
+            return
+        events = payload if isinstance(payload, list) else [payload]
+        touched: set[str] = set()
+        for event in events:
+            if not isinstance(event, dict):
+                continue
+            try:
+                self._handle_event(event, touched)
+            except (msgspec.ValidationError, KeyError, TypeError, ValueError, AttributeError) as e:
+                # One malformed event is skipped; it must not take the connection down with it
+                self.counters["bad_events"] += 1
+                log("debug", f"Skipped malformed {event.get('event_type')} event: {e!r}", source="market_stream")
+        self._notify(touched)
+
+    def _handle_event(self, event: dict, touched: set[str]):
+        kind = event.get("event_type")
+        if kind == "book":
+            book = msgspec.convert(event, OrderBook, strict=False)
+            if book.asset_id in self._outcomes:
+                book_cache.put(book)
+                self._set_book(book.asset_id, L2Book.from_orderbook(book))
+                touched.add(book.asset_id)
+        elif kind == "price_change":
+            changes = event.get("price_changes")
+            if changes is None:  # Older payloads: one asset, a list of level changes
+                changes = [{**c, "asset_id": event.get("asset_id")} for c in event.get("changes", [])]
+            for change in changes:
+                token = change.get("asset_id")
+                if token in self._outcomes:
+                    self._apply_change(token, change)
+                    touched.add(token)
+        elif kind == "last_trade_price":
+            token = event.get("asset_id")
+            if token in self._outcomes:
+                price = float(event["price"])
+                state = self._token(token)
+                state.last_trade = price
+                state.updated_at = time.time()
+                touched.add(token)
+
+    def _token(self, token_id: str) -> _TokenState:
+        state = self._state.get(token_id)
+        if state is None:
+            state = self._state[token_id] = _TokenState()
+        return state
+
+    def _set_book(self, token_id: str, book: L2Book):
+        state = self._token(token_id)
+        state.best_bid = book.bids[0][0] if book.bids else None
+        state.best_ask = book.asks[0][0] if book.asks else None
+        state.updated_at = time.time()
+
+    def _apply_change(self, token_id: str, change: dict):
+        price, size = float(change["price"]), float(change["size"])
+        if "best_bid" in change or "best_ask" in change:
+            bid, ask = change.get("best_bid"), change.get("best_ask")
+            best_bid = float(bid) if bid not in (None, "") else None
+            best_ask = float(ask) if ask not in (None, "") else None
+            book_cache.apply_change(token_id, change.get("side", ""), price, size)
+            state = self._token(token_id)
+            state.best_bid, state.best_ask = best_bid, best_ask
+            state.updated_at = time.time()
+            return
+        book_cache.apply_change(token_id, change.get("side", ""), price, size)
+        book = book_cache.peek(token_id)
+        if book is not None:
+            self._set_book(token_id, book)
+
+    def _notify(self, tokens: set[str]):
+        markets = {self._outcomes[t][0] for t in tokens if t in self._outcomes}
+        for market_id in markets:
+            price = self.yes_price(market_id)
+            if price is None or self._yes.get(market_id) == price:
+                continue
+            self._yes[market_id] = price
+            self.counters["updates"] += 1
+            for listener in self._listeners:
+                try:
+                    result = listener(market_id, price)
+                    if inspect.isawaitable(result):
+                        self._spawn(result, f"Price listener for {market_id}")
+                except Exception as e:
+                    log("warning", f"Price listener failed for {market_id}: {e}", source="market_stream")
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "tokens": len(self._outcomes),
+            "connections": len(self._shards),
+            "live_connections": len(self._live),
+        }
+
+
+market_stream = MarketStream()
@@ -0,0 +1,95 @@
+"""
+Market Sync — Diff-based upsert of scanned markets into ep_markets_raw.
+
+Each market row gets a fingerprint over the columns that move: YES/NO price,
+volume, liquidity and end date. Only rows whose fingerprint changed since the
+last sync are upserted (in bounded chunks). Markets that were active at the
+last sync but are missing from this scan are deactivated in one statement,
+unless the scan is implausibly small: fewer markets than `min_sync_fraction`
+of the active rows (an empty scan included) looks like a partial Gamma
+response, not a mass resolution, so nothing is deactivated that time.
+On the first sync after a restart, the fingerprints are seeded from the
+active rows already in Supabase, so a restart doesn't rewrite the table.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+
+from config import MARKET_SCANNER_CONFIG
+from db.queries import MarketQueries
+from utils.logger import log
+
+
+def _end_ts(value) -> float:
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def fingerprint(row: dict) -> str:
+    """Stable digest of the columns a sync needs to write (prices to 4dp, dollar amounts to $1)."""
+    parts = (
+        f"{float(row.get('yes_price') or 0):.4f}",
+        f"{float(row.get('no_price') or 0):.4f}",
+        f"{float(row.get('volume') or 0):.0f}",
+        f"{float(row.get('liquidity') or 0):.0f}",
+        f"{_end_ts(row.get('end_date')):.0f}",
+    )
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+
+
+class MarketSync:
+    def __init__(self, chunk_size: int | None = None, min_sync_fraction: float | None = None):
+        self.chunk_size = chunk_size or MARKET_SCANNER_CONFIG["sync_chunk_size"]
+        self.min_sync_fraction = (
+            MARKET_SCANNER_CONFIG["min_sync_fraction"] if min_sync_fraction is None else min_sync_fraction
+        )
+        self._fingerprints: dict[str, str] | None = None  # market_id -> fingerprint of the row in Supabase
+
+    def _known(self) -> dict[str, str]:
+        if self._fingerprints is None:
+            self._fingerprints = {
+                row["market_id"]: fingerprint(row) for row in MarketQueries.get_active_market_states()
+            }
+        return self._fingerprints
+
+    def sync(self, markets: list[dict]) -> dict:
+        """Write changed rows and deactivate dropped ones. Returns written/skipped/deactivated/held counts."""
+        known = self._known()
+        unique = {m["market_id"]: m for m in markets}  # A repeated id would fail the upsert
+        current = {market_id: fingerprint(m) for market_id, m in unique.items()}
+        changed = [m for market_id, m in unique.items() if known.get(market_id) != current[market_id]]
+        dropped = [market_id for market_id in known if market_id not in current]
+        held = 0
+        if dropped and len(unique) < len(known) * self.min_sync_fraction:
+            log("warning",
+                f"Scan returned {len(unique)} markets against {len(known)} active; "
+                f"not deactivating {len(dropped)} missing markets",
+                source="market_sync")
+            held, dropped = len(dropped), []
+
+        for i in range(0, len(changed), self.chunk_size):
+            chunk = changed[i:i + self.chunk_size]
+            MarketQueries.upsert_markets(chunk, chunk_size=self.chunk_size)
+            # Only what actually reached Supabase counts as known
+            known.update((m["market_id"], current[m["market_id"]]) for m in chunk)
+
+        MarketQueries.deactivate_markets(dropped)
+        for market_id in dropped:
+            del known[market_id]
+
+        return {
+            "written": len(changed), "skipped": len(unique) - len(changed),
+            "deactivated": len(dropped), "held": held,
+        }
+
+    def reset(self):
+        """Forget fingerprints (next sync re-seeds from Supabase)."""
+        self._fingerprints = None
+
+
+market_sync = MarketSync()
@@ -0,0 +1,95 @@
+"""
+Market Table — Struct-of-arrays view of one market scan for vectorized screening.
+
+Built once per scan from the Market objects. Every filter returns a boolean
+mask over the rows, so screens compose with & | ~ and cost one NumPy pass
+each, regardless of how many markets the scan covers:
+
+    t = MarketTable(markets)
+    picks = t.select(t.high_volume(10_000) & t.near_resolution(72) & ~t.crypto())
+"""
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from utils.classifier import KeywordClassifier
+
+if TYPE_CHECKING:
+    from core.market_scanner import Market
+
+CRYPTO_KEYWORDS = (
+    "bitcoin", "btc", "ethereum", "eth", "crypto", "blockchain",
+    "defi", "nft", "token", "coin", "binance", "coinbase",
+)
+_crypto = KeywordClassifier({"crypto": list(CRYPTO_KEYWORDS)})
+
+
+class MarketTable:
+    def __init__(self, markets: list[Market]):
+        n = len(markets)
+        self.markets = markets
+        self.volume = np.fromiter((m.volume for m in markets), dtype=np.float64, count=n)
+        self.liquidity = np.fromiter((m.liquidity for m in markets), dtype=np.float64, count=n)
+        self.yes_price = np.fromiter((m.yes_price for m in markets), dtype=np.float64, count=n)
+        self.no_price = np.fromiter((m.no_price for m in markets), dtype=np.float64, count=n)
+        self.end_ts = np.fromiter((m.end_date.timestamp() for m in markets), dtype=np.float64, count=n)
+        self.is_crypto = np.fromiter(
+            (_crypto.classify(m.question) == "crypto" for m in markets), dtype=bool, count=n
+        )
+
+    def __len__(self) -> int:
+        return len(self.markets)
+
+    # --- Columns ---
+
+    def hours_to_resolution(self, now: float | None = None) -> np.ndarray:
+        """Hours until each market resolves, against a single clock reading."""
+        return (self.end_ts - (time.time() if now is None else now)) / 3600
+
+    # --- Masks ---
+
+    def crypto(self) -> np.ndarray:
+        return self.is_crypto
+
+    def high_volume(self, min_volume: float = 10000) -> np.ndarray:
+        return self.volume >= min_volume
+
+    def near_resolution(self, max_hours: float = 72, now: float | None = None) -> np.ndarray:
+        return self.hours_to_resolution(now) <= max_hours
+
+    def high_confidence(self, min_prob: float = 0.95) -> np.ndarray:
+        return (self.yes_price >= min_prob) | (self.no_price >= min_prob)
+
+    def mispriced(self, max_sum: float = 0.98, min_sum: float = 1.02) -> np.ndarray:
+        total = self.yes_price + self.no_price
+        return (total < max_sum) | (total > min_sum)
+
+    # --- Results ---
+
+    def select(self, mask: np.ndarray) -> list[Market]:
+        """Markets where mask is True, in scan order."""
+        markets = self.markets
+        return [markets[i] for i in np.flatnonzero(mask)]
+
+
+_last: MarketTable | None = None
+
+
+def table_for(markets: list[Market]) -> MarketTable:
+    """
+    Table for the list's current contents, reusing the last one built while it
+    holds the same Market objects in the same order (filters chain on the same
+    scan). The table keeps its own copy of the list, so appending to or
+    removing from the caller's list in place means a rebuild, not a stale table.
+    """
+    global _last
+    if (
+        _last is None
+        or len(_last.markets) != len(markets)
+        or any(a is not b for a, b in zip(_last.markets, markets))
+    ):
+        _last = MarketTable(list(markets))
+    return _last
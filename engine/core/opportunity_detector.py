@@ -6,163 +6,104 @@ Signal types:
 2. Statistical edge — Mean reversion, momentum, liquidity imbalance
 3. Timing edge — Near-resolution markets
 4. Crowd behavior — Overreaction, extreme sentiment
+
+Live YES prices arrive from the market stream through on_price; scan_all
+prices markets at a streamed value under live_max_age seconds old instead of
+the scan snapshot. Price history is read from the in-memory ring buffers in
+core/price_history.py, hydrated from ep_price_snapshots once per market.
+scan_all evaluates every signal for all liquid markets in one batch through
+the signal registry in core/signal_engine.py, which also times each signal.
+The per-market reference checks its history signals must match live in
+benchmark_signals.py.
 """
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from db.queries import MarketQueries, OpportunityQueries
+import time
+
+from core.price_history import price_history
+from core.resolved_markets import resolved_markets
+from core.signal_engine import signal_engine
+from db.queries import OpportunityQueries
 from db.client import get_supabase
 from utils.logger import log
 
 
 class OpportunityDetector:
+    # Shared by all instances — run_scan_cycle builds a fresh detector every cycle
+    live_prices: dict[str, tuple[float, float]] = {}  # market_id -> (yes_price, received at)
+    live_max_age = 60
+
+    @classmethod
+    def on_price(cls, market_id: str, yes_price: float):
+        """Market stream listener: remember the latest YES price per market."""
+        cls.live_prices[market_id] = (yes_price, time.time())
+
     def __init__(self):
         self.min_volume = 5000
         self.min_liquidity = 1000
         self.max_per_group = 3  # Diversity cap
+        self.insert_chunk_size = 500
 
     def scan_all(self, markets: list[dict]) -> list[dict]:
         """Scan all markets for opportunities across all signal types."""
+        markets = resolved_markets.prune(markets)
         liquid = [m for m in markets if m.get("volume", 0) >= self.min_volume and m.get("liquidity", 0) >= self.min_liquidity]
+        cutoff = time.time() - self.live_max_age
+        live = {mid: price for mid, (price, at) in self.live_prices.items() if at >= cutoff}
+        liquid = [
+            {**m, "yes_price": live[m["market_id"]], "no_price": 1 - live[m["market_id"]]} if m["market_id"] in live else m
+            for m in liquid
+        ]
         log("info", f"Scanning {len(liquid)} liquid markets for opportunities", source="opportunity_detector")
+        price_history.hydrate([m["market_id"] for m in liquid])
+        per_market = signal_engine.evaluate(liquid)
+        log("info", f"Signals: {signal_engine.summary()}", source="opportunity_detector")
 
-        all_opps = []
+        existing = OpportunityQueries.get_recent_signal_keys(hours=24)
+        candidates = []
         group_counts = {}
+        detected = dupes = capped = 0
 
-        for market in liquid:
-            signals = []
-            signals.extend(self._check_statistical_edge(market))
-            signals.extend(self._check_timing_edge(market))
-            signals.extend(self._check_crowd_behavior(market))
-
+        for market, signals in zip(liquid, per_market):
             for signal in signals:
+                detected += 1
                 # Diversity cap
                 group = self._extract_question_group(market.get("market_id", ""))
                 if group:
                     count = group_counts.get(group, 0)
                     if count >= self.max_per_group:
+                        capped += 1
                         continue
                     group_counts[group] = count + 1
 
-                # Dedup check
-                if OpportunityQueries.check_duplicate(market["market_id"], signal["signal_type"]):
+                # Dedup against the last 24h (and this cycle)
+                key = (market["market_id"], signal["signal_type"])
+                if key in existing:
+                    dupes += 1
                     continue
+                existing.add(key)
 
-                opp = {
+                candidates.append({
                     "market_id": market["market_id"],
                     "signal_type": signal["signal_type"],
                     "signal_data": signal.get("data", {}),
                     "strength": signal.get("strength", 0.5),
-                }
-                try:
-                    OpportunityQueries.insert_opportunity(opp)
-                    all_opps.append(opp)
-                except Exception as e:
-                    pass
-
-        dupes = len(liquid) * 3 - len(all_opps)  # rough estimate
-        capped = sum(1 for v in group_counts.values() if v >= self.max_per_group)
-        log("info",
-            f"Detected {len(all_opps) + dupes} opportunities, saved {len(all_opps)}, skipped {dupes} dupes, {capped} capped",
-            source="opportunity_detector")
-        return all_opps
-
-    def _check_statistical_edge(self, market: dict) -> list[dict]:
-        """Check for statistical signals: mean reversion, momentum, liquidity imbalance."""
-        signals = []
-        history = MarketQueries.get_price_history(market["market_id"], hours=48)
-
-        yes_prices = [h["price"] for h in history if h.get("outcome") == "YES"]
-        if len(yes_prices) < 4:
-            return signals
-
-        # Mean reversion: price deviated >10% from recent mean
-        mean_price = sum(yes_prices) / len(yes_prices)
-        current = yes_prices[-1]
-        deviation = abs(current - mean_price) / max(mean_price, 0.01)
-
-        if deviation > 0.10:
-            signals.append({
-                "signal_type": "mean_reversion",
-                "strength": min(deviation, 1.0),
-                "data": {"mean": mean_price, "current": current, "deviation": deviation},
-            })
-
-        # Momentum: 3+ consecutive moves in same direction
-        if len(yes_prices) >= 4:
-            diffs = [yes_prices[i] - yes_prices[i-1] for i in range(1, len(yes_prices))]
-            pos_streak = sum(1 for d in diffs[-3:] if d > 0)
-            neg_streak = sum(1 for d in diffs[-3:] if d < 0)
-
-            if pos_streak >= 3 or neg_streak >= 3:
-                direction = "up" if pos_streak >= 3 else "down"
-                signals.append({
-                    "signal_type": "momentum",
-                    "strength": 0.6,
-                    "data": {"direction": direction, "streak": max(pos_streak, neg_streak)},
                 })
 
-        # Liquidity imbalance
-        volumes = [h.get("volume", 0) for h in history[-4:]]
-        if volumes and max(volumes) > 0:
-            vol_ratio = volumes[-1] / (sum(volumes[:-1]) / max(len(volumes) - 1, 1)) if sum(volumes[:-1]) > 0 else 0
-            if vol_ratio > 2.0:
-                signals.append({
-                    "signal_type": "liquidity_imbalance",
-                    "strength": min(vol_ratio / 5, 1.0),
-                    "data": {"volume_ratio": vol_ratio},
-                })
-
-        return signals
-
-    def _check_timing_edge(self, market: dict) -> list[dict]:
-        """Check for near-resolution timing opportunities."""
-        signals = []
-        end_date = market.get("end_date")
-        if not end_date:
-            return signals
-
-        try:
-            if isinstance(end_date, str):
-                end_date = end_date.replace("Z", "+00:00")
-                end = datetime.fromisoformat(end_date)
-            else:
-                end = end_date
-
-            now = datetime.now(timezone.utc)
-            hours_left = (end - now).total_seconds() / 3600
-
-            if 0 < hours_left < 72:
-                price = market.get("yes_price", 0.5)
-                # Only flag interesting near-resolution markets (skip boring 95%+ or 5%- outcomes)
-                if 0.15 <= price <= 0.85:
-                    signals.append({
-                        "signal_type": "near_resolution",
-                        "strength": max(0, 1 - hours_left / 72),
-                        "data": {"hours_left": hours_left, "current_price": price},
-                    })
-        except Exception:
-            pass
-
-        return signals
-
-    def _check_crowd_behavior(self, market: dict) -> list[dict]:
-        """Check for extreme sentiment or overreaction."""
-        signals = []
-        price = market.get("yes_price", 0.5)
-
-        # Extreme sentiment: require >2% price movement AND interesting odds
-        if (0.10 <= price <= 0.90) and market.get("volume", 0) > 50000:
-            history = MarketQueries.get_price_history(market["market_id"], hours=24)
-            yes_prices = [h["price"] for h in history if h.get("outcome") == "YES"]
-            if len(yes_prices) >= 2 and abs(yes_prices[-1] - yes_prices[0]) > 0.02:
-                signals.append({
-                    "signal_type": "extreme_sentiment",
-                    "strength": 0.7,
-                    "data": {"price": price, "movement": abs(yes_prices[-1] - yes_prices[0])},
-                })
+        # Chunk by chunk, so one failed insert loses only its own rows
+        all_opps = []
+        for i in range(0, len(candidates), self.insert_chunk_size):
+            chunk = candidates[i:i + self.insert_chunk_size]
+            try:
+                all_opps.extend(OpportunityQueries.insert_opportunities(chunk))
+            except Exception as e:
+                log("warning", f"Failed to insert {len(chunk)} of {len(candidates)} opportunities: {e}",
+                    source="opportunity_detector")
 
-        return signals
+        log("info",
+            f"Detected {detected} opportunities, saved {len(all_opps)}, skipped {dupes} dupes, {capped} capped",
+            source="opportunity_detector")
+        return all_opps
 
     @staticmethod
     def _extract_question_group(market_id: str) -> str:
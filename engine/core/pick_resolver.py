@@ -11,22 +11,51 @@ Key fix from v1: Stop-loss and target are now stored as YES prices consistently.
 
 All price comparisons use the YES price from the market directly.
 No more (1 - current_price) nonsense that caused instant stop-outs.
+
+Prices come from the live market stream when it has the market, else from
+the last scan. Stops and targets are also checked on every streamed price
+move (on_price), between the 5-minute resolution checks. on_price runs on
+the stream's event loop, so pick closes are written to Supabase from a
+worker thread.
 """
 from __future__ import annotations
 
-import requests
+import asyncio
 from datetime import datetime, timezone, timedelta
 
 from config import GAMMA_API
-from db.queries import PickQueries, MarketQueries
+from core.market_cache import market_cache
+from core.market_stream import market_stream
+from core.resolved_markets import resolved_markets
+from db.queries import PickQueries
+from utils.http import transport
 from utils.logger import log
-from utils.rate_limiter import rate_limiter
+from utils.rate_limiter import Priority
 
 
 class PickResolver:
-    def resolve_all(self) -> dict:
+    def __init__(self):
+        self._watched: dict[str, list[dict]] = {}  # market_id -> active picks, for streamed price checks
+
+    def watched_market_ids(self) -> list[str]:
+        return list(self._watched)
+
+    async def on_price(self, market_id: str, yes_price: float):
+        """Market stream listener: close picks whose stop or target this price crosses."""
+        watched = self._watched.get(market_id, [])
+        for pick in list(watched):
+            if pick not in watched:  # Closed by an earlier price while this one awaited
+                continue
+            watched.remove(pick)  # Hidden from later prices while its close is written
+            if not await self._check_levels(pick, yes_price):
+                watched.append(pick)
+
+    async def resolve_all(self) -> dict:
         """Check all active picks for resolution."""
         active = PickQueries.get_active_picks()
+        self._watched = {}
+        for pick in active:
+            self._watched.setdefault(pick["market_id"], []).append(pick)
         if not active:
             return {"checked": 0}
 
@@ -35,10 +64,16 @@ class PickResolver:
         stats = {"checked": len(active), "resolved": 0, "stopped": 0, "target_hit": 0, "expired": 0, "total_closed": 0}
 
         for pick in active:
-            result = self._check_pick(pick)
+            watched = self._watched[pick["market_id"]]
+            if pick not in watched:  # Already closed by a streamed price
+                continue
+            watched.remove(pick)  # Hidden from on_price while this check awaits
+            result = await self._check_pick(pick)
             if result:
                 stats[result] += 1
                 stats["total_closed"] += 1
+            else:
+                watched.append(pick)
 
         if stats["total_closed"] > 0:
             log("info",
@@ -48,25 +83,34 @@ class PickResolver:
 
         return stats
 
-    def _check_pick(self, pick: dict) -> str | None:
+    async def _check_pick(self, pick: dict) -> str | None:
         """Check a single pick. Returns close reason or None."""
         market_id = pick["market_id"]
 
         # Get current market data
-        market = MarketQueries.get_market_by_id(market_id)
+        market = market_cache.get(market_id)
         if not market:
             return None
 
         # Always work with the YES price — stop_loss and target are stored as YES prices
-        current_yes_price = market.get("yes_price", 0.5)
-        direction = pick.get("direction", "YES")
+        current_yes_price = market_stream.yes_price(market_id)
+        if current_yes_price is None:
+            current_yes_price = market.get("yes_price", 0.5)
 
         # Check market resolution first (definitive)
-        resolution = self._fetch_market_resolution(market_id)
+        resolution = await self._fetch_market_resolution(market_id)
         if resolution:
-            self._close_resolved(pick, resolution)
+            resolved_markets.mark_resolved(market_id)  # Scans stop feeding it to the snapshot and detector
+            await self._close_resolved(pick, resolution)
             return "resolved"
 
+        return await self._check_levels(pick, current_yes_price) or await self._check_expiry(pick, current_yes_price)
+
+    async def _check_levels(self, pick: dict, current_yes_price: float) -> str | None:
+        """Close the pick if the YES price crossed its stop or target. Returns close reason or None."""
+        market_id = pick["market_id"]
+        direction = pick.get("direction", "YES")
+
         # Check stop-loss
         stop = pick.get("stop_loss", 0)
         if stop > 0:
@@ -79,7 +123,7 @@ class PickResolver:
                 stopped = True
 
             if stopped:
-                self._close_pick(pick, "stopped", current_yes_price)
+                await self._close_pick(pick, "stopped", current_yes_price)
                 log("info",
                     f"STOPPED: {direction} {market_id[:50]} — entry={pick['entry_price']*100:.1f}c now={current_yes_price*100:.1f}c stop={stop*100:.1f}c",
                     source="pick_resolver")
@@ -97,20 +141,25 @@ class PickResolver:
                 hit = True
 
             if hit:
-                self._close_pick(pick, "won", current_yes_price)
+                await self._close_pick(pick, "won", current_yes_price)
                 log("info",
                     f"TARGET HIT: {direction} {market_id[:50]} — entry={pick['entry_price']*100:.1f}c now={current_yes_price*100:.1f}c target={target*100:.1f}c",
                     source="pick_resolver")
                 return "target_hit"
 
-        # Check expiry
+        return None
+
+    async def _check_expiry(self, pick: dict, current_yes_price: float) -> str | None:
+        """Close the pick if it outlived its time horizon."""
+        direction = pick.get("direction", "YES")
+        market_id = pick["market_id"]
         try:
             created_str = str(pick["created_at"]).replace("Z", "+00:00")
             created = datetime.fromisoformat(created_str)
             horizon = pick.get("time_horizon", "days")
             max_hours = {"hours": 24, "days": 168, "weeks": 504}.get(horizon, 168)  # More generous timeouts
             if datetime.now(timezone.utc) - created > timedelta(hours=max_hours):
-                self._close_pick(pick, "expired", current_yes_price)
+                await self._close_pick(pick, "expired", current_yes_price)
                 log("info",
                     f"EXPIRED: {direction} {market_id[:50]} — entry={pick['entry_price']*100:.1f}c now={current_yes_price*100:.1f}c after {max_hours}h",
                     source="pick_resolver")
@@ -120,30 +169,30 @@ class PickResolver:
 
         return None
 
-    def _close_resolved(self, pick, outcome):
+    async def _close_resolved(self, pick, outcome):
         """Close a pick based on market resolution."""
         won = (pick["direction"] == outcome)
         exit_price = 1.0 if won else 0.0
         status = "won" if won else "lost"
-        self._close_pick(pick, status, exit_price)
+        await self._close_pick(pick, status, exit_price)
         log("info",
             f"RESOLVED: {pick['direction']} {pick['market_id'][:50]} — {status.upper()} (outcome={outcome})",
             source="pick_resolver")
 
-    def _close_pick(self, pick, status, exit_price):
-        """Close a pick with given status and exit price."""
+    async def _close_pick(self, pick, status, exit_price):
+        """Close a pick with given status and exit price (the Supabase write runs off the event loop)."""
         try:
-            PickQueries.close_pick(pick["id"], status, exit_price)
+            await asyncio.to_thread(PickQueries.close_pick, pick["id"], status, exit_price)
         except Exception as e:
             log("warning", f"Failed to close pick {pick['id']}: {e}", source="pick_resolver")
 
-    def _fetch_market_resolution(self, market_id: str) -> str | None:
+    async def _fetch_market_resolution(self, market_id: str) -> str | None:
         """Check if a market has resolved via Gamma API."""
         try:
-            rate_limiter.wait("polymarket")
-            response = requests.get(
+            response = await transport.get(
                 f"{GAMMA_API}/markets/{market_id}",
                 timeout=10,
+                priority=Priority.REALTIME,
             )
             if response.status_code == 200:
                 data = response.json()
@@ -152,3 +201,6 @@ class PickResolver:
         except Exception:
             pass
         return None
+
+
+pick_resolver = PickResolver()
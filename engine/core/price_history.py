@@ -0,0 +1,229 @@
+"""
+Price History — Per-market ring buffers of recent price snapshots, in memory.
+
+Every snapshot PriceTracker writes is also appended here as one row of
+(timestamp, yes, no, volume, liquidity). OpportunityDetector then reads its
+48h/24h histories from memory instead of querying ep_price_snapshots once or
+twice per market per cycle. All markets share one NumPy block of shape
+(5, markets, capacity), stored field by field. Each market owns a slot whose
+row is a ring of its newest `capacity` snapshots, so snapshotting the whole
+universe is a single vectorized write. Reading one column for many markets
+is a single gather.
+
+A market's buffer is hydrated from the database the first time the detector
+needs it; after that, appends keep it current. Hydration is one bulk query
+per `hydrate_ids_per_query` markets (MarketQueries.get_price_histories), not
+one per market. With source "database" every cycle re-hydrates, for setups
+where this process isn't the only snapshot writer. core/warm_start.py carries
+the buffers across restarts, so a warm boot hydrates nothing. Markets with no
+snapshot inside `window_hours` give their slot back.
+"""
+from __future__ import annotations
+
+import math
+import time
+from datetime import datetime
+
+import numpy as np
+
+from config import PRICE_HISTORY_CONFIG
+from db.queries import MarketQueries
+from utils.logger import log
+
+# Columns of a history row
+TS, YES, NO, VOLUME, LIQUIDITY = range(5)
+FIELDS = 5
+
+
+def _epoch(timestamp: str) -> float:
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+
+
+def snapshot_rows(snapshots: list[dict], window: float = 60.0) -> np.ndarray:
+    """
+    Pair one market's ep_price_snapshots rows (one YES and one NO per snapshot) into history rows, oldest first.
+
+    snapshots are in timestamp order. A snapshot's two rows needn't share a timestamp (rows
+    written by separate insert statements are stamped separately), so a YES and a NO less
+    than `window` seconds apart are paired instead.
+    """
+    rows: list[list[float]] = []
+    row: list[float] | None = None
+    for snap in snapshots:
+        ts = _epoch(snap["timestamp"])
+        outcome = YES if snap.get("outcome") == "YES" else NO
+        if row is None or ts - row[TS] > window or not math.isnan(row[outcome]):
+            row = [ts, math.nan, math.nan, float(snap.get("volume") or 0), float(snap.get("liquidity") or 0)]
+            rows.append(row)
+        row[outcome] = float(snap["price"])
+    paired = np.array(rows, dtype=np.float64).reshape(-1, FIELDS)
+    return paired[~np.isnan(paired[:, YES])]
+
+
+class PriceHistory:
+    def __init__(self, config: dict | None = None):
+        cfg = {**PRICE_HISTORY_CONFIG, **(config or {})}
+        self.capacity = cfg["capacity"]
+        self.window_hours = cfg["window_hours"]
+        self.reload = cfg["source"] == "database"
+        self.ids_per_query = cfg["hydrate_ids_per_query"]
+        self.pair_window = cfg["pair_window_seconds"]
+        slots = cfg["initial_markets"]
+        self._data = np.zeros((FIELDS, slots, self.capacity), dtype=np.float64)  # Field-major
+        self._head = np.zeros(slots, dtype=np.int64)    # Next write position in each slot's ring
+        self._count = np.zeros(slots, dtype=np.int64)   # Rows held, up to capacity
+        self._slots: dict[str, int] = {}                # market_id -> slot
+        self._free: list[int] = []
+        self._hydrated: set[str] = set()
+        self.stats = {"appended": 0, "hydrated": 0, "hydrate_batches": 0, "hydrate_errors": 0}
+
+    # --- Slots ---
+
+    def _slot(self, market_id: str) -> int:
+        slot = self._slots.get(market_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self._slots)
+                if slot >= self._data.shape[1]:
+                    self._grow()
+            self._slots[market_id] = slot
+            self._head[slot] = self._count[slot] = 0
+        return slot
+
+    def _grow(self):
+        size = self._data.shape[1] * 2
+        data = np.zeros((FIELDS, size, self.capacity), dtype=np.float64)
+        data[:, :self._data.shape[1]] = self._data
+        self._data = data
+        self._head = np.resize(self._head, size)
+        self._count = np.resize(self._count, size)
+
+    def _forget_stale(self, now: float):
+        """Free the slots of markets with no snapshot inside the window."""
+        if not self._slots:
+            return
+        ids = list(self._slots)
+        slots = np.fromiter(self._slots.values(), dtype=np.int64, count=len(ids))
+        newest = self._data[TS, slots, (self._head[slots] - 1) % self.capacity]
+        stale = (newest < now - self.window_hours * 3600) | (self._count[slots] == 0)
+        for i in np.flatnonzero(stale):
+            self._free.append(self._slots.pop(ids[i]))
+            self._hydrated.discard(ids[i])
+
+    # --- Writes ---
+
+    def record(self, markets: list[dict], ts: float | None = None):
+        """Append one snapshot row per market dict (market_id, yes_price, no_price, volume, liquidity)."""
+        ts = time.time() if ts is None else ts
+        latest = {m["market_id"]: m for m in markets}  # One row per market even if a list repeats one
+        if not latest:
+            return
+        slots = np.fromiter((self._slot(market_id) for market_id in latest), dtype=np.int64, count=len(latest))
+        values = np.array([
+            (ts, m.get("yes_price", 0.5), m.get("no_price", 0.5), m.get("volume", 0), m.get("liquidity", 0))
+            for m in latest.values()
+        ], dtype=np.float64)
+        heads = self._head[slots]
+        self._data[:, slots, heads] = values.T
+        self._head[slots] = (heads + 1) % self.capacity
+        self._count[slots] = np.minimum(self._count[slots] + 1, self.capacity)
+        self.stats["appended"] += len(latest)
+        self._forget_stale(ts)
+
+    def set_series(self, market_id: str, rows: np.ndarray):
+        """Replace a market's buffer with rows (oldest first); only the newest `capacity` are kept."""
+        rows = rows[-self.capacity:]
+        slot = self._slot(market_id)
+        self._data[:, slot, :len(rows)] = rows.T
+        self._head[slot] = len(rows) % self.capacity
+        self._count[slot] = len(rows)
+
+    def hydrate(self, market_ids: list[str]):
+        """Load the window from ep_price_snapshots for markets not loaded yet (all of them with source "database")."""
+        wanted = list(dict.fromkeys(m for m in market_ids if self.reload or m not in self._hydrated))
+        if not wanted:
+            return
+        try:
+            grouped = MarketQueries.get_price_histories(
+                wanted, hours=self.window_hours, ids_per_query=self.ids_per_query
+            )
+        except Exception as e:
+            self.stats["hydrate_errors"] += 1
+            log("warning", f"Price history hydrate failed for {len(wanted)} markets: {e}", source="price_history")
+            return
+        self.stats["hydrate_batches"] += -(-len(wanted) // self.ids_per_query)
+        # The database holds every snapshot this process appended too, so it replaces the buffer
+        for market_id in wanted:
+            self.set_series(market_id, snapshot_rows(grouped.get(market_id, []), self.pair_window))
+        self._hydrated.update(wanted)
+        self.stats["hydrated"] += len(wanted)
+
+    # --- Reads ---
+
+    def series(self, market_id: str) -> np.ndarray:
+        """All buffered rows for a market, oldest first (a copy)."""
+        slot = self._slots.get(market_id)
+        if slot is None:
+            return np.empty((0, FIELDS), dtype=np.float64)
+        count, head = self._count[slot], self._head[slot]
+        return self._data[:, slot, (head - count + np.arange(count)) % self.capacity].T
+
+    def window(self, market_id: str, hours: float | None = None, now: float | None = None) -> np.ndarray:
+        """Rows from the last `hours` (default window_hours), oldest first."""
+        rows = self.series(market_id)
+        cutoff = (time.time() if now is None else now) - (hours or self.window_hours) * 3600
+        return rows[rows[:, TS] >= cutoff]
+
+    def aligned(
+        self,
+        market_ids: list[str],
+        hours: float | None = None,
+        now: float | None = None,
+        fields: tuple[int, ...] = (TS, YES, NO, VOLUME, LIQUIDITY),
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Windows of many markets as one right-aligned block: (columns[len(fields), n, width], lengths[n]).
+
+        Market i's window in a column is column[i, width - lengths[i]:], oldest first;
+        everything in front of it is zero. width is the longest buffer among the
+        markets. Only the requested fields are gathered.
+        """
+        n = len(market_ids)
+        slots = np.fromiter((self._slots.get(m, -1) for m in market_ids), dtype=np.int64, count=n)
+        known = slots >= 0
+        slots = np.where(known, slots, 0)
+        count = np.where(known, self._count[slots], 0)
+        width = int(count.max(initial=0))
+        offsets = np.arange(width) - width                                      # -width .. -1
+        # Flat index of every (market, position) inside one field's (slots, capacity) plane
+        index = slots[:, None] * self.capacity + (self._head[slots][:, None] + offsets) % self.capacity
+        planes = self._data.reshape(FIELDS, -1)
+        columns = np.empty((len(fields), n, width), dtype=np.float64)
+        for column, field in zip(columns, fields):
+            planes[field].take(index, out=column)
+        ts = columns[fields.index(TS)] if TS in fields else planes[TS].take(index)
+        cutoff = (time.time() if now is None else now) - (hours or self.window_hours) * 3600
+        valid = (offsets >= -count[:, None]) & (ts >= cutoff)
+        columns[:, ~valid] = 0.0
+        return columns, valid.sum(axis=1)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    # --- Warm start ---
+
+    def dump(self) -> dict:
+        return {
+            "markets": {market_id: self.series(market_id).tobytes() for market_id in self._slots},
+            "hydrated": sorted(self._hydrated & self._slots.keys()),
+        }
+
+    def restore(self, state: dict):
+        for market_id, raw in state["markets"].items():
+            self.set_series(market_id, np.frombuffer(raw, dtype=np.float64).reshape(-1, FIELDS))
+        self._hydrated.update(state["hydrated"])
+
+
+price_history = PriceHistory()
@@ -1,11 +1,19 @@
-"""Price Tracker — Inserts price snapshots for all tracked markets."""
+"""Price Tracker — Inserts price snapshots for all tracked markets (and appends them to core/price_history.py)."""
+import time
+from datetime import datetime, timezone
+
+from core.price_history import price_history
+from core.resolved_markets import resolved_markets
 from db.queries import MarketQueries
 from utils.logger import log
 
 
 class PriceTracker:
     def snapshot_all(self, markets: list[dict]) -> int:
-        """Insert price snapshots for all markets."""
+        """Insert price snapshots for all markets that are still live."""
+        markets = resolved_markets.prune(markets)
+        now = time.time()
+        stamp = datetime.fromtimestamp(now, timezone.utc).isoformat()  # One timestamp for the whole snapshot
         snapshots = []
         for m in markets:
             for outcome in ["YES", "NO"]:
@@ -16,10 +24,12 @@ class PriceTracker:
                     "price": price,
                     "volume": m.get("volume", 0),
                     "liquidity": m.get("liquidity", 0),
+                    "timestamp": stamp,
                 })
 
         if snapshots:
             MarketQueries.insert_snapshots(snapshots)
+            price_history.record(markets, ts=now)
             log("info", f"Inserted {len(snapshots)} price snapshots for {len(markets)} markets", source="price_tracker")
 
         return len(snapshots)
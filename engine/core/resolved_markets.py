@@ -0,0 +1,82 @@
+"""
+Resolved Markets — Markets that are finished, pruned before any per-market work.
+
+Gamma keeps listing a market for a while after its end date passes or it
+resolves. Until then every scan would snapshot it, price it and run it
+through the detector like a live market. A market counts as finished once
+PickResolver sees it resolve, or once its end date is `expiry_grace_hours`
+behind us. The grace is generous on purpose: endDate is often only nominal
+(a game's kickoff, say) and the market keeps trading until it resolves. Finished markets are dropped while the scan reads Gamma's pages.
+They are dropped again in front of the snapshot writer and the detector,
+because those also receive lists that didn't come from a fresh scan (a cached
+scan, or the warm-started universe).
+
+Resolved ids are kept for `resolved_retention_days`, well past the point
+where Gamma stops listing a market. core/warm_start.py carries them across
+restarts.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime
+
+from config import MARKET_SCANNER_CONFIG
+
+
+def _end_ts(end_date: datetime | str | None) -> float | None:
+    if not end_date:
+        return None
+    if isinstance(end_date, str):
+        try:
+            end_date = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return end_date.timestamp()
+
+
+class ResolvedMarkets:
+    def __init__(self, config: dict | None = None):
+        cfg = {**MARKET_SCANNER_CONFIG, **(config or {})}
+        self.grace = cfg["expiry_grace_hours"] * 3600
+        self.retention = cfg["resolved_retention_days"] * 86400
+        self._resolved: dict[str, float] = {}  # market_id -> when it was seen resolved
+        self.stats = {"pruned_resolved": 0, "pruned_expired": 0}
+
+    def mark_resolved(self, market_id: str):
+        self._resolved[market_id] = time.time()
+
+    def is_resolved(self, market_id: str) -> bool:
+        return market_id in self._resolved
+
+    def is_done(self, market_id: str, end_date: datetime | str | None, now: float | None = None) -> bool:
+        """True if the market resolved or its end date (plus grace) has passed."""
+        if market_id in self._resolved:
+            self.stats["pruned_resolved"] += 1
+            return True
+        end = _end_ts(end_date)
+        if end is not None and end + self.grace <= (time.time() if now is None else now):
+            self.stats["pruned_expired"] += 1
+            return True
+        return False
+
+    def prune(self, markets: list[dict]) -> list[dict]:
+        """Market dicts that are still live, in order."""
+        now = time.time()
+        return [m for m in markets if not self.is_done(m.get("market_id", ""), m.get("end_date"), now)]
+
+    # --- Warm start ---
+
+    def _forget_old(self):
+        cutoff = time.time() - self.retention
+        self._resolved = {market_id: at for market_id, at in self._resolved.items() if at >= cutoff}
+
+    def dump(self) -> dict[str, float]:
+        self._forget_old()
+        return dict(self._resolved)
+
+    def restore(self, state: dict[str, float]):
+        self._resolved.update(state)
+        self._forget_old()
+
+
+resolved_markets = ResolvedMarkets()
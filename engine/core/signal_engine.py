@@ -0,0 +1,318 @@
+"""
+Signal Engine — OpportunityDetector's signals, as a registry of plugins.
+
+Each signal type is a small Signal subclass. It declares the history window
+it reads (window_hours, 0 for none) and the price-history fields it needs.
+Its evaluate() gets a SignalBatch for all markets and returns the markets
+that fire. Built in, in this order:
+
+  mean_reversion       latest YES price more than 10% away from the 48h mean
+  momentum             the last 3 moves of the 48h YES price all in one direction
+  liquidity_imbalance  latest volume over 2x the mean of the three rows before it
+  near_resolution      ends within 72h, priced between 15c and 85c
+  extreme_sentiment    YES price moved more than 2c over 24h on a busy, open market
+
+The engine works out the longest window and the union of fields once, when
+signals register. Each evaluate() gathers that window from
+core/price_history.py once, as one right-aligned 2-D block (markets x
+snapshots) per field. Shorter windows are tails of the longest one, read
+through SignalBatch.lengths and SignalBatch.window. The
+history signals are a handful of NumPy operations over the whole block, and
+their outputs match the per-market reference checks in benchmark_signals.py
+value for value.
+
+Per signal the engine records wall time, markets evaluated (markets with
+enough history for the signal), signals emitted, and picks. Picks are
+reported by the conviction engine through record_pick. `last` holds the
+latest evaluation and `totals` is cumulative; core/warm_start.py carries the
+totals across restarts.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from core.price_history import TS, VOLUME, YES, PriceHistory, price_history
+from utils.logger import log
+
+Hits = list[tuple[int, dict]]  # (market index, signal dict)
+
+
+class SignalBatch:
+    """The markets of one evaluation and their price histories over the engine's longest window."""
+
+    def __init__(self, markets: list[dict], now: float, hours: float, columns: dict[int, np.ndarray], lengths: np.ndarray):
+        self.markets = markets
+        self.now = now
+        self.n = len(markets)
+        self.hours = hours
+        self._columns = columns          # field -> (n, width), right-aligned, zero in front
+        self._lengths = {hours: lengths}
+        self._values: dict[str, np.ndarray] = {}
+
+    def column(self, field: int) -> np.ndarray:
+        """A field over the longest window; use lengths(hours) for a shorter window's tail."""
+        return self._columns[field]
+
+    def lengths(self, hours: float) -> np.ndarray:
+        """Rows per market inside the last `hours` (the tail of each row of column())."""
+        if hours not in self._lengths:
+            self._lengths[hours] = (self._columns[TS] >= self.now - hours * 3600).sum(axis=1)
+        return self._lengths[hours]
+
+    def window(self, field: int, hours: float) -> np.ndarray:
+        """A field over the last `hours` only: column() with everything in front of that window zeroed."""
+        column = self._columns[field]
+        if hours >= self.hours:
+            return column
+        width = column.shape[1]
+        inside = np.arange(width) >= width - self.lengths(hours)[:, None]
+        return np.where(inside, column, 0.0)
+
+    def values(self, key: str, default: float) -> np.ndarray:
+        """A numeric market-dict field for every market."""
+        if key not in self._values:
+            self._values[key] = np.fromiter((m.get(key, default) for m in self.markets), dtype=np.float64, count=self.n)
+        return self._values[key]
+
+
+class Signal:
+    """One signal type. Subclasses set name, window_hours and fields, and implement evaluate."""
+
+    name = ""
+    window_hours: float = 0                  # History the signal reads; 0 for none
+    fields: tuple[int, ...] = ()             # Price-history columns it reads (TS is always gathered)
+
+    def evaluate(self, batch: SignalBatch) -> tuple[int, Hits]:
+        """(markets evaluated, hits) for the batch."""
+        raise NotImplementedError
+
+
+# --- Built-in signals ---
+
+class MeanReversion(Signal):
+    name = "mean_reversion"
+    window_hours = 48
+    fields = (YES,)
+
+    def evaluate(self, batch: SignalBatch) -> tuple[int, Hits]:
+        # Only this signal's window: a longer one registered by another signal must not reach the mean
+        yes, lengths = batch.window(YES, self.window_hours), batch.lengths(self.window_hours)
+        enough = lengths >= 4
+        if yes.shape[1] < 4:
+            return 0, []
+        # Sequential accumulate over zero padding rounds exactly as Python's sum() does
+        mean = np.add.accumulate(yes, axis=1)[:, -1] / np.maximum(lengths, 1)
+        current = yes[:, -1]
+        deviation = np.abs(current - mean) / np.maximum(mean, 0.01)
+        hits = np.flatnonzero(enough & (deviation > 0.10))
+        return int(enough.sum()), [
+            (i, {
+                "signal_type": self.name,
+                "strength": min(dev, 1.0),
+                "data": {"mean": m, "current": cur, "deviation": dev},
+            })
+            for i, m, cur, dev in zip(hits.tolist(), mean[hits].tolist(), current[hits].tolist(), deviation[hits].tolist())
+        ]
+
+
+class Momentum(Signal):
+    name = "momentum"
+    window_hours = 48
+    fields = (YES,)
+
+    def evaluate(self, batch: SignalBatch) -> tuple[int, Hits]:
+        yes, lengths = batch.column(YES), batch.lengths(self.window_hours)
+        enough = lengths >= 4
+        if yes.shape[1] < 4:
+            return 0, []
+        diffs = np.diff(yes[:, -4:], axis=1)
+        ups = (diffs > 0).sum(axis=1)
+        downs = (diffs < 0).sum(axis=1)
+        hits = np.flatnonzero(enough & ((ups >= 3) | (downs >= 3)))
+        return int(enough.sum()), [
+            (i, {
+                "signal_type": self.name,
+                "strength": 0.6,
+                "data": {"direction": "up" if up >= 3 else "down", "streak": max(up, down)},
+            })
+            for i, up, down in zip(hits.tolist(), ups[hits].tolist(), downs[hits].tolist())
+        ]
+
+
+class LiquidityImbalance(Signal):
+    name = "liquidity_imbalance"
+    window_hours = 48
+    fields = (VOLUME,)
+
+    def evaluate(self, batch: SignalBatch) -> tuple[int, Hits]:
+        volume, lengths = batch.column(VOLUME), batch.lengths(self.window_hours)
+        enough = lengths >= 4
+        if volume.shape[1] < 4:
+            return 0, []
+        # The last four database rows are the YES and NO rows of the last two snapshots
+        before, last = volume[:, -2], volume[:, -1]
+        prior = before + before + last
+        ratio = np.divide(last, prior / 3, out=np.zeros(batch.n), where=prior > 0)
+        hits = np.flatnonzero(enough & (np.maximum(before, last) > 0) & (ratio > 2.0))
+        return int(enough.sum()), [
+            (i, {
+                "signal_type": self.name,
+                "strength": min(r / 5, 1.0),
+                "data": {"volume_ratio": r},
+            })
+            for i, r in zip(hits.tolist(), ratio[hits].tolist())
+        ]
+
+
+class NearResolution(Signal):
+    name = "near_resolution"
+
+    def evaluate(self, batch: SignalBatch) -> tuple[int, Hits]:
+        now = datetime.fromtimestamp(batch.now, timezone.utc)
+        evaluated, hits = 0, []
+        for i, market in enumerate(batch.markets):
+            end_date = market.get("end_date")
+            if not end_date:
+                continue
+            evaluated += 1
+            try:
+                if isinstance(end_date, str):
+                    end_date = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
+                hours_left = (end_date - now).total_seconds() / 3600
+            except Exception:
+                continue
+            price = market.get("yes_price", 0.5)
+            # Only flag interesting near-resolution markets (skip boring 95%+ or 5%- outcomes)
+            if 0 < hours_left < 72 and 0.15 <= price <= 0.85:
+                hits.append((i, {
+                    "signal_type": self.name,
+                    "strength": max(0, 1 - hours_left / 72),
+                    "data": {"hours_left": hours_left, "current_price": price},
+                }))
+        return evaluated, hits
+
+
+class ExtremeSentiment(Signal):
+    name = "extreme_sentiment"
+    window_hours = 24
+    fields = (YES,)
+
+    def evaluate(self, batch: SignalBatch) -> tuple[int, Hits]:
+        prices, volumes = batch.values("yes_price", 0.5), batch.values("volume", 0)
+        busy = (prices >= 0.10) & (prices <= 0.90) & (volumes > 50000)
+        yes, lengths = batch.column(YES), batch.lengths(self.window_hours)
+        if yes.shape[1] < 2:
+            return int(busy.sum()), []
+        first = yes[np.arange(batch.n), yes.shape[1] - np.maximum(lengths, 1)]
+        movement = np.abs(yes[:, -1] - first)
+        hits = np.flatnonzero(busy & (lengths >= 2) & (movement > 0.02))
+        return int(busy.sum()), [
+            (i, {
+                "signal_type": self.name,
+                "strength": 0.7,
+                "data": {"price": price, "movement": move},
+            })
+            for i, price, move in zip(hits.tolist(), prices[hits].tolist(), movement[hits].tolist())
+        ]
+
+
+BUILTIN_SIGNALS = (MeanReversion, Momentum, LiquidityImbalance, NearResolution, ExtremeSentiment)
+
+
+class SignalEngine:
+    def __init__(self, history: PriceHistory = price_history, signals: tuple[type[Signal], ...] = BUILTIN_SIGNALS):
+        self.history = history
+        self._signals: dict[str, Signal] = {}
+        self.window_hours: float = 0
+        self.fields: tuple[int, ...] = ()
+        self.last: dict[str, dict] = {}     # Latest evaluation, per signal
+        self.last_gather_seconds = 0.0
+        self.totals: dict[str, dict] = {}   # Cumulative, per signal
+        for signal in signals:
+            self.register(signal())
+
+    def register(self, signal: Signal):
+        """Add a signal (or replace one of the same name); signals run, and emit per market, in registration order."""
+        self._signals[signal.name] = signal
+        self.totals.setdefault(signal.name, {"runs": 0, "seconds": 0.0, "evaluated": 0, "emitted": 0, "errors": 0, "picks": 0})
+        self._plan()
+
+    def unregister(self, name: str):
+        self._signals.pop(name, None)
+        self._plan()
+
+    def _plan(self):
+        """The longest window and the fields to gather, worked out once per registry change rather than per evaluation."""
+        self.window_hours = max((s.window_hours for s in self._signals.values()), default=0)
+        self.fields = tuple(sorted({TS, *(f for s in self._signals.values() for f in s.fields)}))
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._signals)
+
+    def evaluate(self, markets: list[dict], now: float | None = None) -> list[list[dict]]:
+        """Signals per market, in the order of markets."""
+        now = time.time() if now is None else now
+        batch = self._batch(markets, now)
+        out: list[list[dict]] = [[] for _ in markets]
+        self.last = {}
+        for name, signal in self._signals.items():
+            start = time.perf_counter()
+            try:
+                evaluated, hits = signal.evaluate(batch)
+            except Exception as e:
+                evaluated, hits = 0, []
+                self.totals[name]["errors"] += 1
+                log("warning", f"Signal {name} failed: {e}", source="signal_engine")
+            elapsed = time.perf_counter() - start
+            for i, payload in hits:
+                out[i].append(payload)
+            self.last[name] = {"seconds": elapsed, "evaluated": evaluated, "emitted": len(hits)}
+            totals = self.totals[name]
+            totals["runs"] += 1
+            totals["seconds"] += elapsed
+            totals["evaluated"] += evaluated
+            totals["emitted"] += len(hits)
+        return out
+
+    def _batch(self, markets: list[dict], now: float) -> SignalBatch:
+        """Gather the longest window of every needed field once."""
+        if not self.window_hours:
+            return SignalBatch(markets, now, 0, {}, np.zeros(len(markets), dtype=np.int64))
+        start = time.perf_counter()
+        columns, lengths = self.history.aligned(
+            [m["market_id"] for m in markets], hours=self.window_hours, now=now, fields=self.fields
+        )
+        self.last_gather_seconds = time.perf_counter() - start
+        return SignalBatch(markets, now, self.window_hours, dict(zip(self.fields, columns)), lengths)
+
+    # --- Instrumentation ---
+
+    def record_pick(self, signal_type: str | None):
+        """A pick was made from an opportunity of this signal type."""
+        if signal_type in self.totals:
+            self.totals[signal_type]["picks"] += 1
+
+    def summary(self) -> str:
+        """One line for the latest evaluation: per signal, time, emitted/evaluated and picks so far."""
+        return f"gather {self.last_gather_seconds * 1000:.1f}ms; " + ", ".join(
+            f"{name} {s['seconds'] * 1000:.1f}ms {s['emitted']}/{s['evaluated']} ({self.totals[name]['picks']} picks)"
+            for name, s in self.last.items()
+        )
+
+    # --- Warm start ---
+
+    def dump(self) -> dict[str, dict]:
+        return self.totals
+
+    def restore(self, state: dict[str, dict]):
+        for name, saved in state.items():
+            totals = self.totals.setdefault(name, {})
+            for key, value in saved.items():
+                totals[key] = totals.get(key, 0) + value
+
+
+signal_engine = SignalEngine()
@@ -0,0 +1,83 @@
+"""
+Warm Start — Engine state carried across restarts.
+
+The engine's in-memory state is saved to one msgpack file after every scan
+and at the end of every loop cycle, failed or not (run.py), and loaded back
+on boot. That covers the market universe from the last scan, the scheduler
+timestamps and any in-memory price buffers. A redeploy then resumes the scan
+and discovery cadence with warm caches instead of treating the first cycle as
+a cold start. State older than `max_age_hours` is ignored.
+
+State is kept in named sections. A module with state to keep registers a
+section with register(name, dump, restore): dump() returns a msgpack-able
+value and restore(value) puts it back. A section that fails to restore is
+skipped, and the others still load.
+"""
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Callable
+
+import msgspec
+
+from config import WARM_START_CONFIG
+from utils.logger import log
+
+
+class WarmStart:
+    def __init__(self, config: dict | None = None):
+        cfg = {**WARM_START_CONFIG, **(config or {})}
+        self.enabled = cfg["enabled"]
+        self.path = cfg["path"]
+        self.max_age = cfg["max_age_hours"] * 3600
+        self._sections: dict[str, tuple[Callable[[], Any], Callable[[Any], None]]] = {}
+
+    def register(self, name: str, dump: Callable[[], Any], restore: Callable[[Any], None]):
+        self._sections[name] = (dump, restore)
+
+    def save(self) -> int:
+        """Write every registered section; returns the file size in bytes (0 if disabled or failed)."""
+        if not self.enabled:
+            return 0
+        try:
+            state = {"saved_at": time.time(), "sections": {name: dump() for name, (dump, _) in self._sections.items()}}
+            payload = msgspec.msgpack.encode(state)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(payload)
+            os.replace(tmp, self.path)  # Atomic: a crash mid-write leaves the previous state intact
+            return len(payload)
+        except Exception as e:
+            log("warning", f"Warm start save failed: {e}", source="warm_start")
+            return 0
+
+    def load(self) -> float | None:
+        """Restore registered sections from disk; returns the state's age in seconds, or None on a cold start."""
+        if not self.enabled or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                state = msgspec.msgpack.decode(f.read())
+        except Exception as e:
+            log("warning", f"Warm start state unreadable, starting cold: {e}", source="warm_start")
+            return None
+
+        age = time.time() - state.get("saved_at", 0)
+        if age > self.max_age:
+            log("info", f"Warm start state is {age / 3600:.1f}h old, starting cold", source="warm_start")
+            return None
+
+        sections = state.get("sections", {})
+        for name, (_, restore) in self._sections.items():
+            if name not in sections:
+                continue
+            try:
+                restore(sections[name])
+            except Exception as e:
+                log("warning", f"Warm start section {name} not restored: {e}", source="warm_start")
+        return age
+
+
+warm_start = WarmStart()
@@ -9,10 +9,39 @@ class MarketQueries:
     """CRUD for ep_markets_raw, ep_price_snapshots."""
 
     @staticmethod
-    def upsert_markets(markets: list[dict]):
-        """Bulk upsert to ep_markets_raw."""
+    def upsert_markets(markets: list[dict], chunk_size: int = 500):
+        """Bulk upsert to ep_markets_raw, in chunks of chunk_size rows."""
         sb = get_supabase()
-        sb.table("ep_markets_raw").upsert(markets, on_conflict="market_id").execute()
+        for i in range(0, len(markets), chunk_size):
+            chunk = markets[i:i+chunk_size]
+            sb.table("ep_markets_raw").upsert(chunk, on_conflict="market_id").execute()
+
+    @staticmethod
+    def get_active_market_states(page_size: int = 1000) -> list[dict]:
+        """The columns sync fingerprints cover, for every active market (paged past the 1000-row cap)."""
+        sb = get_supabase()
+        rows: list[dict] = []
+        while True:
+            result = (
+                sb.table("ep_markets_raw")
+                .select("market_id, yes_price, no_price, volume, liquidity, end_date")
+                .eq("active", True)
+                .order("market_id")
+                .range(len(rows), len(rows) + page_size - 1)
+                .execute()
+            )
+            batch = result.data or []
+            rows.extend(batch)
+            if len(batch) < page_size:
+                return rows
+
+    @staticmethod
+    def deactivate_markets(market_ids: list[str]):
+        """Mark markets inactive in a single statement."""
+        if not market_ids:
+            return
+        sb = get_supabase()
+        sb.table("ep_markets_raw").update({"active": False}).in_("market_id", market_ids).execute()
 
     @staticmethod
     def get_active_markets() -> list[dict]:
@@ -61,6 +90,41 @@ class MarketQueries:
         )
         return result.data or []
 
+    @staticmethod
+    def get_price_histories(
+        market_ids: list[str], hours: int = 48, ids_per_query: int = 100, page_size: int = 1000
+    ) -> dict[str, list[dict]]:
+        """
+        Snapshots of many markets at once, grouped per market in timestamp order.
+
+        One in_ filter per ids_per_query markets (keeps the URL short), only the
+        columns the price history uses, and keyset pagination on (timestamp, id)
+        past the 1000-row response cap.
+        """
+        sb = get_supabase()
+        since = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+        grouped: dict[str, list[dict]] = {market_id: [] for market_id in market_ids}
+        for i in range(0, len(market_ids), ids_per_query):
+            chunk = market_ids[i:i + ids_per_query]
+            after: tuple | None = None
+            while True:
+                query = (
+                    sb.table("ep_price_snapshots")
+                    .select("id, market_id, outcome, price, volume, liquidity, timestamp")
+                    .in_("market_id", chunk)
+                    .gte("timestamp", since)
+                )
+                if after is not None:
+                    ts, row_id = after
+                    query = query.or_(f'timestamp.gt."{ts}",and(timestamp.eq."{ts}",id.gt."{row_id}")')
+                batch = query.order("timestamp").order("id").limit(page_size).execute().data or []
+                for row in batch:
+                    grouped.setdefault(row["market_id"], []).append(row)
+                if len(batch) < page_size:
+                    break
+                after = (batch[-1]["timestamp"], batch[-1]["id"])
+        return grouped
+
 
 class OpportunityQueries:
     """CRUD for ep_detected_opportunities."""
@@ -70,6 +134,16 @@ class OpportunityQueries:
         sb = get_supabase()
         sb.table("ep_detected_opportunities").insert(opp).execute()
 
+    @staticmethod
+    def insert_opportunities(opps: list[dict], chunk_size: int = 500) -> list[dict]:
+        """Bulk insert, in chunks of chunk_size rows; returns the inserted rows (with their ids)."""
+        sb = get_supabase()
+        inserted: list[dict] = []
+        for i in range(0, len(opps), chunk_size):
+            result = sb.table("ep_detected_opportunities").insert(opps[i:i+chunk_size]).execute()
+            inserted.extend(result.data or [])
+        return inserted
+
     @staticmethod
     def get_unprocessed(limit: int = 50) -> list[dict]:
         sb = get_supabase()
@@ -105,6 +179,29 @@ class OpportunityQueries:
         )
         return len(result.data) > 0
 
+    @staticmethod
+    def get_recent_signal_keys(hours: int = 24, page_size: int = 1000) -> set[tuple[str, str]]:
+        """(market_id, signal_type) of every opportunity detected in the last `hours`, processed or not.
+        One query (paged past the 1000-row cap) instead of a check_duplicate call per signal."""
+        sb = get_supabase()
+        since = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+        keys: set[tuple[str, str]] = set()
+        offset = 0
+        while True:
+            result = (
+                sb.table("ep_detected_opportunities")
+                .select("id, market_id, signal_type")
+                .gte("detected_at", since)
+                .order("id")
+                .range(offset, offset + page_size - 1)
+                .execute()
+            )
+            batch = result.data or []
+            keys.update((row["market_id"], row["signal_type"]) for row in batch)
+            offset += len(batch)
+            if len(batch) < page_size:
+                return keys
+
 
 class PickQueries:
     """CRUD for ep_curated_picks, ep_pick_results."""
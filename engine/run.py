@@ -2,7 +2,7 @@
 """
 EasyPoly Headless Engine — Main entry point.
 
-Runs an infinite loop:
+Runs an infinite loop (with the live market stream running alongside):
 1. Resolve active picks (check for W/L/stop/target/expiry)
 2. Scan Polymarket for new markets
 3. Snapshot prices
@@ -11,25 +11,61 @@ Runs an infinite loop:
 6. Broadcast picks to @EasyPolyBot via API
 7. Shadow cycle (scan traders, detect copy signals)
 8. Sleep 5 minutes, repeat
+
+The market universe and scheduler timestamps are saved after every scan and
+at the end of every cycle, failed or not, and restored on boot
+(core/warm_start.py), so a restart keeps the scan and discovery cadence.
 """
 import asyncio
 import sys
 import argparse
 from datetime import datetime, timezone
 
-from config import CONVICTION_CONFIG
+from config import BOOK_CACHE_CONFIG, CONVICTION_CONFIG
 from utils.logger import log
 
 # Track last discovery run — only run every 6 hours
 _last_discovery_run: datetime | None = None
 DISCOVERY_INTERVAL_HOURS = 6
 
+# Last full scan, and the market universe it returned (both survive restarts, see core/warm_start.py)
+_last_scan: datetime | None = None
+_universe: dict = {"markets": [], "condition_ids": {}}
+
+# Last failed full-pipeline attempt: a due scan waits SCAN_RETRY_MINUTES after it instead of retrying every tick
+_failed_scan: datetime | None = None
+SCAN_RETRY_MINUTES = 30
+
+# Liquid markets from the last scan — streamed live along with every market holding an active pick
+_stream_markets: list[dict] = []
+
+
+def track_live_markets(markets: list[dict] | None = None):
+    """Point the market stream at the liquid scanned markets plus the markets of active picks,
+    and drop cached books for every other market."""
+    from core.book_cache import book_cache
+    from core.market_cache import market_cache
+    from core.market_stream import market_stream
+    from core.pick_resolver import pick_resolver
+    from core.resolved_markets import resolved_markets
+
+    global _stream_markets
+    if markets is not None:
+        min_liquidity = BOOK_CACHE_CONFIG["warm_min_liquidity"]
+        _stream_markets = [m for m in markets if m.get("liquidity", 0) >= min_liquidity]
+    picked = [market_cache.get(market_id) for market_id in pick_resolver.watched_market_ids()]
+    tracked = _stream_markets + [m for m in picked if m]
+    market_stream.track(tracked)
+    live = [m for m in _universe["markets"] if not resolved_markets.is_resolved(m["market_id"])] + tracked
+    book_cache.retain(t for m in live for t in (m.get("yes_token"), m.get("no_token")) if t)
+
 
 async def run_resolution_check():
     """Check active picks for resolution."""
-    from core.pick_resolver import PickResolver
-    resolver = PickResolver()
-    return resolver.resolve_all()
+    from core.pick_resolver import pick_resolver
+    stats = await pick_resolver.resolve_all()
+    track_live_markets()
+    return stats
 
 
 async def run_scan_cycle():
@@ -38,14 +74,19 @@ async def run_scan_cycle():
     from core.price_tracker import PriceTracker
     from core.opportunity_detector import OpportunityDetector
     from analyst.conviction_engine import ConvictionEngine
+    from core.signal_engine import signal_engine
+    from db.queries import AuditLog
 
     # 1. Scan markets
     scanner = MarketScanner()
-    markets = scanner.scan()
+    markets = await scanner.scan()
     log("info", f"Scanned {len(markets)} markets", source="run")
+    global _universe
+    _universe = {"markets": markets, "condition_ids": scanner.condition_ids}
 
     # 2. Sync to Supabase
     scanner.sync_to_supabase(markets)
+    track_live_markets(markets)
 
     # 3. Snapshot prices
     tracker = PriceTracker()
@@ -61,6 +102,9 @@ async def run_scan_cycle():
     picks = engine.score_opportunities()
     log("info", f"Produced {len(picks)} curated picks", source="run")
 
+    # Per-signal cost and yield, including the picks just made
+    AuditLog.log("signals", {"cycle": signal_engine.last, "totals": signal_engine.totals}, source="run")
+
     return picks
 
 
@@ -74,7 +118,7 @@ async def run_shadow_cycle():
     log("info", f"Shadow: tracked {len(traders)} traders", source="run")
 
     detector = CopyDetector(max_traders=10)
-    signals = detector.detect_signals()
+    signals = await detector.detect_signals()
     if signals:
         log("info", f"Shadow: {len(signals)} copy signals detected", source="run")
 
@@ -91,6 +135,10 @@ async def run_full_pipeline():
     log("info", "Starting scan cycle", source="run")
     picks = await run_scan_cycle()
 
+    # Keep the fresh universe even if the process dies during broadcast or discovery
+    from core.warm_start import warm_start
+    warm_start.save()
+
     # Step 3: Broadcast new picks
     if picks:
         from analyst.api_broadcaster import ApiBroadcaster
@@ -115,35 +163,137 @@ async def run_full_pipeline():
     return picks
 
 
+def _timestamp(dt: datetime | None) -> float | None:
+    return dt.timestamp() if dt else None
+
+
+def _datetime(ts: float | None) -> datetime | None:
+    return datetime.fromtimestamp(ts, timezone.utc) if ts else None
+
+
+def _restore_scheduler(state: dict):
+    global _last_scan, _last_discovery_run
+    _last_scan = _datetime(state.get("last_scan"))
+    _last_discovery_run = _datetime(state.get("last_discovery_run"))
+
+
+def _restore_universe(state: dict):
+    """Reload the last scanned universe into the market cache and the live stream."""
+    from core.market_cache import market_cache
+    from core.resolved_markets import resolved_markets
+
+    global _universe
+    _universe = {**state, "markets": resolved_markets.prune(state["markets"])}
+    market_cache.replace(_universe["markets"], _universe["condition_ids"])
+    track_live_markets(_universe["markets"])
+
+
+def warm_boot() -> float | None:
+    """Register run.py's state with the warm start and restore everything saved by the last process."""
+    from core.price_history import price_history
+    from core.resolved_markets import resolved_markets
+    from core.signal_engine import signal_engine
+    from core.warm_start import warm_start
+
+    warm_start.register(
+        "scheduler",
+        lambda: {"last_scan": _timestamp(_last_scan), "last_discovery_run": _timestamp(_last_discovery_run)},
+        _restore_scheduler,
+    )
+    warm_start.register("resolved_markets", resolved_markets.dump, resolved_markets.restore)
+    warm_start.register("price_history", price_history.dump, price_history.restore)
+    warm_start.register("signals", signal_engine.dump, signal_engine.restore)
+    warm_start.register("universe", lambda: _universe, _restore_universe)  # After resolved_markets: pruned on load
+    age = warm_start.load()
+    if age is None:
+        log("info", "Cold start: no recent engine state on disk", source="run")
+    else:
+        log("info",
+            f"Warm start: {len(_universe['markets'])} markets from a state saved {age / 60:.0f}m ago "
+            f"(last scan {_last_scan.isoformat() if _last_scan else 'never'})",
+            source="run")
+    return age
+
+
+async def run_cycle(scan_interval: float):
+    """One loop iteration: the full pipeline when a scan is due, else a resolution check.
+
+    Warm state is saved at the end whatever happened, so resolution-only cycles
+    and failed runs survive a restart too.
+    """
+    global _last_scan, _failed_scan
+    from core.warm_start import warm_start
+    try:
+        now = datetime.now(timezone.utc)
+        hours_since_scan = (now - _last_scan).total_seconds() / 3600 if _last_scan else float("inf")
+        retry_in = (
+            SCAN_RETRY_MINUTES - (now - _failed_scan).total_seconds() / 60 if _failed_scan else 0.0
+        )
+
+        if hours_since_scan >= scan_interval / 3600 and retry_in <= 0:
+            # Full pipeline: resolve + scan + score + broadcast + shadow
+            log("info", "Running full scan pipeline", source="run")
+            try:
+                await run_full_pipeline()
+            except Exception as e:
+                _failed_scan = datetime.now(timezone.utc)
+                log("error", f"Full scan pipeline failed: {e}; retrying in {SCAN_RETRY_MINUTES}m", source="run")
+                return
+            _last_scan = datetime.now(timezone.utc)
+            _failed_scan = None
+        else:
+            # Quick cycle: just resolve active picks
+            if hours_since_scan >= scan_interval / 3600:
+                log("info", f"Resolution check (scan retry in {retry_in:.0f}m)", source="run")
+            else:
+                log("info", f"Resolution check (next scan in {scan_interval / 3600 - hours_since_scan:.1f}h)",
+                    source="run")
+            resolution = await run_resolution_check()
+            log("info", f"Resolution check: {resolution}", source="run")
+    except Exception as e:
+        log("error", f"Pipeline error: {e}", source="run")
+    finally:
+        warm_start.save()
+
+
 async def main_loop():
     """Infinite loop: resolution every 5 min, full scan every 6 hours."""
     scan_interval = CONVICTION_CONFIG.get("scan_interval_minutes", 360) * 60  # 6h default
     resolve_interval = 5 * 60  # Resolution checks every 5 minutes
-    _last_scan: datetime | None = None
     log("info", f"Starting headless engine (scan every {scan_interval // 3600}h, resolve every {resolve_interval // 60}m)", source="run")
 
+    # Resume the previous process's cadence and caches instead of scanning from cold
+    warm_boot()
+
+    # Live prices between scans: stops/targets are checked on every streamed move
+    from core.market_stream import market_stream
+    from core.opportunity_detector import OpportunityDetector
+    from core.pick_resolver import pick_resolver
+    market_stream.add_listener(pick_resolver.on_price)
+    market_stream.add_listener(OpportunityDetector.on_price)
+    await market_stream.start()
+
     while True:
-        try:
-            now = datetime.now(timezone.utc)
-            hours_since_scan = (now - _last_scan).total_seconds() / 3600 if _last_scan else float("inf")
+        await run_cycle(scan_interval)
 
-            if hours_since_scan >= scan_interval / 3600:
-                # Full pipeline: resolve + scan + score + broadcast + shadow
-                log("info", "Running full scan pipeline", source="run")
-                await run_full_pipeline()
-                _last_scan = datetime.now(timezone.utc)
-            else:
-                # Quick cycle: just resolve active picks
-                log("info", f"Resolution check (next scan in {scan_interval / 3600 - hours_since_scan:.1f}h)", source="run")
-                resolution = await run_resolution_check()
-                log("info", f"Resolution check: {resolution}", source="run")
-        except Exception as e:
-            log("error", f"Pipeline error: {e}", source="run")
+        from utils.http import transport
+        log("info", f"HTTP stats: {transport.stats()}", source="run")
+        log("info", f"Market stream: {market_stream.stats()}", source="run")
 
         log("info", f"Sleeping {resolve_interval}s until next check", source="run")
         await asyncio.sleep(resolve_interval)
 
 
+async def _run_once(coro):
+    """Run a single stage, then release the pooled HTTP connections."""
+    from utils.http import transport
+    try:
+        return await coro
+    finally:
+        log("info", f"HTTP stats: {transport.stats()}", source="run")
+        await transport.aclose()
+
+
 def main():
     parser = argparse.ArgumentParser(description="EasyPoly Headless Engine")
     parser.add_argument("--scan-only", action="store_true", help="Run one scan cycle and exit")
@@ -152,11 +302,11 @@ def main():
     args = parser.parse_args()
 
     if args.scan_only:
-        asyncio.run(run_scan_cycle())
+        asyncio.run(_run_once(run_scan_cycle()))
     elif args.resolve_only:
-        asyncio.run(run_resolution_check())
+        asyncio.run(_run_once(run_resolution_check()))
     elif args.shadow_only:
-        asyncio.run(run_shadow_cycle())
+        asyncio.run(_run_once(run_shadow_cycle()))
     else:
         asyncio.run(main_loop())
 
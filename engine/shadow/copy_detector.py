@@ -7,16 +7,15 @@ This ensures copy signals from micro/small traders, not just whales.
 """
 from __future__ import annotations
 
-import requests
 from datetime import datetime, timezone
 
-from config import CLOB_HOST, GAMMA_API, TRADER_DISCOVERY_CONFIG
+from config import CLOB_HOST, DATA_API, GAMMA_API, TRADER_DISCOVERY_CONFIG
 from db.client import get_supabase
-from db.queries import TraderQueries, MarketQueries
+from core.market_cache import market_cache
+from db.queries import TraderQueries
+from utils.http import transport
 from utils.logger import log
-from utils.rate_limiter import rate_limiter
-
-DATA_API = "https://data-api.polymarket.com"
+from utils.rate_limiter import Priority
 
 
 class CopyDetector:
@@ -24,7 +23,7 @@ class CopyDetector:
         self.max_traders = max_traders
         self.top_per_tier = TRADER_DISCOVERY_CONFIG.get("top_per_tier", 5)
 
-    def detect_signals(self) -> list[dict]:
+    async def detect_signals(self) -> list[dict]:
         # Get top traders from EACH bankroll tier for diverse coverage
         top_traders = TraderQueries.get_top_traders_by_tier(top_per_tier=self.top_per_tier)
 
@@ -66,7 +65,7 @@ class CopyDetector:
         signals = []
         for trader in top_traders:
             try:
-                new_positions = self._check_trader(trader)
+                new_positions = await self._check_trader(trader)
                 signals.extend(new_positions)
             except Exception as e:
                 log("warning", f"Error checking trader {trader.get('alias', '?')}: {e}", source="copy_detector")
@@ -76,13 +75,12 @@ class CopyDetector:
 
         return signals
 
-    def _check_trader(self, trader: dict) -> list[dict]:
+    async def _check_trader(self, trader: dict) -> list[dict]:
         wallet = trader.get("wallet_address", "")
         if not wallet:
             return []
 
-        rate_limiter.wait("polymarket")
-        positions = self._fetch_positions(wallet)
+        positions = await self._fetch_positions(wallet)
         if not positions:
             return []
 
@@ -123,7 +121,8 @@ class CopyDetector:
             except Exception as e:
                 log("warning", f"Failed to save trader trade: {e}", source="copy_detector")
 
-            market = MarketQueries.get_market_by_id(market_id)
+            # Slugs from the Data API can differ from ours; the condition id is unambiguous
+            market = market_cache.peek(pos.get("conditionId", "")) or market_cache.get(market_id)
             question = market.get("question", market_id) if market else market_id
 
             signal = {
@@ -157,13 +156,14 @@ class CopyDetector:
 
         return new_signals
 
-    def _fetch_positions(self, wallet_address: str) -> list[dict]:
+    async def _fetch_positions(self, wallet_address: str) -> list[dict]:
         min_val = TRADER_DISCOVERY_CONFIG.get("min_position_value", 10)
         try:
-            response = requests.get(
+            response = await transport.get(
                 f"{DATA_API}/positions",
                 params={"user": wallet_address, "sizeThreshold": min_val, "limit": 50},
                 timeout=15,
+                priority=Priority.REALTIME,
             )
             if response.status_code == 200:
                 data = response.json()
@@ -172,7 +172,12 @@ class CopyDetector:
         except Exception:
             pass
         try:
-            response = requests.get(f"{CLOB_HOST}/positions", params={"user": wallet_address}, timeout=10)
+            response = await transport.get(
+                f"{CLOB_HOST}/positions",
+                params={"user": wallet_address},
+                timeout=10,
+                priority=Priority.REALTIME,
+            )
             if response.status_code == 200:
                 data = response.json()
                 if data:
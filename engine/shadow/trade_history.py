@@ -0,0 +1,166 @@
+"""
+Trade History Store — Per-wallet trade history with a watermark for incremental fetches.
+
+The first profile of a wallet pages through its full history as before. Every
+later profile fetches only the newest pages, stops at the first page that
+overlaps what is already stored, and merges the new trades on top. Overlap
+is checked against the stored keys from the page's time range only, so repeat
+profiling costs O(new trades) instead of O(history) until the final read.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable
+
+from config import TRADE_HISTORY_DB
+from utils.pagination import paginate
+from utils.schemas import Trade, decode_list, encode
+
+
+SCHEMA_VERSION = 2  # 2: keys carry a fill index
+
+
+def trade_keys(trades: list[Trade], counts: dict[str, int] | None = None) -> list[str]:
+    """
+    Identity of each trade row. A single tx can fill several assets/sizes, and
+    can even repeat an identical fill, so identical rows are numbered in API
+    order (newest first). Pass the same `counts` for consecutive pages of one
+    walk so the numbering carries across page boundaries.
+    """
+    counts = {} if counts is None else counts
+    keys = []
+    for t in trades:
+        base = f"{t.transaction_hash}:{t.asset}:{t.side}:{float(t.size)}:{float(t.price)}:{t.timestamp}"
+        fill = counts.get(base, 0)
+        counts[base] = fill + 1
+        keys.append(f"{base}:{fill}")
+    return keys
+
+
+class TradeHistoryStore:
+    def __init__(self, path: str = TRADE_HISTORY_DB):
+        self.path = path
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            if db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Older keys can't be matched against new ones: drop them and resync from scratch once
+                db.execute("DROP TABLE IF EXISTS trades")
+                db.execute("DROP TABLE IF EXISTS watermarks")
+                db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS trades ("
+                " wallet TEXT NOT NULL, key TEXT NOT NULL, ts INTEGER NOT NULL, payload TEXT NOT NULL,"
+                " PRIMARY KEY (wallet, key)) WITHOUT ROWID"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS trades_wallet_ts ON trades(wallet, ts)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks ("
+                " wallet TEXT PRIMARY KEY, newest_ts INTEGER NOT NULL, synced_at REAL NOT NULL)"
+            )
+            self._db = db
+        return self._db
+
+    def watermark(self, wallet: str) -> int | None:
+        """Newest stored trade timestamp, or None if the wallet was never synced."""
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT newest_ts FROM watermarks WHERE wallet = ?", (wallet.lower(),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def load(self, wallet: str, limit: int = -1) -> list[Trade]:
+        """Stored trades, newest first (the newest `limit` of them if given)."""
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT payload FROM trades WHERE wallet = ? ORDER BY ts DESC LIMIT ?", (wallet.lower(), limit)
+            ).fetchall()
+        # One decode call for the whole history instead of one per row
+        return decode_list("[" + ",".join(r[0] for r in rows) + "]", Trade)
+
+    def keys_since(self, wallet: str, ts: int) -> set[str]:
+        """Keys of stored trades at or after `ts` (no payloads decoded)."""
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT key FROM trades WHERE wallet = ? AND ts >= ?", (wallet.lower(), ts)
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def append(self, wallet: str, trades: list[tuple[str, Trade]], keep: int):
+        """Insert new (key, trade) rows, advance the watermark and trim to the newest `keep` rows."""
+        wallet = wallet.lower()
+        rows = [(wallet, key, t.timestamp, encode(t).decode()) for key, t in trades]
+        newest = max((r[2] for r in rows), default=0)
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN")
+            db.executemany("INSERT OR IGNORE INTO trades VALUES (?, ?, ?, ?)", rows)
+            db.execute(
+                "INSERT INTO watermarks VALUES (?, ?, ?) ON CONFLICT(wallet) DO UPDATE SET "
+                "newest_ts = MAX(newest_ts, excluded.newest_ts), synced_at = excluded.synced_at",
+                (wallet, newest, time.time()),
+            )
+            db.execute(
+                "DELETE FROM trades WHERE wallet = ? AND key NOT IN "
+                "(SELECT key FROM trades WHERE wallet = ? ORDER BY ts DESC LIMIT ?)",
+                (wallet, wallet, keep),
+            )
+            db.execute("COMMIT")
+
+    async def sync(
+        self,
+        wallet: str,
+        fetch_page: Callable[[int, bool], Awaitable[list[Trade]]],
+        max_trades: int = 10000,
+        page_size: int = 500,
+    ) -> list[Trade]:
+        """
+        Bring a wallet's history up to date and return it, newest first.
+
+        fetch_page(offset, incremental) returns one page of trades (newest first).
+        `incremental` is True once a watermark exists — those pages must be fresh,
+        not served from the response cache.
+        """
+        watermark = self.watermark(wallet)
+        counts: dict[str, int] = {}
+
+        if watermark is None:
+            # First sync: full history, fanned out across offsets
+            pages = await paginate(lambda offset: fetch_page(offset, False), page_size, max_trades)
+            self.append(wallet, list(zip(trade_keys(pages, counts), pages)), keep=max_trades)
+            return pages
+
+        # Incremental: walk newest pages until one overlaps stored history
+        new: list[tuple[str, Trade]] = []
+        offset = 0
+        while offset < max_trades:
+            batch = await fetch_page(offset, True)
+            if not batch:
+                break
+            # Only the stored keys this page could collide with, not the whole history
+            stored = self.keys_since(wallet, min(t.timestamp for t in batch))
+            overlaps = False
+            for key, t in zip(trade_keys(batch, counts), batch):
+                if key in stored:
+                    overlaps = True
+                else:
+                    new.append((key, t))
+            # Any already-stored trade on this page means we've reached the watermark
+            if len(batch) < page_size or overlaps:
+                break
+            offset += page_size
+
+        self.append(wallet, new, keep=max_trades)
+        return self.load(wallet, limit=max_trades)
+
+
+trade_history = TradeHistoryStore()
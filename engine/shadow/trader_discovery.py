@@ -10,7 +10,7 @@ Replaces the shallow trader_scanner with a 7-factor scoring system:
 6. Edge (10%) — Performance above random baseline
 7. Recency (5%) — How recently the trader was active
 
-Uses async httpx for concurrent data fetching with built-in rate limiting.
+Uses the shared pooled httpx transport for concurrent data fetching with built-in rate limiting.
 Stores results in ep_tracked_traders for the copy trading engine.
 """
 from __future__ import annotations
@@ -22,20 +22,25 @@ import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Optional
 
-import httpx
+import msgspec
 
-from config import WHALE_WALLETS
+from config import DATA_API, WHALE_WALLETS
+from core.category_map import category_map
 from db.queries import TraderQueries, AuditLog
+from shadow.trade_history import trade_history
+from utils.classifier import category_classifier
+from utils.http import transport
 from utils.logger import log
+from utils.pagination import paginate
+from utils.rate_limiter import Priority
+from utils.schemas import Position, Trade, decode_list
+from utils.singleflight import SingleFlight, request_key
 
 # ─────────────────────────────────────────────────────────────────────
 # Constants & Configuration
 # ─────────────────────────────────────────────────────────────────────
 
-DATA_API = "https://data-api.polymarket.com"
-
 # Scoring weights (must sum to 1.0)
 WEIGHT_ROI = 0.20
 WEIGHT_WIN_RATE = 0.20
@@ -54,54 +59,12 @@ MIN_DAYS_SINCE_LAST_TRADE = 30
 
 # ─────────────────────────────────────────────────────────────────────
 # Category Detection (keyword-based classification from trade titles)
+# Keyword table and compiled matcher live in utils/classifier.py; per-market
+# answers (Gamma's category where no keyword is finer) are shared through core/category_map.py
 # ─────────────────────────────────────────────────────────────────────
-CATEGORY_KEYWORDS = {
-    "politics": [
-        "election", "president", "congress", "senate", "vote", "biden", "trump",
-        "democrat", "republican", "white house", "governor", "mayor", "campaign",
-        "political", "legislation", "bill", "law", "policy", "government",
-        "supreme court", "impeach", "primary", "nominee", "cabinet",
-    ],
-    "sports": [
-        "nfl", "nba", "mlb", "nhl", "soccer", "football", "basketball", "baseball",
-        "hockey", "championship", "playoff", "super bowl", "world series", "finals",
-        "mvp", "player", "team", "game", "match", "tournament", "olympics",
-        "ufc", "boxing", "tennis", "golf", "f1", "formula 1", "world cup",
-    ],
-    "crypto": [
-        "bitcoin", "btc", "ethereum", "eth", "solana", "sol", "crypto", "coinbase",
-        "binance", "blockchain", "defi", "nft", "token", "coin", "wallet", "mining",
-        "satoshi", "altcoin", "stablecoin", "usdc", "usdt", "doge", "memecoin",
-        "airdrop", "polymarket",
-    ],
-    "culture": [
-        "movie", "film", "actor", "actress", "box office", "oscar", "grammy",
-        "emmy", "music", "album", "artist", "celebrity", "pop culture", "tv show",
-        "series", "streaming", "netflix", "spotify", "youtube", "influencer",
-        "tiktok", "viral", "meme",
-    ],
-    "finance": [
-        "stock", "market", "nasdaq", "s&p", "dow", "trading", "earnings", "ipo",
-        "acquisition", "merger", "fed", "interest rate", "inflation", "gdp",
-        "unemployment", "bond", "treasury", "recession", "bull market", "bear market",
-    ],
-    "mentions": [
-        "elon musk", "jeff bezos", "mark zuckerberg", "tim cook", "satya nadella",
-        "jensen huang", "sam altman", "vitalik buterin", "cz", "sbf",
-        "tweet", "post", "follower", "x.com", "twitter",
-    ],
-}
-
-
 def classify_market_category(title: str) -> str:
     """Classify a market into a category based on title keywords."""
-    text = title.lower()
-    scores = {}
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        scores[category] = sum(1 for kw in keywords if kw in text)
-    if max(scores.values()) == 0:
-        return "other"
-    return max(scores, key=scores.get)
+    return category_classifier.classify(title)
 
 
 def analyze_trader_categories(profile) -> tuple[str, dict, dict]:
@@ -116,7 +79,7 @@ def analyze_trader_categories(profile) -> tuple[str, dict, dict]:
         if trade.condition_id in seen_markets:
             continue
         seen_markets.add(trade.condition_id)
-        category = classify_market_category(trade.title)
+        category = category_map.category(trade.condition_id, trade.title)
         category_counts[category] = category_counts.get(category, 0) + 1
 
     if not category_counts:
@@ -136,9 +99,9 @@ def analyze_trader_categories(profile) -> tuple[str, dict, dict]:
     return primary, category_breakdown, category_counts
 
 
-# Rate limiting
-MAX_CONCURRENT = 5
-REQUEST_DELAY = 0.5  # seconds between requests
+# Concurrency
+MAX_CONCURRENT = 5  # Pacing is per-host and adaptive (utils.rate_limiter)
+MAX_RATE_LIMIT_RETRIES = 3  # Attempts per request while the host keeps answering 429
 
 
 class TimePeriod(Enum):
@@ -163,44 +126,6 @@ class Category(Enum):
 # Data Models
 # ─────────────────────────────────────────────────────────────────────
 
-@dataclass
-class Trade:
-    """A single trade on Polymarket."""
-    side: str              # BUY or SELL
-    size: float            # token amount
-    price: float           # price per token in USDC
-    timestamp: int         # unix timestamp
-    condition_id: str      # market condition ID
-    title: str = ""
-    outcome: str = ""      # YES or NO
-    asset: str = ""        # token ID
-
-    @property
-    def notional(self) -> float:
-        return self.size * self.price
-
-    @property
-    def dt(self) -> datetime:
-        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
-
-
-@dataclass
-class Position:
-    """A trader's position in a market (open or closed)."""
-    condition_id: str
-    title: str
-    outcome: str           # YES or NO
-    size: float            # tokens held
-    avg_price: float       # average entry price
-    current_price: float   # current market price
-    initial_value: float   # USDC spent to enter
-    current_value: float   # current mark-to-market
-    cash_pnl: float        # realized + unrealized PnL
-    pct_pnl: float         # percentage PnL
-    is_closed: bool = False
-    realized_pnl: float = 0.0
-
-
 @dataclass
 class TraderProfile:
     """Raw data collected from Polymarket APIs for a single trader."""
@@ -265,40 +190,49 @@ class TraderScore:
 class PolymarketClient:
     """Async client for Polymarket's public Data API."""
 
-    def __init__(self):
-        self._client: Optional[httpx.AsyncClient] = None
+    def __init__(self, priority: Priority = Priority.BULK):
         self._semaphore = asyncio.Semaphore(MAX_CONCURRENT)
-        self._last_request = 0.0
+        self._flights = SingleFlight()
+        self.priority = priority  # Profiling is bulk work; it yields the shared budget to realtime polls
 
     async def __aenter__(self):
-        self._client = httpx.AsyncClient(
-            timeout=30.0,
-            headers={"Accept": "application/json"},
-        )
         return self
 
     async def __aexit__(self, *args):
-        if self._client:
-            await self._client.aclose()
-
-    async def _get(self, url: str, params: dict | None = None) -> dict | list:
-        """Rate-limited GET request."""
-        async with self._semaphore:
-            elapsed = time.monotonic() - self._last_request
-            if elapsed < REQUEST_DELAY:
-                await asyncio.sleep(REQUEST_DELAY - elapsed)
+        # Connections belong to the shared transport and stay pooled for the next caller
+        pass
+
+    async def _get(
+        self, url: str, params: dict | None = None, cached: bool = True, record: type | None = None
+    ) -> dict | list:
+        """Rate-limited GET; concurrent identical calls share one request and one decoded result."""
+        return await self._flights.do(
+            (request_key("GET", url, params), cached, record), lambda: self._fetch(url, params, cached, record)
+        )
 
-            resp = await self._client.get(url, params=params)
-            self._last_request = time.monotonic()
+    async def _fetch(
+        self, url: str, params: dict | None = None, cached: bool = True, record: type | None = None
+    ) -> dict | list:
+        """
+        Single GET + decode via the response cache (pacing and 429 back-off live in the shared transport).
 
-            if resp.status_code == 429:
-                retry_after = float(resp.headers.get("Retry-After", "5"))
-                log("warning", f"Rate limited, waiting {retry_after}s...", source="trader_discovery")
-                await asyncio.sleep(retry_after)
-                return await self._get(url, params)
+        With `record`, the body decodes straight into a list of typed records.
+        """
+        for attempt in range(MAX_RATE_LIMIT_RETRIES):
+            async with self._semaphore:
+                if cached:
+                    resp = await transport.get_cached(url, params=params, priority=self.priority)
+                else:
+                    resp = await transport.get(url, params=params, priority=self.priority)
+            if resp.status_code != 429:
+                break
+            if attempt + 1 < MAX_RATE_LIMIT_RETRIES:
+                log("warning", "Rate limited, retrying after host back-off...", source="trader_discovery")
 
-            resp.raise_for_status()
-            return resp.json()
+        resp.raise_for_status()  # Still 429 after the last attempt: raises like any other HTTP error
+        if record is not None:
+            return decode_list(resp.content, record)
+        return resp.json()
 
     # --- Leaderboard ---
     async def get_leaderboard(
@@ -320,34 +254,31 @@ class PolymarketClient:
 
     # --- Trades ---
     async def get_trades(
-        self, address: str, limit: int = 500, offset: int = 0
-    ) -> list[dict]:
+        self, address: str, limit: int = 500, offset: int = 0, cached: bool = True
+    ) -> list[Trade]:
         """Fetch trade history for a user."""
         return await self._get(f"{DATA_API}/trades", {
             "user": address,
             "limit": limit,
             "offset": offset,
-        })
+        }, cached=cached, record=Trade)
 
-    async def get_all_trades(self, address: str, max_trades: int = 10000) -> list[dict]:
-        """Paginate through all trades for a user (increased limit for quality data)."""
-        all_trades = []
-        offset = 0
+    async def get_all_trades(self, address: str, max_trades: int = 10000) -> list[Trade]:
+        """All trades for a user, newest first — after the first run only pages newer than the stored watermark."""
         batch_size = 500
-        while offset < max_trades:
-            batch = await self.get_trades(address, limit=batch_size, offset=offset)
-            if not batch:
-                break
-            all_trades.extend(batch)
-            if len(batch) < batch_size:
-                break
-            offset += batch_size
-        return all_trades
+        return await trade_history.sync(
+            address,
+            lambda offset, incremental: self.get_trades(
+                address, limit=batch_size, offset=offset, cached=not incremental
+            ),
+            max_trades=max_trades,
+            page_size=batch_size,
+        )
 
     # --- Positions ---
     async def get_positions(
         self, address: str, limit: int = 500, offset: int = 0
-    ) -> list[dict]:
+    ) -> list[Position]:
         """Fetch current open positions."""
         return await self._get(f"{DATA_API}/positions", {
             "user": address,
@@ -355,36 +286,28 @@ class PolymarketClient:
             "offset": offset,
             "sortBy": "CASHPNL",
             "sortDirection": "DESC",
-        })
+        }, record=Position)
 
     async def get_closed_positions(
         self, address: str, limit: int = 50, offset: int = 0
-    ) -> list[dict]:
+    ) -> list[Position]:
         """Fetch resolved/closed positions (no sort bias — returns wins AND losses)."""
         return await self._get(f"{DATA_API}/closed-positions", {
             "user": address,
             "limit": limit,
             "offset": offset,
-        })
+        }, record=Position)
 
     async def get_all_closed_positions(
         self, address: str, max_positions: int = 10000
-    ) -> list[dict]:
-        """Paginate through closed positions (increased limit for complete data)."""
-        all_positions = []
-        offset = 0
+    ) -> list[Position]:
+        """Paginate through closed positions, fanning out several offsets at once."""
         batch_size = 50  # API max
-        while offset < max_positions:
-            batch = await self.get_closed_positions(
-                address, limit=batch_size, offset=offset
-            )
-            if not batch:
-                break
-            all_positions.extend(batch)
-            if len(batch) < batch_size:
-                break
-            offset += batch_size
-        return all_positions
+        return await paginate(
+            lambda offset: self.get_closed_positions(address, limit=batch_size, offset=offset),
+            page_size=batch_size,
+            max_items=max_positions,
+        )
 
     # --- Portfolio Value ---
     async def get_portfolio_value(self, address: str) -> float:
@@ -438,62 +361,16 @@ async def collect_trader_profile(
         return_exceptions=True,
     )
 
-    # Parse trades
+    # Records arrive already typed from the decoder — no per-field conversion pass
     if isinstance(trades_raw, list):
-        for t in trades_raw:
-            try:
-                profile.trades.append(Trade(
-                    side=t.get("side", ""),
-                    size=float(t.get("size", 0)),
-                    price=float(t.get("price", 0)),
-                    timestamp=int(t.get("timestamp", 0)),
-                    condition_id=t.get("conditionId", t.get("market", "")),
-                    title=t.get("title", ""),
-                    outcome=t.get("outcome", ""),
-                    asset=t.get("asset", ""),
-                ))
-            except (ValueError, TypeError):
-                continue
-
-    # Parse open positions
+        profile.trades = trades_raw
+
     if isinstance(positions_raw, list):
-        for pos in positions_raw:
-            try:
-                profile.open_positions.append(Position(
-                    condition_id=pos.get("conditionId", pos.get("market", "")),
-                    title=pos.get("title", ""),
-                    outcome=pos.get("outcome", ""),
-                    size=float(pos.get("size", 0)),
-                    avg_price=float(pos.get("avgPrice", 0)),
-                    current_price=float(pos.get("curPrice", pos.get("price", 0))),
-                    initial_value=float(pos.get("initialValue", 0)),
-                    current_value=float(pos.get("currentValue", 0)),
-                    cash_pnl=float(pos.get("cashPnl", 0)),
-                    pct_pnl=float(pos.get("percentPnl", 0)),
-                ))
-            except (ValueError, TypeError):
-                continue
-
-    # Parse closed positions
+        profile.open_positions = positions_raw
+
     if isinstance(closed_raw, list):
-        for pos in closed_raw:
-            try:
-                profile.closed_positions.append(Position(
-                    condition_id=pos.get("conditionId", pos.get("market", "")),
-                    title=pos.get("title", ""),
-                    outcome=pos.get("outcome", ""),
-                    size=float(pos.get("size", 0)),
-                    avg_price=float(pos.get("avgPrice", 0)),
-                    current_price=float(pos.get("curPrice", pos.get("price", 0))),
-                    initial_value=float(pos.get("initialValue", 0)),
-                    current_value=float(pos.get("currentValue", 0)),
-                    cash_pnl=float(pos.get("cashPnl", 0)),
-                    pct_pnl=float(pos.get("percentPnl", 0)),
-                    is_closed=True,
-                    realized_pnl=float(pos.get("realizedPnl", 0)),
-                ))
-            except (ValueError, TypeError):
-                continue
+        # Copies: the decoded records may be shared with concurrent callers through singleflight
+        profile.closed_positions = [msgspec.structs.replace(pos, is_closed=True) for pos in closed_raw]
 
     if isinstance(portfolio_val, (int, float)):
         profile.portfolio_value = portfolio_val
@@ -893,7 +770,8 @@ class TraderDiscovery:
                         f"Failed to profile {cand.get('username', cand['address'][:12])}: {e}",
                         source="trader_discovery")
 
-            # Step 3: Score all traders
+            # Step 3: Score all traders (market categories looked up once, for everyone)
+            await category_map.prefetch({t.condition_id: t.title for p in profiles for t in p.trades})
             log("info", f"Scoring {len(profiles)} traders...", source="trader_discovery")
             scores: list[TraderScore] = []
 
@@ -910,6 +788,8 @@ class TraderDiscovery:
                         f"Disqualified {score.username}: {score.disqualify_reason}",
                         source="trader_discovery")
 
+            category_map.flush()
+
             # Step 4: Filter and rank
             qualified = [s for s in scores if not s.disqualified]
             qualified.sort(key=lambda s: s.composite_score, reverse=True)
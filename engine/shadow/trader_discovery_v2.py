@@ -34,19 +34,24 @@ from datetime import datetime, timezone, timedelta
 from enum import Enum
 from typing import Optional
 
-import httpx
+import msgspec
 
-from config import WHALE_WALLETS
+from config import DATA_API, GAMMA_API, WHALE_WALLETS
+from core.category_map import category_map
 from db.queries import TraderQueries, AuditLog
+from shadow.trade_history import trade_history
+from utils.classifier import KeywordClassifier
+from utils.http import transport
 from utils.logger import log
+from utils.pagination import paginate
+from utils.rate_limiter import Priority
+from utils.schemas import Position, Trade, decode_list
+from utils.singleflight import SingleFlight, request_key
 
 # ─────────────────────────────────────────────────────────────────────
 # Constants & Configuration
 # ─────────────────────────────────────────────────────────────────────
 
-DATA_API = "https://data-api.polymarket.com"
-GAMMA_API = "https://gamma-api.polymarket.com"
-
 # Market discovery settings
 TOP_MARKETS_COUNT = 200  # Fetch top 200 highest-volume markets
 TOP_TRADERS_PER_MARKET = 20  # Get top 20 traders by P&L per market
@@ -84,9 +89,9 @@ BOT_HEX_ADDRESS_THRESHOLD = 0.8  # If >80% hex chars in address → likely bot
 BOT_UPDOWN_PATTERN = ["updown", "bot", "test", "auto"]
 BOT_PERFECT_WIN_RATE = 99.0  # 99%+ with >15 trades = suspicious
 
-# Rate limiting
-MAX_CONCURRENT = 10  # Increased for market scanning
-REQUEST_DELAY = 0.3  # Faster for bulk operations
+# Concurrency
+MAX_CONCURRENT = 10  # Increased for market scanning; pacing is per-host and adaptive (utils.rate_limiter)
+MAX_RATE_LIMIT_RETRIES = 3  # Attempts per request while the host keeps answering 429
 
 # ─────────────────────────────────────────────────────────────────────
 # Category Detection (keyword-based classification from trade titles)
@@ -128,15 +133,14 @@ CATEGORY_KEYWORDS = {
 }
 
 
+# v2 taxonomy (adds "nfl", no "mentions"); same compiled matcher as utils/classifier.py.
+# core/category_map.py answers in this taxonomy: Gamma's category unless the keywords find a finer one ("nfl").
+_category_classifier = KeywordClassifier(CATEGORY_KEYWORDS)
+
+
 def classify_market_category(title: str) -> str:
     """Classify a market into a category based on title keywords."""
-    text = title.lower()
-    scores = {}
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        scores[category] = sum(1 for kw in keywords if kw in text)
-    if max(scores.values(), default=0) == 0:
-        return "other"
-    return max(scores, key=scores.get)
+    return _category_classifier.classify(title)
 
 
 def analyze_trader_categories(profile) -> tuple[str, dict, dict]:
@@ -154,12 +158,12 @@ def analyze_trader_categories(profile) -> tuple[str, dict, dict]:
         if trade.condition_id in seen_markets:
             continue
         seen_markets.add(trade.condition_id)
-        category = classify_market_category(trade.title)
+        category = category_map.category(trade.condition_id, trade.title, _category_classifier)
         category_counts[category] = category_counts.get(category, 0) + 1
 
     # Calculate per-category win rates from closed positions
     for pos in profile.closed_positions:
-        category = classify_market_category(pos.title)
+        category = category_map.category(pos.condition_id, pos.title, _category_classifier)
         category_total[category] = category_total.get(category, 0) + 1
         if pos.realized_pnl > 0:
             category_wins[category] = category_wins.get(category, 0) + 1
@@ -307,45 +311,6 @@ def detect_bot_patterns(address: str, username: str, win_rate: float, total_trad
 # Data Models (reuse from v1 with additions)
 # ─────────────────────────────────────────────────────────────────────
 
-@dataclass
-class Trade:
-    """A single trade on Polymarket."""
-    side: str              # BUY or SELL
-    size: float            # token amount
-    price: float           # price per token in USDC
-    timestamp: int         # unix timestamp
-    condition_id: str      # market condition ID
-    title: str = ""
-    outcome: str = ""      # YES or NO
-    asset: str = ""        # token ID
-
-    @property
-    def notional(self) -> float:
-        return self.size * self.price
-
-    @property
-    def dt(self) -> datetime:
-        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
-
-
-@dataclass
-class Position:
-    """A trader's position in a market (open or closed)."""
-    condition_id: str
-    title: str
-    outcome: str           # YES or NO
-    size: float            # tokens held
-    avg_price: float       # average entry price
-    current_price: float   # current market price
-    initial_value: float   # USDC spent to enter
-    current_value: float   # current mark-to-market
-    cash_pnl: float        # realized + unrealized PnL
-    pct_pnl: float         # percentage PnL
-    is_closed: bool = False
-    realized_pnl: float = 0.0
-    timestamp: int = 0     # Added for time-based analysis
-
-
 @dataclass
 class TraderProfile:
     """Raw data collected from Polymarket APIs for a single trader."""
@@ -418,40 +383,49 @@ class TraderScore:
 class PolymarketClient:
     """Async client for Polymarket's public Data API with market-first discovery."""
 
-    def __init__(self):
-        self._client: Optional[httpx.AsyncClient] = None
+    def __init__(self, priority: Priority = Priority.BULK):
         self._semaphore = asyncio.Semaphore(MAX_CONCURRENT)
-        self._last_request = 0.0
+        self._flights = SingleFlight()
+        self.priority = priority  # Profiling is bulk work; it yields the shared budget to realtime polls
 
     async def __aenter__(self):
-        self._client = httpx.AsyncClient(
-            timeout=30.0,
-            headers={"Accept": "application/json"},
-        )
         return self
 
     async def __aexit__(self, *args):
-        if self._client:
-            await self._client.aclose()
-
-    async def _get(self, url: str, params: dict | None = None) -> dict | list:
-        """Rate-limited GET request."""
-        async with self._semaphore:
-            elapsed = time.monotonic() - self._last_request
-            if elapsed < REQUEST_DELAY:
-                await asyncio.sleep(REQUEST_DELAY - elapsed)
+        # Connections belong to the shared transport and stay pooled for the next caller
+        pass
+
+    async def _get(
+        self, url: str, params: dict | None = None, cached: bool = True, record: type | None = None
+    ) -> dict | list:
+        """Rate-limited GET; concurrent identical calls share one request and one decoded result."""
+        return await self._flights.do(
+            (request_key("GET", url, params), cached, record), lambda: self._fetch(url, params, cached, record)
+        )
 
-            resp = await self._client.get(url, params=params)
-            self._last_request = time.monotonic()
+    async def _fetch(
+        self, url: str, params: dict | None = None, cached: bool = True, record: type | None = None
+    ) -> dict | list:
+        """
+        Single GET + decode via the response cache (pacing and 429 back-off live in the shared transport).
 
-            if resp.status_code == 429:
-                retry_after = float(resp.headers.get("Retry-After", "5"))
-                log("warning", f"Rate limited, waiting {retry_after}s...", source="trader_discovery")
-                await asyncio.sleep(retry_after)
-                return await self._get(url, params)
+        With `record`, the body decodes straight into a list of typed records.
+        """
+        for attempt in range(MAX_RATE_LIMIT_RETRIES):
+            async with self._semaphore:
+                if cached:
+                    resp = await transport.get_cached(url, params=params, priority=self.priority)
+                else:
+                    resp = await transport.get(url, params=params, priority=self.priority)
+            if resp.status_code != 429:
+                break
+            if attempt + 1 < MAX_RATE_LIMIT_RETRIES:
+                log("warning", "Rate limited, retrying after host back-off...", source="trader_discovery")
 
-            resp.raise_for_status()
-            return resp.json()
+        resp.raise_for_status()  # Still 429 after the last attempt: raises like any other HTTP error
+        if record is not None:
+            return decode_list(resp.content, record)
+        return resp.json()
 
     # ═══════════════════════════════════════════════════════════════
     # NEW: Market-First Discovery APIs
@@ -514,30 +488,27 @@ class PolymarketClient:
     # Existing APIs (reused from v1)
     # ═══════════════════════════════════════════════════════════════
 
-    async def get_trades(self, address: str, limit: int = 500, offset: int = 0) -> list[dict]:
+    async def get_trades(self, address: str, limit: int = 500, offset: int = 0, cached: bool = True) -> list[Trade]:
         """Fetch trade history for a user."""
         return await self._get(f"{DATA_API}/trades", {
             "user": address,
             "limit": limit,
             "offset": offset,
-        })
+        }, cached=cached, record=Trade)
 
-    async def get_all_trades(self, address: str, max_trades: int = 10000) -> list[dict]:
-        """Paginate through all trades for a user."""
-        all_trades = []
-        offset = 0
+    async def get_all_trades(self, address: str, max_trades: int = 10000) -> list[Trade]:
+        """All trades for a user, newest first — after the first run only pages newer than the stored watermark."""
         batch_size = 500
-        while offset < max_trades:
-            batch = await self.get_trades(address, limit=batch_size, offset=offset)
-            if not batch:
-                break
-            all_trades.extend(batch)
-            if len(batch) < batch_size:
-                break
-            offset += batch_size
-        return all_trades
+        return await trade_history.sync(
+            address,
+            lambda offset, incremental: self.get_trades(
+                address, limit=batch_size, offset=offset, cached=not incremental
+            ),
+            max_trades=max_trades,
+            page_size=batch_size,
+        )
 
-    async def get_positions(self, address: str, limit: int = 500, offset: int = 0) -> list[dict]:
+    async def get_positions(self, address: str, limit: int = 500, offset: int = 0) -> list[Position]:
         """Fetch current open positions."""
         return await self._get(f"{DATA_API}/positions", {
             "user": address,
@@ -545,30 +516,24 @@ class PolymarketClient:
             "offset": offset,
             "sortBy": "CASHPNL",
             "sortDirection": "DESC",
-        })
+        }, record=Position)
 
-    async def get_closed_positions(self, address: str, limit: int = 50, offset: int = 0) -> list[dict]:
+    async def get_closed_positions(self, address: str, limit: int = 50, offset: int = 0) -> list[Position]:
         """Fetch resolved/closed positions."""
         return await self._get(f"{DATA_API}/closed-positions", {
             "user": address,
             "limit": limit,
             "offset": offset,
-        })
-
-    async def get_all_closed_positions(self, address: str, max_positions: int = 10000) -> list[dict]:
-        """Paginate through closed positions."""
-        all_positions = []
-        offset = 0
-        batch_size = 50
-        while offset < max_positions:
-            batch = await self.get_closed_positions(address, limit=batch_size, offset=offset)
-            if not batch:
-                break
-            all_positions.extend(batch)
-            if len(batch) < batch_size:
-                break
-            offset += batch_size
-        return all_positions
+        }, record=Position)
+
+    async def get_all_closed_positions(self, address: str, max_positions: int = 10000) -> list[Position]:
+        """Paginate through closed positions, fanning out several offsets at once."""
+        batch_size = 50  # API max
+        return await paginate(
+            lambda offset: self.get_closed_positions(address, limit=batch_size, offset=offset),
+            page_size=batch_size,
+            max_items=max_positions,
+        )
 
     async def get_portfolio_value(self, address: str) -> float:
         """Get total portfolio value."""
@@ -608,63 +573,16 @@ async def collect_trader_profile(
         return_exceptions=True,
     )
 
-    # Parse trades
+    # Records arrive already typed from the decoder — no per-field conversion pass
     if isinstance(trades_raw, list):
-        for t in trades_raw:
-            try:
-                profile.trades.append(Trade(
-                    side=t.get("side", ""),
-                    size=float(t.get("size", 0)),
-                    price=float(t.get("price", 0)),
-                    timestamp=int(t.get("timestamp", 0)),
-                    condition_id=t.get("conditionId", t.get("market", "")),
-                    title=t.get("title", ""),
-                    outcome=t.get("outcome", ""),
-                    asset=t.get("asset", ""),
-                ))
-            except (ValueError, TypeError):
-                continue
-
-    # Parse open positions
+        profile.trades = trades_raw
+
     if isinstance(positions_raw, list):
-        for pos in positions_raw:
-            try:
-                profile.open_positions.append(Position(
-                    condition_id=pos.get("conditionId", pos.get("market", "")),
-                    title=pos.get("title", ""),
-                    outcome=pos.get("outcome", ""),
-                    size=float(pos.get("size", 0)),
-                    avg_price=float(pos.get("avgPrice", 0)),
-                    current_price=float(pos.get("curPrice", pos.get("price", 0))),
-                    initial_value=float(pos.get("initialValue", 0)),
-                    current_value=float(pos.get("currentValue", 0)),
-                    cash_pnl=float(pos.get("cashPnl", 0)),
-                    pct_pnl=float(pos.get("percentPnl", 0)),
-                ))
-            except (ValueError, TypeError):
-                continue
-
-    # Parse closed positions (with timestamp for lifecycle analysis)
+        profile.open_positions = positions_raw
+
     if isinstance(closed_raw, list):
-        for pos in closed_raw:
-            try:
-                profile.closed_positions.append(Position(
-                    condition_id=pos.get("conditionId", pos.get("market", "")),
-                    title=pos.get("title", ""),
-                    outcome=pos.get("outcome", ""),
-                    size=float(pos.get("size", 0)),
-                    avg_price=float(pos.get("avgPrice", 0)),
-                    current_price=float(pos.get("curPrice", pos.get("price", 0))),
-                    initial_value=float(pos.get("initialValue", 0)),
-                    current_value=float(pos.get("currentValue", 0)),
-                    cash_pnl=float(pos.get("cashPnl", 0)),
-                    pct_pnl=float(pos.get("percentPnl", 0)),
-                    is_closed=True,
-                    realized_pnl=float(pos.get("realizedPnl", 0)),
-                    timestamp=int(pos.get("timestamp", 0)),  # For lifecycle analysis
-                ))
-            except (ValueError, TypeError):
-                continue
+        # Copies: the decoded records may be shared with concurrent callers through singleflight
+        profile.closed_positions = [msgspec.structs.replace(pos, is_closed=True) for pos in closed_raw]
 
     # Track markets where trader specializes (top 5 by P&L)
     market_pnl: dict[str, float] = {}
@@ -1095,7 +1013,10 @@ class TraderDiscovery:
                     log("debug", f"Failed to profile {cand.get('username', cand['address'][:12])}: {e}",
                         source="trader_discovery")
 
-            # Step 4: Score all traders
+            # Step 4: Score all traders (market categories looked up once, for everyone)
+            await category_map.prefetch({
+                m.condition_id: m.title for p in profiles for m in (*p.trades, *p.closed_positions)
+            })
             log("info", f"Scoring {len(profiles)} traders with v2 algorithm...", source="trader_discovery")
             scores: list[TraderScore] = []
 
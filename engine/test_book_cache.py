@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the L2 book cache (core/book_cache.py): freshness, batched
+POST /books fetches, MarketScanner's book warming and lookups, and dropping
+books for markets that left the universe. The CLOB is stubbed.
+
+    python -m pytest -q test_book_cache.py
+"""
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+import msgspec
+import pytest
+
+import core.book_cache as book_cache_module
+import core.market_scanner as market_scanner
+import run
+from core.book_cache import BookCache
+from core.market_scanner import Market, MarketScanner
+
+
+class FakeClob:
+    """POST /books: one book per requested token, its bid derived from the token id."""
+
+    def __init__(self):
+        self.batches: list[list[str]] = []
+
+    async def post(self, url, json=None, priority=None, timeout=None):
+        tokens = [entry["token_id"] for entry in json]
+        self.batches.append(tokens)
+        books = [
+            {"asset_id": t, "bids": [{"price": "0.40", "size": t}], "asks": [{"price": "0.45", "size": "5"}]}
+            for t in tokens if t != "unknown"
+        ]
+        return httpx.Response(200, content=msgspec.json.encode(books), request=httpx.Request("POST", url))
+
+
+@pytest.fixture
+def clob(monkeypatch):
+    fake = FakeClob()
+    monkeypatch.setattr(book_cache_module, "transport", fake)
+    return fake
+
+
+def market(i: int, liquidity: float) -> Market:
+    return Market(
+        slug=f"market-{i}", question=f"Market {i}?", yes_token=f"{i}1", no_token=f"{i}2",
+        end_date=datetime(2099, 1, 1, tzinfo=timezone.utc), volume=1000.0, liquidity=liquidity,
+        yes_price=0.4, no_price=0.6, category="other",
+    )
+
+
+def test_fresh_books_are_served_from_memory(clob):
+    cache = BookCache({"ttl_seconds": 60})
+    books = asyncio.run(cache.get_many(["11", "12", "unknown"]))
+    assert sorted(books) == ["11", "12"]
+    assert books["11"].bids == [(0.40, 11.0)]
+
+    asyncio.run(cache.get_many(["11", "12"]))
+    assert clob.batches == [["11", "12", "unknown"]]
+    assert cache.stats["hits"] == 2
+
+    books["11"].fetched_at -= 61  # Stale: only this one goes back to the network
+    asyncio.run(cache.get_many(["11", "12"]))
+    assert clob.batches[-1] == ["11"]
+
+
+def test_refresh_chunks_requests_by_batch_size(clob):
+    cache = BookCache({"batch_size": 3, "max_concurrent_batches": 2})
+    asyncio.run(cache.refresh([str(i) for i in range(8)] + ["0", ""]))  # Duplicates and blanks are dropped
+    assert sorted(len(batch) for batch in clob.batches) == [2, 3, 3]
+    assert sorted(t for batch in clob.batches for t in batch) == [str(i) for i in range(8)]
+    assert cache.stats["batches"] == 3 and len(cache) == 8
+
+
+def test_warm_books_batches_only_liquid_markets(clob, monkeypatch):
+    cache = BookCache({"batch_size": 4})
+    monkeypatch.setattr(market_scanner, "book_cache", cache)
+    markets = [market(i, 10_000.0 if i % 2 else 100.0) for i in range(1, 7)]
+    asyncio.run(MarketScanner().warm_books(markets, min_liquidity=5000))
+    assert sorted(len(batch) for batch in clob.batches) == [2, 4]
+    assert sorted(t for batch in clob.batches for t in batch) == ["11", "12", "31", "32", "51", "52"]
+
+
+def test_get_orderbook_goes_through_the_cache(clob, monkeypatch):
+    cache = BookCache()
+    monkeypatch.setattr(market_scanner, "book_cache", cache)
+    scanner = MarketScanner()
+    top = asyncio.run(scanner.get_orderbook("11"))
+    assert top["best_bid"] == 0.40 and top["best_ask"] == 0.45
+    asyncio.run(scanner.get_orderbook("11"))
+    assert clob.batches == [["11"]]
+    assert asyncio.run(scanner.get_orderbook("unknown"))["spread"] == 1.0
+
+
+def test_books_outside_the_universe_are_dropped(clob, monkeypatch):
+    from core.market_stream import market_stream
+    from core.pick_resolver import pick_resolver
+    from core.resolved_markets import ResolvedMarkets
+
+    cache = BookCache()
+    asyncio.run(cache.refresh(["11", "12", "21", "22", "31", "32"]))
+    resolved = ResolvedMarkets()
+    resolved.mark_resolved("market-2")
+    monkeypatch.setattr(book_cache_module, "book_cache", cache)
+    monkeypatch.setattr("core.resolved_markets.resolved_markets", resolved)
+    monkeypatch.setattr(market_stream, "track", lambda markets: None)
+    monkeypatch.setattr(pick_resolver, "watched_market_ids", lambda: [])
+    monkeypatch.setattr(run, "_stream_markets", [])
+    universe = [{"market_id": f"market-{i}", "yes_token": f"{i}1", "no_token": f"{i}2"} for i in (1, 2)]
+    monkeypatch.setattr(run, "_universe", {"markets": universe, "condition_ids": {}})
+
+    run.track_live_markets()
+    assert sorted(cache._books) == ["11", "12"]  # market-2 resolved, market-3 left the scan
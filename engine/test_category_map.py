@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared market category map (core/category_map.py) and its
+consumers: trader discovery v1/v2 and the conviction engine's
+normalize_category. Each test gets its own SQLite file; Gamma is not called.
+
+    python -m pytest -q test_category_map.py
+"""
+import pytest
+
+import analyst.conviction_engine as conviction_engine
+import shadow.trader_discovery as discovery_v1
+import shadow.trader_discovery_v2 as discovery_v2
+from core.category_map import CategoryMap
+from utils.classifier import KeywordClassifier, category_classifier
+from utils.schemas import Trade
+
+
+@pytest.fixture
+def category_map(tmp_path, monkeypatch):
+    """A fresh map swapped in for every consumer."""
+    fresh = CategoryMap(path=str(tmp_path / "category_map.sqlite3"))
+    for module in (discovery_v1, discovery_v2, conviction_engine):
+        monkeypatch.setattr(module, "category_map", fresh)
+    return fresh
+
+
+def profile_of(module, *markets: tuple[str, str]):
+    """A profile with one trade per (condition_id, title)."""
+    trades = [Trade(condition_id=cid, title=title) for cid, title in markets]
+    return module.TraderProfile(address="0xabc", trades=trades)
+
+
+def test_v2_keeps_nfl_under_gammas_sports(category_map):
+    category_map.put_many([("0xc1", "chiefs-vs-49ers", "NFL", "Chiefs vs 49ers: who wins the Super Bowl?")])
+
+    primary, _, _ = discovery_v2.analyze_trader_categories(
+        profile_of(discovery_v2, ("0xc1", "Chiefs vs 49ers: who wins the Super Bowl?"))
+    )
+    assert primary == "nfl"
+
+
+def test_v1_keeps_mentions_under_gammas_culture(category_map):
+    category_map.put_many([("0xc1", "musk-tweets", "Social Media", "Will Elon Musk tweet 200 times this week?")])
+
+    primary, _, _ = discovery_v1.analyze_trader_categories(
+        profile_of(discovery_v1, ("0xc1", "Will Elon Musk tweet 200 times this week?"))
+    )
+    assert primary == "mentions"
+
+
+@pytest.mark.parametrize("module", [discovery_v1, discovery_v2])
+def test_gamma_category_replaces_a_landing_tab_or_no_answer(module, category_map):
+    category_map.put_many([
+        ("0xc1", "who-wins", "Crypto", "Who wins on Friday?"),                           # Keywords: nothing
+        ("0xc2", "btc-championship", "Sports", "Will Bitcoin win the 2027 championship?"),  # Keywords: crypto
+    ])
+
+    _, breakdown, _ = module.analyze_trader_categories(
+        profile_of(module, ("0xc1", "Who wins on Friday?"), ("0xc2", "Will Bitcoin win the 2027 championship?"))
+    )
+    assert breakdown == {"crypto": 50, "sports": 50}
+
+
+def test_gamma_category_outside_the_callers_taxonomy_is_ignored(category_map):
+    category_map.put_many([("0xc1", "btc-100k", "Crypto", "Bitcoin above 100k and will the Senate vote?")])
+    politics_only = KeywordClassifier({"politics": ["senate", "vote"]})
+
+    assert category_map.category("0xc1", "Bitcoin above 100k and will the Senate vote?", politics_only) == "politics"
+    assert category_map.category("0xc1", "Bitcoin above 100k and will the Senate vote?") == "crypto"
+
+
+def test_unknown_markets_are_classified_and_remembered(category_map):
+    assert category_map.category("0xc9", "Will the Senate pass the bill?") == "politics"
+    assert category_map.stats["classified"] == 1
+    assert category_map.category("0xc9", "Will the Senate pass the bill?") == "politics"
+    assert category_map.stats["hits"] == 1
+
+
+def test_known_markets_answer_without_reclassifying(category_map, monkeypatch):
+    category_map.put_many([
+        ("0xc1", "musk-tweets", None, "Will Elon Musk tweet 200 times this week?"),
+        ("0xc2", "fed-cut", "Economics", "Will the Fed cut in March?"),
+    ])
+    titles = []
+    classify = category_classifier.classify
+    monkeypatch.setattr(category_classifier, "classify", lambda title: titles.append(title) or classify(title))
+
+    for _ in range(3):
+        assert category_map.category("0xc1", "Will Elon Musk tweet 200 times this week?") == "mentions"
+        assert category_map.category("0xc2", "Will the Fed cut in March?") == "finance"
+    assert titles == ["Will the Fed cut in March?"]  # Gamma's answer is checked against the title once
+
+    category_map.put_many([("0xc2", "fed-cut", "Crypto", "Will the Fed cut in March?")])
+    assert category_map.category("0xc2", "Will the Fed cut in March?") == "crypto"  # A changed entry is checked again
+    assert len(titles) == 2
+
+
+def test_normalize_category_prefers_the_callers_gamma_category(category_map):
+    category_map.put_many([("0xc1", "nba-finals", "Crypto", "NBA Finals winner")])
+    assert conviction_engine.normalize_category("NBA", "nba-finals") == "sports"
+    assert conviction_engine.normalize_category("Tennis") == "sports"
+
+
+def test_normalize_category_falls_back_to_the_map_then_culture(category_map):
+    category_map.put_many([
+        ("0xc1", "fed-cut", "Economics", "Will the Fed cut in March?"),
+        ("0xc2", "musk-tweets", None, "Will Elon Musk tweet 200 times this week?"),  # Keywords: "mentions"
+    ])
+    assert conviction_engine.normalize_category(None, "fed-cut") == "finance"
+    assert conviction_engine.normalize_category("Weird", "fed-cut") == "finance"
+    assert conviction_engine.normalize_category(None, "musk-tweets") == "culture"  # Not a landing tab
+    assert conviction_engine.normalize_category(None, "never-seen") == "culture"
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled keyword classifier (utils/classifier.py): its scores
+must match the per-keyword `kw in text` scan it replaced wherever every hit
+is a whole word.
+
+    python -m pytest -q test_classifier.py
+"""
+import random
+import re
+
+from utils.classifier import CATEGORY_KEYWORDS, KeywordClassifier, category_classifier
+
+
+def substring_scores(title: str) -> dict[str, int]:
+    """The scoring the compiled matcher replaced: one `in` scan per keyword."""
+    text = title.lower()
+    return {category: sum(1 for kw in keywords if kw in text) for category, keywords in CATEGORY_KEYWORDS.items()}
+
+
+def inside_a_word(title: str) -> bool:
+    """True if some keyword occurs only inside a longer word (where the two scorings differ on purpose)."""
+    text = title.lower()
+    return any(
+        kw in text and not re.search(rf"(?<![a-z0-9]){re.escape(kw)}(?:e?s)?(?![a-z0-9])", text)
+        for keywords in CATEGORY_KEYWORDS.values() for kw in keywords
+    )
+
+
+def test_overlapping_keywords_all_score():
+    assert category_classifier.scores("Bull market by June?")["finance"] == 2  # "bull market" and "market"
+    scores = category_classifier.scores("Who wins the World Series?")
+    assert scores["sports"] == 1 and scores["culture"] == 1  # "world series" and "series"
+    assert category_classifier.classify("Who wins the World Series?") == "sports"  # Tie goes to the first listed
+
+
+def test_shorter_keyword_at_the_same_start_scores():
+    classifier = KeywordClassifier({"sports": ["world", "world cup"], "other sports": ["cup"]})
+    assert classifier.keywords("Who wins the World Cup?") == {"world", "world cup", "cup"}
+    assert classifier.scores("Who wins the World Cup?") == {"sports": 2, "other sports": 1}
+
+
+def test_scores_match_the_substring_scan_on_whole_word_titles():
+    titles = [
+        "Will Trump win the 2028 election?",
+        "Bitcoin above $100k and a new Ethereum ATH?",
+        "Will the Fed cut the interest rate before the recession?",
+        "Elon Musk tweet count this week",
+        "NBA Finals MVP: who wins?",
+        "Will the bear market end before the Super Bowl?",
+        "Oscar for best actress goes to a Netflix film?",
+    ]
+    rng = random.Random(7)
+    words = [kw for keywords in CATEGORY_KEYWORDS.values() for kw in keywords] + ["will", "the", "by", "2026"]
+    titles += [" ".join(rng.choice(words) for _ in range(rng.randint(2, 8))) + "?" for _ in range(2000)]
+
+    compared = 0
+    for title in titles:
+        if inside_a_word(title):
+            continue
+        assert category_classifier.scores(title) == substring_scores(title), title
+        compared += 1
+    assert compared > 1000
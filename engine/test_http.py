@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared HTTP transport (utils/http.py) and the layers under it:
+the pooled clients, request coalescing, the response cache, hedging, the rate
+limiter and circuit breakers. The network is an httpx.MockTransport; nothing
+leaves the process.
+
+    python -m pytest -q test_http.py
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers, CircuitOpenError
+from utils.hedging import HedgePolicy
+from utils.http import HttpTransport
+from utils.rate_limiter import AdaptiveRateLimiter, Priority
+from utils.response_cache import ResponseCache
+from utils.singleflight import SingleFlight
+
+URL = "https://data-api.example/positions"
+
+
+class MockedTransport(HttpTransport):
+    """HttpTransport whose pooled client answers from `handler` instead of the network."""
+
+    def __init__(self, handler, tmp_path, hedge: dict | None = None, rate: dict | None = None,
+                 config: dict | None = None):
+        super().__init__(
+            config,
+            limiter=AdaptiveRateLimiter({"default_rps": 1000.0, "burst": 1000, **(rate or {})}),
+            cache=ResponseCache({"path": str(tmp_path / "http_cache.sqlite3"), "ttl_seconds": {"/positions": 300}}),
+            hedger=HedgePolicy({"enabled": False, **(hedge or {})}),
+            breakers=CircuitBreakers(),
+        )
+        self.handler = handler
+        self.calls: list[httpx.Request] = []
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(request)
+        return await self.handler(request)
+
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(transport=httpx.MockTransport(self._handle))
+            self._loop = loop
+            self._host_slots = {}
+            self._bulk_slots = {}
+            self.flights = SingleFlight()
+        return self._client
+
+
+# --- Pool ---
+
+def test_one_async_client_per_event_loop_until_closed():
+    http = HttpTransport()
+
+    async def main():
+        first = http.client()
+        assert http.client() is first
+        await http.aclose()
+        assert first.is_closed
+        second = http.client()
+        assert second is not first and not second.is_closed
+        return second
+
+    previous = asyncio.run(main())
+    assert asyncio.run(main()) is not previous  # A new asyncio.run() gets its own pool
+    asyncio.run(http.aclose())
+
+
+def test_sync_client_is_shared_until_closed():
+    http = HttpTransport()
+    client = http.sync_client()
+    assert http.sync_client() is client
+    http.close()
+    assert client.is_closed
+    assert http.sync_client() is not client
+    http.close()
+
+
+def test_requests_to_one_host_hold_at_most_max_per_host_connections(tmp_path):
+    active, peak = 0, 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200, json={})
+
+    http = MockedTransport(handler, tmp_path, config={"max_per_host": 2})
+
+    async def main():
+        await asyncio.gather(*(http.post(URL, json={"n": i}) for i in range(6)))
+
+    asyncio.run(main())
+    assert len(http.calls) == 6 and peak == 2
+
+
+# --- Singleflight ---
+
+def test_singleflight_shares_one_call_and_survives_a_cancelled_waiter():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"v": 1}
+
+    async def main():
+        first = asyncio.ensure_future(flights.do("key", fetch))
+        second = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, flights.stats()
+
+    result, stats = asyncio.run(main())
+    assert result == {"v": 1} and calls == [1]
+    assert stats == {"calls": 2, "shared": 1, "in_flight": 0}
+
+
+def test_singleflight_hands_the_error_to_every_waiter_then_forgets_the_key():
+    flights = SingleFlight()
+    attempts = []
+
+    async def fetch():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise httpx.ConnectError("down")
+
+    async def main():
+        results = await asyncio.gather(*(flights.do("key", fetch) for _ in range(3)), return_exceptions=True)
+        await asyncio.gather(flights.do("key", fetch), return_exceptions=True)  # Not stuck on the failed call
+        return results
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, httpx.ConnectError) for r in results)
+    assert len(attempts) == 2
+
+
+# --- Rate limiter ---
+
+def test_limiter_serves_realtime_ahead_of_a_bulk_backlog():
+    limiter = AdaptiveRateLimiter({"default_rps": 50.0, "burst": 1})
+    order = []
+
+    async def take(name, priority):
+        await limiter.acquire("data-api.example", priority)
+        order.append(name)
+
+    async def main():
+        await take("first", Priority.BULK)  # Drains the one-token bucket
+        bulk = [asyncio.ensure_future(take(f"bulk-{i}", Priority.BULK)) for i in range(3)]
+        await asyncio.sleep(0)
+        await asyncio.gather(take("realtime", Priority.REALTIME), *bulk)
+
+    asyncio.run(main())
+    assert order == ["first", "realtime", "bulk-0", "bulk-1", "bulk-2"]
+    lanes = limiter.stats()["data-api.example"]["lanes"]
+    assert lanes["realtime"]["granted"] == 1 and lanes["bulk"]["granted"] == 4
+
+
+def test_limiter_halves_on_429_and_climbs_back_on_clean_responses():
+    limiter = AdaptiveRateLimiter({"default_rps": 8.0, "decrease_factor": 0.5, "increase_rps": 0.5})
+    limiter.observe("data-api.example", 429, "2")
+    bucket = limiter._bucket("data-api.example")
+    assert bucket.rate == 4.0 and bucket.tokens == 0.0
+    assert bucket.wait_time(bucket.updated) >= 1.9  # Retry-After pauses the host
+
+    limiter.observe("data-api.example", 429)  # Same congestion burst: no second cut
+    assert bucket.rate == 4.0
+    for _ in range(8):
+        limiter.observe("data-api.example", 200)
+    assert 4.0 < bucket.rate <= 5.0
+
+
+# --- Circuit breaker ---
+
+def test_breaker_opens_after_consecutive_failures_and_probes_once():
+    breaker = CircuitBreaker("data-api.example/positions", failure_threshold=3, reset_seconds=30.0)
+    for _ in range(3):
+        breaker.before()
+        breaker.failure()
+    assert breaker.state == OPEN and breaker.trips == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+
+    breaker.opened_at -= 30.0  # The reset period is over
+    breaker.before()           # The one probe
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before()       # Everyone else still fails fast
+    breaker.failure()
+    assert breaker.state == OPEN and breaker.trips == 2  # A failed probe re-opens it
+
+    breaker.opened_at -= 30.0
+    breaker.before()
+    breaker.success()
+    assert breaker.state == CLOSED and breaker.failures == 0
+
+
+def test_transport_fails_fast_once_an_endpoint_keeps_failing(tmp_path):
+    async def handler(request):
+        return httpx.Response(503)
+
+    transport = MockedTransport(handler, tmp_path)
+    transport.breakers = CircuitBreakers({"failure_threshold": 2, "reset_seconds": 30.0})
+
+    async def main():
+        statuses = [(await transport.get(URL)).status_code for _ in range(2)]
+        with pytest.raises(CircuitOpenError):
+            await transport.get(URL)
+        return statuses
+
+    assert asyncio.run(main()) == [503, 503]
+    assert len(transport.calls) == 2
+
+
+# --- Coalescing ---
+
+def test_identical_gets_share_one_request(tmp_path):
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"v": 1})
+
+    transport = MockedTransport(handler, tmp_path)
+
+    async def main():
+        return await asyncio.gather(*(transport.get(URL, params={"user": "0xabc"}) for _ in range(5)))
+
+    responses = asyncio.run(main())
+    assert [r.json() for r in responses] == [{"v": 1}] * 5
+    assert len(transport.calls) == 1
+
+
+def test_conditional_get_never_shares_a_plain_gets_response(tmp_path):
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        if "if-none-match" in request.headers:
+            return httpx.Response(304)
+        return httpx.Response(200, json={"v": 1})
+
+    transport = MockedTransport(handler, tmp_path)
+
+    async def main():
+        return await asyncio.gather(
+            transport.get(URL, headers={"If-None-Match": '"etag-1"'}),
+            transport.get(URL),
+        )
+
+    conditional, plain = asyncio.run(main())
+    assert conditional.status_code == 304
+    assert plain.status_code == 200 and plain.json() == {"v": 1}
+    assert len(transport.calls) == 2
+
+
+# --- Response cache ---
+
+def _etag_server(etag: str = '"v1"', body: dict | None = None):
+    """Answers 304 to a matching If-None-Match, otherwise 200 with the body and ETag."""
+    async def handler(request):
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, json=body or {"v": 1}, headers={"ETag": etag})
+    return handler
+
+
+def test_get_cached_serves_fresh_entries_without_the_network(tmp_path):
+    transport = MockedTransport(_etag_server(), tmp_path)
+
+    async def main():
+        return await transport.get_cached(URL), await transport.get_cached(URL)
+
+    first, second = asyncio.run(main())
+    assert first.json() == second.json() == {"v": 1}
+    assert second.headers["X-Cache"] == "HIT"
+    assert len(transport.calls) == 1
+
+
+def test_get_cached_revalidates_stale_entries_with_their_etag(tmp_path):
+    transport = MockedTransport(_etag_server(), tmp_path)
+    key = transport.cache.key(URL)
+    transport.cache.put(key, b'{"v": 1}', ttl=-1, etag='"v1"')  # Stale
+
+    resp = asyncio.run(transport.get_cached(URL))
+    assert resp.status_code == 200 and resp.json() == {"v": 1}
+    assert transport.calls[0].headers["if-none-match"] == '"v1"'
+    assert transport.cache.get(key).fresh  # The 304 re-armed the TTL
+
+
+def test_get_cached_refetches_when_a_304_has_nothing_cached_behind_it(tmp_path):
+    transport = MockedTransport(_etag_server(), tmp_path)
+
+    # The caller's own validator matches, but this process has no cached body to serve
+    resp = asyncio.run(transport.get_cached(URL, headers={"If-None-Match": '"v1"'}))
+    assert resp.status_code == 200 and resp.json() == {"v": 1}
+    assert [r.headers.get("if-none-match") for r in transport.calls] == ['"v1"', None]
+    assert transport.cache.get(transport.cache.key(URL)).body == resp.content
+
+
+# --- Hedging ---
+
+HEDGE_FAST = {"enabled": True, "min_samples": 1, "min_delay_seconds": 0.05, "max_delay_seconds": 0.05, "budget": 1.0}
+
+
+class SlowFirstAcquire(AdaptiveRateLimiter):
+    """The first request queues `delay` seconds in the limiter, as behind a bulk backlog."""
+
+    def __init__(self, delay: float):
+        super().__init__({"default_rps": 1000.0, "burst": 1000})
+        self.delay = delay
+        self.acquired = 0
+
+    async def acquire(self, host, priority=None):
+        self.acquired += 1
+        if self.acquired == 1:
+            await asyncio.sleep(self.delay)
+
+
+def test_hedge_fires_when_the_primary_is_slow_on_the_wire(tmp_path):
+    async def handler(request):
+        await asyncio.sleep(0.3 if len(transport.calls) == 1 else 0.01)
+        return httpx.Response(200, json={"v": 1})
+
+    transport = MockedTransport(handler, tmp_path, hedge=HEDGE_FAST)
+    transport.hedger.record_attempt("data-api.example/positions", 0.05)
+
+    resp = asyncio.run(transport.get(URL))
+    assert resp.json() == {"v": 1}
+    assert len(transport.calls) == 2
+    assert transport.hedger.hedged == 1 and transport.hedger.wins == 1
+
+
+def test_time_queued_in_the_limiter_does_not_trigger_a_hedge(tmp_path):
+    async def handler(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"v": 1})
+
+    transport = MockedTransport(handler, tmp_path, hedge=HEDGE_FAST)
+    transport.limiter = SlowFirstAcquire(0.3)
+    transport.hedger.record_attempt("data-api.example/positions", 0.05)
+
+    resp = asyncio.run(transport.get(URL))
+    assert resp.json() == {"v": 1}
+    assert len(transport.calls) == 1
+    assert transport.hedger.hedged == 0
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Tests for the market universe pipeline: MarketScanner's Gamma scan, the
+diff-based sync into ep_markets_raw (core/market_sync.py), the shared
+market snapshot (core/market_cache.py) and the columnar screening table
+(core/market_table.py). Supabase and Gamma are stubbed.
+
+    python -m pytest -q test_market_scanner.py
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+import core.market_scanner as market_scanner
+import core.market_sync as market_sync_module
+from config import CONVICTION_CONFIG, MARKET_CACHE_CONFIG, MARKET_SCANNER_CONFIG
+from core.market_cache import MarketCache
+from core.market_scanner import Market, MarketScanner
+from core.market_sync import MarketSync
+from core.market_table import table_for
+from core.resolved_markets import ResolvedMarkets
+from db.queries import MarketQueries
+
+
+# --- Market cache ---
+
+def test_market_cache_entries_outlive_the_scan_interval(monkeypatch):
+    cache = MarketCache()
+    scan_interval = CONVICTION_CONFIG["scan_interval_minutes"] * 60
+    assert cache.ttl == MARKET_CACHE_CONFIG["ttl_scan_intervals"] * scan_interval
+    assert cache.ttl > scan_interval
+
+    def unexpected(market_id):
+        raise AssertionError(f"Supabase queried for {market_id}")
+
+    monkeypatch.setattr(MarketQueries, "get_market_by_id", staticmethod(unexpected))
+    cache.replace([{"market_id": "will-it-rain", "yes_token": "111", "no_token": "222"}], {"will-it-rain": "0xc0"})
+    assert cache.get("will-it-rain")["market_id"] == "will-it-rain"
+    assert cache.get("0xc0") is cache.get("222")
+
+
+# --- Gamma scan ---
+
+FUTURE = "2099-01-01T00:00:00Z"
+PAST = "2000-01-01T00:00:00Z"
+
+
+def gamma_record(i: int, end_date: str = FUTURE, tokens: bool = True) -> dict:
+    return {
+        "slug": f"market-{i}",
+        "question": f"Market {i}?",
+        "conditionId": f"0x{i:04x}",
+        "clobTokenIds": json.dumps([f"{i}1", f"{i}2"]) if tokens else None,
+        "outcomePrices": "[0.4, 0.6]",
+        "endDate": end_date,
+        "volume": 1000.0,
+        "liquidity": 500.0,
+    }
+
+
+class FakeGamma:
+    """Serves /markets pages by offset from a fixed list of records; records every offset requested."""
+
+    def __init__(self, records: list[dict], fail: bool = False):
+        self.records = records
+        self.fail = fail
+        self.offsets: list[int] = []
+
+    async def get(self, url, params=None, **kwargs):
+        self.offsets.append(params["offset"])
+        if self.fail:
+            return httpx.Response(503, request=httpx.Request("GET", url))
+        page = self.records[params["offset"]:params["offset"] + params["limit"]]
+        return httpx.Response(200, content=json.dumps(page).encode(), request=httpx.Request("GET", url))
+
+
+def test_limit_counts_accepted_markets_not_offsets(monkeypatch):
+    page_size = MARKET_SCANNER_CONFIG["page_size"]
+    # First page: 40 rows without token ids and 20 past their end date, so only 40 usable
+    records = (
+        [gamma_record(i, tokens=False) for i in range(40)]
+        + [gamma_record(i, end_date=PAST) for i in range(40, 60)]
+        + [gamma_record(i) for i in range(60, page_size * 3)]
+    )
+    gamma = FakeGamma(records)
+    monkeypatch.setattr(market_scanner, "transport", gamma)
+
+    markets = asyncio.run(MarketScanner().get_all_markets(limit=150))
+    assert len(markets) == 150
+    assert markets[0].slug == "market-60"
+    assert sorted(gamma.offsets)[:3] == [0, page_size, page_size * 2]
+
+
+def test_limit_larger_than_the_universe_returns_everything(monkeypatch):
+    gamma = FakeGamma([gamma_record(i) for i in range(30)])
+    monkeypatch.setattr(market_scanner, "transport", gamma)
+
+    markets = asyncio.run(MarketScanner().get_all_markets(limit=500))
+    assert [m.slug for m in markets] == [f"market-{i}" for i in range(30)]
+
+
+def test_failed_scan_raises_instead_of_returning_nothing(monkeypatch):
+    monkeypatch.setattr(market_scanner, "transport", FakeGamma([], fail=True))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(MarketScanner().get_all_markets(limit=100))
+
+
+def test_markets_shortly_past_their_end_date_stay_in_the_scan(monkeypatch):
+    hour_ago = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    gamma = FakeGamma([gamma_record(0, end_date=hour_ago), gamma_record(1, end_date=PAST), gamma_record(2)])
+    monkeypatch.setattr(market_scanner, "transport", gamma)
+    monkeypatch.setattr(market_scanner, "resolved_markets", ResolvedMarkets())
+
+    markets = asyncio.run(MarketScanner().get_all_markets())
+    assert [m.slug for m in markets] == ["market-0", "market-2"]  # Still trading until it resolves
+
+
+# --- Resolved markets ---
+
+def test_only_markets_past_the_grace_or_resolved_are_done():
+    resolved = ResolvedMarkets()
+    now = datetime.now(timezone.utc)
+    assert resolved.grace >= 24 * 3600
+    assert not resolved.is_done("kickoff-passed", now - timedelta(hours=3))
+    assert resolved.is_done("long-over", now - timedelta(seconds=resolved.grace + 60))
+
+    resolved.mark_resolved("kickoff-passed")
+    assert resolved.is_done("kickoff-passed", now + timedelta(days=1))
+    assert [m["market_id"] for m in resolved.prune([
+        {"market_id": "kickoff-passed", "end_date": now.isoformat()},
+        {"market_id": "live", "end_date": (now - timedelta(hours=3)).isoformat()},
+    ])] == ["live"]
+
+
+# --- Market sync ---
+
+class FakeMarketsTable:
+    """Stands in for ep_markets_raw behind MarketQueries."""
+
+    def __init__(self, active: list[str]):
+        self.active = {market_id: {"market_id": market_id, "yes_price": 0.5} for market_id in active}
+        self.deactivated: list[str] = []
+
+    def install(self, monkeypatch):
+        monkeypatch.setattr(MarketQueries, "get_active_market_states", staticmethod(lambda: list(self.active.values())))
+        monkeypatch.setattr(MarketQueries, "upsert_markets", staticmethod(self.upsert))
+        monkeypatch.setattr(MarketQueries, "deactivate_markets", staticmethod(self.deactivate))
+
+    def upsert(self, rows, chunk_size=500):
+        self.active.update((row["market_id"], row) for row in rows)
+
+    def deactivate(self, market_ids):
+        self.deactivated.extend(market_ids)
+        for market_id in market_ids:
+            self.active.pop(market_id, None)
+
+
+def rows(ids) -> list[dict]:
+    return [{"market_id": market_id, "yes_price": 0.5} for market_id in ids]
+
+
+def test_sync_deactivates_markets_missing_from_a_full_scan(monkeypatch):
+    table = FakeMarketsTable([f"m{i}" for i in range(10)])
+    table.install(monkeypatch)
+
+    stats = MarketSync().sync(rows(f"m{i}" for i in range(1, 10)))
+    assert table.deactivated == ["m0"]
+    assert stats["deactivated"] == 1 and stats["held"] == 0
+
+
+def test_empty_scan_deactivates_nothing(monkeypatch):
+    table = FakeMarketsTable([f"m{i}" for i in range(10)])
+    table.install(monkeypatch)
+
+    stats = MarketSync().sync([])
+    assert table.deactivated == []
+    assert stats["held"] == 10
+
+
+def test_implausibly_small_scan_deactivates_nothing(monkeypatch):
+    table = FakeMarketsTable([f"m{i}" for i in range(10)])
+    table.install(monkeypatch)
+    sync = MarketSync(min_sync_fraction=0.5)
+
+    stats = sync.sync(rows(["m0", "m1", "m2", "new"]))
+    assert table.deactivated == []
+    assert stats == {"written": 1, "skipped": 3, "deactivated": 0, "held": 7}
+
+    # The next full scan still deactivates what is really gone
+    stats = sync.sync(rows([f"m{i}" for i in range(1, 10)] + ["new"]))
+    assert table.deactivated == ["m0"]
+
+
+def test_empty_scan_keeps_the_market_cache(monkeypatch):
+    table = FakeMarketsTable(["m0", "m1"])
+    table.install(monkeypatch)
+    monkeypatch.setattr(market_sync_module, "market_sync", MarketSync())
+    monkeypatch.setattr(market_scanner, "market_cache", MarketCache())
+    market_scanner.market_cache.replace(rows(["m0", "m1"]))
+
+    MarketScanner().sync_to_supabase([])
+    assert market_scanner.market_cache.peek("m0") is not None
+
+
+# --- Market table ---
+
+def scanned_market(i: int, volume: float) -> Market:
+    return Market(
+        slug=f"market-{i}", question=f"Market {i}?", yes_token=f"{i}1", no_token=f"{i}2",
+        end_date=datetime(2099, 1, 1, tzinfo=timezone.utc), volume=volume, liquidity=500.0,
+        yes_price=0.4, no_price=0.6, category="other",
+    )
+
+
+def test_table_for_reuses_the_table_while_the_list_is_unchanged():
+    markets = [scanned_market(i, 1000.0 * i) for i in range(5)]
+    assert table_for(markets) is table_for(markets)
+    assert table_for(markets) is table_for(list(markets))  # Same markets, new list object
+
+
+def test_table_for_rebuilds_after_the_list_is_mutated_in_place():
+    scanner = MarketScanner()
+    markets = [scanned_market(i, 1000.0 * i) for i in range(5)]
+    assert [m.slug for m in scanner.filter_high_volume(markets, 3000)] == ["market-3", "market-4"]
+
+    markets.append(scanned_market(5, 50_000.0))
+    assert [m.slug for m in scanner.filter_high_volume(markets, 3000)] == ["market-3", "market-4", "market-5"]
+
+    markets[3] = scanned_market(6, 10.0)
+    assert [m.slug for m in scanner.filter_high_volume(markets, 3000)] == ["market-4", "market-5"]
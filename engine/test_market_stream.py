@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the market channel stream (core/market_stream.py): event handling
+and the background tasks it spawns, including the keepalive ping. No
+websocket is opened; events are fed straight into the handler.
+
+    python -m pytest -q test_market_stream.py
+"""
+import asyncio
+import json
+
+from core.market_stream import MarketStream
+
+MARKET = {"market_id": "will-it-rain", "yes_token": "111", "no_token": "222"}
+
+
+def live_stream() -> MarketStream:
+    """A stream tracking MARKET whose one connection counts as subscribed."""
+    stream = MarketStream(config={"enabled": False})
+    stream.track([MARKET])
+    connection = object()
+    stream._shards = [(frozenset({"111", "222"}), connection)]
+    stream._token_shard = {"111": 0, "222": 0}
+    stream._live.add(connection)
+    return stream
+
+
+def trade(token: str, price) -> dict:
+    return {"event_type": "last_trade_price", "asset_id": token, "price": price}
+
+
+def test_malformed_events_are_skipped_not_raised():
+    stream = live_stream()
+    batch = [
+        {"event_type": "book", "asset_id": "111", "bids": "not-a-list"},
+        trade("111", "n/a"),
+        {"event_type": "last_trade_price", "asset_id": "111"},
+        {"event_type": "price_change", "price_changes": [{"asset_id": "111", "side": "BUY", "price": None}]},
+        trade("111", "0.62"),
+    ]
+    stream._handle(json.dumps(batch))
+
+    assert stream.counters["bad_events"] == 4
+    assert stream.yes_price("will-it-rain") == 0.62  # Events after the bad ones still land
+
+
+def test_malformed_best_prices_leave_the_token_untouched():
+    stream = live_stream()
+    stream._handle(json.dumps(trade("111", "0.40")))
+    stream._handle(json.dumps({
+        "event_type": "price_change",
+        "price_changes": [{"asset_id": "111", "side": "BUY", "price": "0.5", "size": "10", "best_bid": "x"}],
+    }))
+
+    assert stream.counters["bad_events"] == 1
+    assert stream._state["111"].best_bid is None
+    assert stream.yes_price("will-it-rain") == 0.40
+
+
+def test_async_listener_tasks_are_kept_and_their_errors_logged(capsys):
+    stream = live_stream()
+    seen = []
+
+    async def listener(market_id, price):
+        await asyncio.sleep(0)
+        seen.append((market_id, price))
+        raise RuntimeError("listener broke")
+
+    stream.add_listener(listener)
+
+    async def main():
+        stream._handle(json.dumps(trade("111", "0.55")))
+        assert len(stream._background) == 1  # Referenced while it runs
+        await asyncio.gather(*stream._background, return_exceptions=True)
+
+    asyncio.run(main())
+    assert seen == [("will-it-rain", 0.55)]
+    assert not stream._background
+    assert stream.counters["errors"] == 1
+    assert "listener broke" in capsys.readouterr().out
+
+
+def test_a_failed_ping_is_logged(capsys):
+    stream = live_stream()
+    stream.ping_interval, stream.stale_seconds = 0, 0.05
+
+    class DeadSocket:
+        async def send(self, message):
+            raise ConnectionResetError("socket closed")
+
+        async def recv(self):
+            await asyncio.sleep(1)
+
+    async def main():
+        try:
+            await stream._pump(DeadSocket())
+        except asyncio.TimeoutError:
+            pass
+
+    asyncio.run(main())
+    assert stream.counters["errors"] == 1
+    assert "Keepalive ping failed" in capsys.readouterr().out
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for OpportunityDetector.scan_all (core/opportunity_detector.py):
+deduping against one prefetched set of recent signal keys, the diversity
+cap, and chunked inserts that keep every chunk that made it. Signals and
+Supabase are stubbed.
+
+    python -m pytest -q test_opportunity_detector.py
+"""
+import pytest
+
+import core.opportunity_detector as detector_module
+from core.opportunity_detector import OpportunityDetector
+from core.resolved_markets import ResolvedMarkets
+from db.queries import OpportunityQueries
+
+
+class FixedSignals:
+    """A signal engine returning preset signals per market id."""
+
+    def __init__(self, signals: dict[str, list[str]]):
+        self.signals = signals
+
+    def evaluate(self, markets):
+        return [[{"signal_type": t, "strength": 0.7} for t in self.signals.get(m["market_id"], [])] for m in markets]
+
+    def summary(self):
+        return ""
+
+
+class FakeOpportunities:
+    """ep_detected_opportunities behind OpportunityQueries; chunks listed in `fail` raise."""
+
+    def __init__(self, recent: set[tuple[str, str]], fail: tuple[int, ...] = ()):
+        self.recent = recent
+        self.fail = fail
+        self.key_queries = 0
+        self.chunks: list[list[dict]] = []
+
+    def install(self, monkeypatch):
+        monkeypatch.setattr(OpportunityQueries, "get_recent_signal_keys", staticmethod(self.keys))
+        monkeypatch.setattr(OpportunityQueries, "insert_opportunities", staticmethod(self.insert))
+
+    def keys(self, hours=24):
+        self.key_queries += 1
+        return set(self.recent)
+
+    def insert(self, opps, chunk_size=500):
+        self.chunks.append(opps)
+        if len(self.chunks) - 1 in self.fail:
+            raise RuntimeError("insert timed out")
+        return [{**opp, "id": f"opp-{len(self.chunks)}-{i}"} for i, opp in enumerate(opps)]
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    monkeypatch.setattr(OpportunityDetector, "live_prices", {})
+    monkeypatch.setattr(detector_module, "resolved_markets", ResolvedMarkets())
+    monkeypatch.setattr(detector_module.price_history, "hydrate", lambda market_ids: None)
+    return OpportunityDetector()
+
+
+def liquid(market_id: str) -> dict:
+    return {"market_id": market_id, "volume": 10_000, "liquidity": 5_000, "yes_price": 0.4}
+
+
+def test_dupes_are_checked_against_one_prefetched_key_set(detector, monkeypatch):
+    table = FakeOpportunities(recent={("m1", "momentum")})
+    table.install(monkeypatch)
+    monkeypatch.setattr(detector_module, "signal_engine", FixedSignals({
+        "m1": ["momentum", "mean_reversion"],
+        "m2": ["momentum", "momentum"],  # Twice in one cycle: saved once
+    }))
+
+    saved = detector.scan_all([liquid("m1"), liquid("m2")])
+    assert [(o["market_id"], o["signal_type"]) for o in saved] == [("m1", "mean_reversion"), ("m2", "momentum")]
+    assert table.key_queries == 1
+    assert len(table.chunks) == 1  # One bulk insert
+
+
+def test_the_diversity_cap_counts_every_signal_past_it(detector, monkeypatch):
+    table = FakeOpportunities(recent=set())
+    table.install(monkeypatch)
+    markets = [liquid(f"2026-nba-championship-team-{i}") for i in range(5)]
+    monkeypatch.setattr(detector_module, "signal_engine", FixedSignals({m["market_id"]: ["momentum"] for m in markets}))
+    logged = []
+    monkeypatch.setattr(detector_module, "log", lambda level, message, source="": logged.append(message))
+
+    saved = detector.scan_all(markets)
+    assert len(saved) == detector.max_per_group == 3
+    assert "Detected 5 opportunities, saved 3, skipped 0 dupes, 2 capped" in logged
+
+
+def test_a_failed_chunk_loses_only_its_own_rows(detector, monkeypatch):
+    table = FakeOpportunities(recent=set(), fail=(1,))
+    table.install(monkeypatch)
+    markets = [liquid(f"m{i}") for i in range(5)]
+    monkeypatch.setattr(detector_module, "signal_engine", FixedSignals({m["market_id"]: ["momentum"] for m in markets}))
+    detector.insert_chunk_size = 2
+
+    saved = detector.scan_all(markets)
+    assert [len(chunk) for chunk in table.chunks] == [2, 2, 1]
+    assert [o["market_id"] for o in saved] == ["m0", "m1", "m4"]
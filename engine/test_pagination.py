@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the offset fan-out paginator (utils/pagination.py): pages come back
+in offset order, the first short page ends the walk and cancels every page
+still in flight, and max_items caps what is fetched and returned.
+
+    python -m pytest -q test_pagination.py
+"""
+import asyncio
+
+from utils.pagination import paginate
+
+ROWS = list(range(25))
+
+
+def pages(delay_from: int | None = None):
+    """fetch_page over ROWS, recording requested and cancelled offsets; pages from delay_from on hang."""
+    requested, cancelled = [], []
+
+    async def fetch_page(offset: int) -> list[int]:
+        requested.append(offset)
+        try:
+            await asyncio.sleep(1 if delay_from is not None and offset >= delay_from else (30 - offset) / 1000)
+        except asyncio.CancelledError:
+            cancelled.append(offset)
+            raise
+        return ROWS[offset:offset + 10]
+
+    return fetch_page, requested, cancelled
+
+
+def test_pages_are_joined_in_offset_order_up_to_the_short_page():
+    fetch_page, requested, _ = pages()
+    items = asyncio.run(paginate(fetch_page, page_size=10, max_items=1000, fan_out=4))
+    assert items == ROWS  # Later offsets answer first here
+    assert requested[0] == 0 and set(requested) >= {0, 10, 20}
+
+
+def test_the_short_page_cancels_outstanding_pages():
+    fetch_page, requested, cancelled = pages(delay_from=30)
+
+    async def main():
+        return await asyncio.wait_for(paginate(fetch_page, page_size=10, max_items=1000, fan_out=4), timeout=0.5)
+
+    assert asyncio.run(main()) == ROWS
+    assert sorted(requested) == [0, 10, 20, 30, 40]
+    assert sorted(cancelled) == [30, 40]
+
+
+def test_max_items_caps_offsets_and_items():
+    fetch_page, requested, _ = pages()
+    assert asyncio.run(paginate(fetch_page, page_size=10, max_items=15, fan_out=4)) == ROWS[:15]
+    assert sorted(requested) == [0, 10]
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for PickResolver's streamed price checks (core/pick_resolver.py):
+stops and targets close picks with the Supabase write off the event loop,
+and a pick closes once however many prices cross its level. Supabase is
+stubbed.
+
+    python -m pytest -q test_pick_resolver.py
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.pick_resolver import PickResolver
+from db.queries import PickQueries
+
+
+@pytest.fixture
+def closes(monkeypatch):
+    """Records (pick id, status, exit price, thread) for every close; each write takes 50ms."""
+    written = []
+
+    def close_pick(pick_id, status, exit_price):
+        time.sleep(0.05)
+        written.append((pick_id, status, exit_price, threading.current_thread()))
+
+    monkeypatch.setattr(PickQueries, "close_pick", staticmethod(close_pick))
+    return written
+
+
+def watching(*picks: dict) -> PickResolver:
+    resolver = PickResolver()
+    for pick in picks:
+        resolver._watched.setdefault(pick["market_id"], []).append(pick)
+    return resolver
+
+
+def pick(pick_id: str, direction: str = "YES") -> dict:
+    return {"id": pick_id, "market_id": "will-it-rain", "direction": direction, "entry_price": 0.5,
+            "stop_loss": 0.4 if direction == "YES" else 0.6, "target_price": 0.7 if direction == "YES" else 0.3}
+
+
+def test_streamed_closes_are_written_off_the_event_loop(closes):
+    resolver = watching(pick("p1"), pick("p2", direction="NO"))
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        await resolver.on_price("will-it-rain", 0.30)  # Stops the YES pick, hits the NO pick's target
+        task.cancel()
+        return ticks
+
+    ticks = asyncio.run(main())
+    assert sorted((c[0], c[1]) for c in closes) == [("p1", "stopped"), ("p2", "won")]
+    assert all(c[3] is not threading.main_thread() for c in closes)
+    assert ticks >= 5  # The loop kept running through both 50ms writes
+    assert resolver._watched["will-it-rain"] == []
+
+
+def test_a_pick_closes_once_across_concurrent_prices(closes):
+    resolver = watching(pick("p1"), pick("p3"))
+    resolver._watched["will-it-rain"][1]["stop_loss"] = 0.2
+
+    async def main():
+        await asyncio.gather(resolver.on_price("will-it-rain", 0.35), resolver.on_price("will-it-rain", 0.30))
+
+    asyncio.run(main())
+    assert [(c[0], c[1]) for c in closes] == [("p1", "stopped")]
+    assert [p["id"] for p in resolver._watched["will-it-rain"]] == ["p3"]
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the trader-discovery PolymarketClient (v1 and v2): rate-limit
+retries and profile collection over shared (singleflight) records.
+
+    python -m pytest -q test_polymarket_client.py
+"""
+import asyncio
+
+import httpx
+import pytest
+
+import shadow.trader_discovery as discovery_v1
+import shadow.trader_discovery_v2 as discovery_v2
+from utils.schemas import Position
+
+
+class FakeTransport:
+    """Answers every GET with the next status in `statuses` (the last one repeats)."""
+
+    def __init__(self, *statuses: int):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    async def get(self, url, params=None, priority=None, **kwargs):
+        status = self.statuses[min(self.calls, len(self.statuses) - 1)]
+        self.calls += 1
+        return httpx.Response(status, json=[{"ok": True}], request=httpx.Request("GET", url))
+
+    get_cached = get
+
+
+@pytest.mark.parametrize("module", [discovery_v1, discovery_v2])
+def test_persistent_429_gives_up_after_bounded_attempts(module, monkeypatch):
+    fake = FakeTransport(429)
+    monkeypatch.setattr(module, "transport", fake)
+    client = module.PolymarketClient()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client._get("https://data-api.example/trades", {"user": "0xabc"}))
+    assert fake.calls == module.MAX_RATE_LIMIT_RETRIES
+
+
+@pytest.mark.parametrize("module", [discovery_v1, discovery_v2])
+def test_429_then_success_returns_body(module, monkeypatch):
+    fake = FakeTransport(429, 200)
+    monkeypatch.setattr(module, "transport", fake)
+    client = module.PolymarketClient()
+
+    assert asyncio.run(client._get("https://data-api.example/trades", cached=False)) == [{"ok": True}]
+    assert fake.calls == 2
+
+
+class SharedRecordsClient:
+    """Returns the same decoded lists to every caller, as coalesced requests do."""
+
+    def __init__(self, closed: list[Position]):
+        self.closed = closed
+
+    async def get_all_trades(self, address):
+        return []
+
+    async def get_positions(self, address):
+        return []
+
+    async def get_all_closed_positions(self, address):
+        return self.closed
+
+    async def get_portfolio_value(self, address):
+        return 0.0
+
+
+@pytest.mark.parametrize("module", [discovery_v1, discovery_v2])
+def test_profile_marks_copies_of_shared_closed_positions(module):
+    shared = [Position(condition_id="0xc1", realized_pnl=5.0)]
+    profile = asyncio.run(module.collect_trader_profile(SharedRecordsClient(shared), "0xabc"))
+
+    assert [p.is_closed for p in profile.closed_positions] == [True]
+    assert profile.closed_positions[0].realized_pnl == 5.0
+    assert shared[0].is_closed is False  # The shared record is untouched
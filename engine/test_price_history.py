@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory price history (core/price_history.py): the bulk
+ep_price_snapshots query behind hydrate, pairing its rows, the per-market
+ring buffers and the right-aligned block the vectorized signals read.
+
+    python -m pytest -q test_price_history.py
+"""
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+
+import core.price_tracker as price_tracker
+import db.queries as queries
+from core.price_history import NO, TS, YES, PriceHistory, snapshot_rows
+from core.price_tracker import PriceTracker
+from core.resolved_markets import ResolvedMarkets
+from db.queries import MarketQueries
+
+T0 = 1_800_000_000.0
+
+
+def row(outcome: str, price: float, ts: float) -> dict:
+    stamp = datetime.fromtimestamp(ts, timezone.utc).isoformat()
+    return {"market_id": "m1", "outcome": outcome, "price": price, "volume": 100, "liquidity": 50, "timestamp": stamp}
+
+
+class FakeSnapshots:
+    """ep_price_snapshots behind a PostgREST-style query builder; records every page it serves."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.pages: list[int] = []
+
+    def table(self, name):
+        return _Query(self)
+
+
+class _Query:
+    def __init__(self, db: FakeSnapshots):
+        self.db = db
+        self.filters = []
+        self.size = None
+
+    def select(self, columns):
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda r: r[column] in values)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda r: r[column] >= value)
+        return self
+
+    def or_(self, expression):
+        # timestamp.gt."<ts>",and(timestamp.eq."<ts>",id.gt."<id>")
+        ts, _, row_id = re.findall(r'"([^"]*)"', expression)
+        self.filters.append(lambda r: r["timestamp"] > ts or (r["timestamp"] == ts and r["id"] > int(row_id)))
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, size):
+        self.size = size
+        return self
+
+    def execute(self):
+        rows = [r for r in self.db.rows if all(f(r) for f in self.filters)]
+        page = sorted(rows, key=lambda r: (r["timestamp"], r["id"]))[:self.size]
+        self.db.pages.append(len(page))
+        return type("Result", (), {"data": page})()
+
+
+def test_bulk_query_pages_through_rows_sharing_a_timestamp(monkeypatch):
+    now = datetime.now(timezone.utc).timestamp()
+    rows = []
+    for k, ts in enumerate((now - 7200, now - 3600)):  # Two snapshots, each 3 markets x YES/NO under one timestamp
+        stamp = datetime.fromtimestamp(ts, timezone.utc).isoformat()
+        for m in range(3):
+            for outcome in ("YES", "NO"):
+                rows.append({"id": len(rows) + 1, "market_id": f"m{m}", "outcome": outcome, "price": 0.5,
+                             "volume": 1, "liquidity": 1, "timestamp": stamp})
+    fake = FakeSnapshots(rows[::-1])
+    monkeypatch.setattr(queries, "get_supabase", lambda: fake)
+
+    grouped = MarketQueries.get_price_histories(["m0", "m1", "m2"], hours=48, ids_per_query=2, page_size=3)
+    assert {m: [r["id"] for r in group] for m, group in grouped.items()} == {
+        "m0": [1, 2, 7, 8], "m1": [3, 4, 9, 10], "m2": [5, 6, 11, 12],
+    }
+    assert fake.pages == [3, 3, 2, 3, 1]  # Pages break inside a timestamp; m2 is the second id chunk
+
+
+def test_rows_of_one_snapshot_pair_across_different_timestamps():
+    # The NO rows landed in the next insert chunk, a fraction of a second later
+    snapshots = [
+        row("YES", 0.40, T0), row("NO", 0.60, T0 + 0.35),
+        row("YES", 0.42, T0 + 1800), row("NO", 0.58, T0 + 1800.2),
+    ]
+    rows = snapshot_rows(snapshots)
+    assert rows.shape == (2, 5)
+    assert rows[:, YES].tolist() == [0.40, 0.42]
+    assert rows[:, NO].tolist() == [0.60, 0.58]
+    assert rows[:, TS].tolist() == [T0, T0 + 1800]
+
+
+def test_a_missing_outcome_does_not_pair_with_the_next_snapshot():
+    snapshots = [row("YES", 0.40, T0), row("YES", 0.41, T0 + 1800), row("NO", 0.59, T0 + 1800)]
+    rows = snapshot_rows(snapshots)
+    assert rows[:, YES].tolist() == [0.40, 0.41]
+    assert np.isnan(rows[0, NO]) and rows[1, NO] == 0.59
+
+    assert len(snapshot_rows([row("NO", 0.6, T0)])) == 0  # Rows without a YES price are dropped
+
+
+def test_tracker_stamps_both_outcomes_of_a_snapshot_alike(monkeypatch):
+    inserted = []
+    monkeypatch.setattr(MarketQueries, "insert_snapshots", staticmethod(inserted.extend))
+    monkeypatch.setattr(price_tracker, "price_history", PriceHistory({"initial_markets": 4}))
+    monkeypatch.setattr(price_tracker, "resolved_markets", ResolvedMarkets())
+
+    PriceTracker().snapshot_all([{"market_id": f"m{i}", "yes_price": 0.4, "no_price": 0.6} for i in range(3)])
+    assert len(inserted) == 6
+    assert len({snap["timestamp"] for snap in inserted}) == 1
+    rows = snapshot_rows([snap for snap in inserted if snap["market_id"] == "m1"])
+    assert abs(rows[0, TS] - price_tracker.price_history.series("m1")[0, TS]) < 0.001
+
+
+def test_ring_keeps_the_newest_capacity_rows():
+    history = PriceHistory({"capacity": 4, "initial_markets": 1})
+    for i in range(6):
+        history.record([{"market_id": "m1", "yes_price": i / 10, "no_price": 1 - i / 10}], ts=T0 + i)
+    history.record([{"market_id": "m2", "yes_price": 0.9}], ts=T0 + 5)  # Grows past the initial slot
+
+    assert history.series("m1")[:, YES].tolist() == [0.2, 0.3, 0.4, 0.5]
+    assert history.window("m1", hours=2 / 3600, now=T0 + 5)[:, TS].tolist() == [T0 + 3, T0 + 4, T0 + 5]
+    assert history.series("m2")[:, YES].tolist() == [0.9]
+
+
+def test_aligned_right_aligns_each_window():
+    history = PriceHistory({"capacity": 8, "initial_markets": 2})
+    for i in range(3):
+        history.record([{"market_id": "m1", "yes_price": 0.1 * (i + 1)}], ts=T0 + i)
+    history.record([{"market_id": "m2", "yes_price": 0.7}], ts=T0 + 2)
+
+    (yes,), lengths = history.aligned(["m1", "m2", "unknown"], hours=1, now=T0 + 2, fields=(YES,))
+    assert lengths.tolist() == [3, 1, 0]
+    assert np.allclose(yes, [[0.1, 0.2, 0.3], [0.0, 0.0, 0.7], [0.0, 0.0, 0.0]])
+
+
+def test_dump_and_restore_round_trip():
+    history = PriceHistory({"capacity": 4, "initial_markets": 1})
+    for i in range(5):
+        history.record([{"market_id": "m1", "yes_price": i / 10}], ts=T0 + i)
+
+    restored = PriceHistory({"capacity": 4, "initial_markets": 1})
+    restored.restore(history.dump())
+    assert np.array_equal(restored.series("m1"), history.series("m1"))
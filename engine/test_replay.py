@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the record/replay stand-in (utils/replay.py): responses recorded
+by FixtureRecorder replay through StandInApp, including conditional GETs,
+re-paged list endpoints, 429 injection and page-size caps.
+
+    python -m pytest -q test_replay.py
+"""
+import asyncio
+
+import httpx
+import msgspec
+
+from config import CLOB_HOST, DATA_API
+from utils.replay import FixtureRecorder, FixtureSet, StandInApp
+
+
+def response(status: int, url: str, params: dict | None = None, body=None, headers: dict | None = None,
+             method: str = "GET") -> httpx.Response:
+    content = b"" if body is None else msgspec.json.encode(body)
+    return httpx.Response(status, content=content, headers=headers,
+                          request=httpx.Request(method, url, params=params))
+
+
+def replay(app: StandInApp, path: str, query: dict | None = None, headers: dict | None = None,
+           method: str = "GET", body: bytes = b""):
+    status, out, payload = asyncio.run(app.handle(method, path, list((query or {}).items()), headers or {}, body))
+    return status, out, msgspec.json.decode(payload) if payload else payload
+
+
+def test_conditional_get_round_trip_keeps_the_recorded_body(tmp_path):
+    recorder = FixtureRecorder(str(tmp_path))
+    url, params = f"{DATA_API}/positions", {"user": "0xabc"}
+    recorder.record(response(200, url, params, body=[{"size": 5}], headers={"ETag": '"v1"'}))
+    # The revalidation that followed: 304, no body
+    recorder.record(response(304, url, params, headers={"ETag": '"v1"'}))
+    assert recorder.recorded == 1
+
+    app = StandInApp(FixtureSet(str(tmp_path)))
+    assert replay(app, "/data/positions", params) == (200, {"content-type": "application/json", "etag": '"v1"'},
+                                                       [{"size": 5}])
+    status, headers, body = replay(app, "/data/positions", params, headers={"if-none-match": '"v1"'})
+    assert (status, body) == (304, b"")
+
+
+def test_errors_are_not_recorded(tmp_path):
+    recorder = FixtureRecorder(str(tmp_path))
+    for status in (429, 404, 503):
+        recorder.record(response(status, f"{DATA_API}/trades", {"user": "0xabc"}, body={"error": "no"}))
+    assert recorder.recorded == 0
+
+
+def test_pages_replay_at_any_page_size(tmp_path):
+    recorder = FixtureRecorder(str(tmp_path))
+    rows = [{"id": i} for i in range(150)]
+    for offset in (0, 100):
+        recorder.record(response(200, f"{DATA_API}/closed-positions",
+                                 {"user": "0xabc", "limit": "100", "offset": str(offset)},
+                                 body=rows[offset:offset + 100]))
+
+    app = StandInApp(FixtureSet(str(tmp_path)), max_page_size=20)
+    status, _, page = replay(app, "/data/closed-positions", {"user": "0xabc", "limit": "50", "offset": "40"})
+    assert status == 200
+    assert page == rows[40:60]  # Re-paged from the stitched recording, capped at 20 rows
+    assert app.stats["paged"] == 1
+
+
+def test_429_injection(tmp_path):
+    recorder = FixtureRecorder(str(tmp_path))
+    recorder.record(response(200, f"{DATA_API}/value", {"user": "0xabc"}, body=[{"value": 1}]))
+    fixtures = FixtureSet(str(tmp_path))
+
+    status, headers, _ = replay(StandInApp(fixtures, throttle_rate=1.0, retry_after=2), "/data/value", {"user": "0xabc"})
+    assert status == 429 and headers["retry-after"] == "2"
+
+    capped = StandInApp(fixtures, rps_limit=2)
+    assert [replay(capped, "/data/value", {"user": "0xabc"})[0] for _ in range(3)] == [200, 200, 429]
+    assert capped.stats["throttled"] == 1
+
+
+def test_batched_books_replay_per_token(tmp_path):
+    recorder = FixtureRecorder(str(tmp_path))
+    books = [{"asset_id": token, "bids": [{"price": "0.4", "size": "10"}], "asks": []} for token in ("111", "222")]
+    recorder.record(response(200, f"{CLOB_HOST}/books", body=books, method="POST"))
+
+    app = StandInApp(FixtureSet(str(tmp_path)))
+    assert replay(app, "/clob/book", {"token_id": "222"})[2]["asset_id"] == "222"
+    status, _, batch = replay(app, "/clob/books", method="POST", body=b'[{"token_id": "111"}, {"token_id": "999"}]')
+    assert status == 200 and [b["asset_id"] for b in batch] == ["111"]
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the signal engine (core/signal_engine.py): its vectorized signals
+must match the per-market reference checks in benchmark_signals.py value for
+value, whatever other signals are registered.
+
+    python -m pytest -q test_signals.py
+"""
+import time
+
+import numpy as np
+import pytest
+
+from benchmark_signals import check_crowd_behavior, check_statistical_edge
+from core.price_history import YES, PriceHistory
+from core.signal_engine import Signal, SignalEngine
+
+
+def make_history(markets: int, snapshots: int, hours: float, now: float) -> tuple[PriceHistory, list[dict]]:
+    """Random walks over `hours` (some trending, some with volume spikes), as in benchmark_signals.py."""
+    rng = np.random.default_rng(11)
+    history = PriceHistory({"initial_markets": markets, "capacity": snapshots})
+    ids = [f"market-{i}" for i in range(markets)]
+    drift = rng.choice([0.0, 0.0, 0.03, -0.03], size=markets)
+    yes = rng.uniform(0.05, 0.95, size=markets)
+    volume = rng.uniform(1e3, 5e5, size=markets)
+    step = hours * 3600 / snapshots
+    for k in range(snapshots):
+        yes = np.clip(yes + drift + rng.normal(0, 0.02, size=markets), 0.01, 0.99)
+        volume = volume * np.where(rng.random(markets) < 0.05, 4.0, 1.0) + rng.uniform(0, 1e3, size=markets)
+        history.record([
+            {"market_id": m, "yes_price": float(p), "no_price": float(1 - p), "volume": float(v), "liquidity": 5000.0}
+            for m, p, v in zip(ids, yes, volume)
+        ], ts=now - step * (snapshots - 0.5 - k))  # Half a step off, so no snapshot sits on a window edge
+    latest = [{"market_id": m, "yes_price": float(p), "volume": float(v)} for m, p, v in zip(ids, yes, volume)]
+    return history, latest
+
+
+class LongLookback(Signal):
+    """A plugin reading further back than any built-in signal."""
+
+    name = "long_lookback"
+    window_hours = 96
+    fields = (YES,)
+
+    def evaluate(self, batch):
+        return int((batch.lengths(self.window_hours) > 0).sum()), []
+
+
+def reference(history: PriceHistory, markets: list[dict]) -> list[list[dict]]:
+    return [check_statistical_edge(history, m) + check_crowd_behavior(history, m) for m in markets]
+
+
+@pytest.mark.parametrize("snapshots", [4, 24, 96])  # Even, so no snapshot lands on the 24h edge
+def test_signals_match_the_per_market_checks(snapshots):
+    now = time.time()
+    history, markets = make_history(300, snapshots, hours=48, now=now)
+
+    expected = reference(history, markets)
+    assert SignalEngine(history).evaluate(markets, now=now) == expected
+    assert any(expected)
+
+
+def test_a_longer_plugin_window_does_not_change_the_builtin_signals():
+    now = time.time()
+    history, markets = make_history(300, 192, hours=96, now=now)  # Half of it older than 48h
+    engine = SignalEngine(history)
+    engine.register(LongLookback())
+    assert engine.window_hours == 96
+
+    signals = engine.evaluate(markets, now=now)
+    assert signals == reference(history, markets)
+    assert {s["signal_type"] for per_market in signals for s in per_market} >= {"mean_reversion", "momentum"}
+    assert engine.last["long_lookback"]["evaluated"] == 300
+
+
+def test_batch_window_zeroes_rows_before_the_window():
+    now = time.time()
+    history, markets = make_history(5, 8, hours=96, now=now)
+    batch = SignalEngine(history)._batch(markets, now)
+    assert batch.window(YES, 48) is batch.column(YES)  # Already the batch's own window
+
+    engine = SignalEngine(history)
+    engine.register(LongLookback())
+    batch = engine._batch(markets, now)
+    inside = batch.window(YES, 48)
+    assert batch.lengths(48).tolist() == [4] * 5
+    assert np.all(inside[:, :4] == 0) and np.array_equal(inside[:, 4:], batch.column(YES)[:, 4:])
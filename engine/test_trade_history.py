@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-wallet trade history store (shadow/trade_history.py).
+
+    python -m pytest -q test_trade_history.py
+"""
+import asyncio
+
+from shadow.trade_history import TradeHistoryStore, trade_keys
+from utils.schemas import Trade
+
+WALLET = "0xABC"
+
+
+def trade(ts: int, tx: str = "0xtx", size: float = 10.0, price: float = 0.5) -> Trade:
+    return Trade(side="BUY", size=size, price=price, timestamp=ts, asset="token", transaction_hash=tx)
+
+
+def pages_of(trades: list[Trade], page_size: int):
+    """fetch_page over a newest-first list; records every (offset, incremental) call."""
+    calls = []
+
+    async def fetch_page(offset: int, incremental: bool) -> list[Trade]:
+        calls.append((offset, incremental))
+        return trades[offset:offset + page_size]
+
+    return fetch_page, calls
+
+
+def test_identical_fills_get_distinct_keys():
+    fill = trade(100)
+    keys = trade_keys([fill, fill, trade(99)])
+    assert len(set(keys)) == 3
+    # Numbering carries across pages of one walk
+    counts = {}
+    assert trade_keys([fill], counts) + trade_keys([fill], counts) == keys[:2]
+
+
+def test_first_sync_keeps_identical_fills(tmp_path):
+    store = TradeHistoryStore(str(tmp_path / "trades.sqlite3"))
+    history = [trade(100), trade(100), trade(90, tx="0xother")]
+    fetch_page, calls = pages_of(history, page_size=500)
+
+    synced = asyncio.run(store.sync(WALLET, fetch_page, page_size=500))
+    assert len(synced) == 3
+    assert len(store.load(WALLET)) == 3
+    assert calls == [(0, False)]
+    assert store.watermark(WALLET) == 100
+
+
+def test_incremental_sync_stops_at_stored_history(tmp_path):
+    store = TradeHistoryStore(str(tmp_path / "trades.sqlite3"))
+    old = [trade(ts, tx=f"0x{ts}") for ts in range(100, 90, -1)]  # 10 trades, newest first
+    fetch_page, _ = pages_of(old, page_size=4)
+    asyncio.run(store.sync(WALLET, fetch_page, page_size=4))
+
+    # Two new trades, one of them an identical repeat fill, land on top
+    newer = [trade(105, tx="0xnew"), trade(105, tx="0xnew")] + old
+    fetch_page, calls = pages_of(newer, page_size=4)
+    synced = asyncio.run(store.sync(WALLET, fetch_page, page_size=4))
+
+    assert calls == [(0, True)]  # The first page already overlaps: no further pages
+    assert len(synced) == 12
+    assert [t.timestamp for t in synced[:3]] == [105, 105, 100]
+    assert store.watermark(WALLET) == 105
+
+
+def test_incremental_sync_returns_at_most_max_trades(tmp_path):
+    store = TradeHistoryStore(str(tmp_path / "trades.sqlite3"))
+    history = [trade(ts, tx=f"0x{ts}") for ts in range(100, 80, -1)]
+    fetch_page, _ = pages_of(history, page_size=500)
+    asyncio.run(store.sync(WALLET, fetch_page, max_trades=20, page_size=500))
+
+    synced = asyncio.run(store.sync(WALLET, fetch_page, max_trades=5, page_size=500))
+    assert [t.timestamp for t in synced] == [100, 99, 98, 97, 96]
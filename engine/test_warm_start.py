@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the warm start (core/warm_start.py) and when run.py saves it:
+after every loop cycle, including resolution-only cycles and failed runs,
+and the backoff after a failed scan. The pipeline stages are stubbed.
+
+    python -m pytest -q test_warm_start.py
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import core.warm_start as warm_start_module
+import run
+from core.warm_start import WarmStart
+
+SCAN_INTERVAL = 6 * 3600
+
+
+@pytest.fixture
+def warm_start(tmp_path, monkeypatch):
+    """A WarmStart on a temp file, holding run.py's scheduler timestamps."""
+    state = WarmStart({"enabled": True, "path": str(tmp_path / "engine_state.msgpack")})
+    state.register("scheduler", lambda: {"last_scan": run._timestamp(run._last_scan)}, run._restore_scheduler)
+    monkeypatch.setattr(warm_start_module, "warm_start", state)
+    monkeypatch.setattr(run, "_last_scan", None)
+    monkeypatch.setattr(run, "_failed_scan", None)
+    monkeypatch.setattr(run, "_last_discovery_run", None)
+    return state
+
+
+def test_sections_round_trip(tmp_path):
+    saved = {"markets": ["m1", "m2"]}
+    writer = WarmStart({"enabled": True, "path": str(tmp_path / "state.msgpack")})
+    writer.register("universe", lambda: saved, lambda value: None)
+    assert writer.save() > 0
+
+    restored = {}
+    reader = WarmStart({"enabled": True, "path": str(tmp_path / "state.msgpack")})
+    reader.register("universe", lambda: None, restored.update)
+    reader.register("broken", lambda: None, lambda value: 1 / 0)
+    assert reader.load() is not None
+    assert restored == saved
+
+
+def test_resolution_only_cycle_saves_state(warm_start, monkeypatch):
+    last_scan = datetime.now(timezone.utc) - timedelta(hours=1)
+    monkeypatch.setattr(run, "_last_scan", last_scan)
+
+    async def resolve():
+        return {"checked": 0}
+
+    monkeypatch.setattr(run, "run_resolution_check", resolve)
+    asyncio.run(run.run_cycle(SCAN_INTERVAL))
+
+    monkeypatch.setattr(run, "_last_scan", None)
+    assert warm_start.load() is not None
+    assert abs((run._last_scan - last_scan).total_seconds()) < 0.001
+
+
+def test_failed_pipeline_still_saves_state(warm_start, monkeypatch):
+    async def pipeline():
+        raise RuntimeError("Gamma is down")
+
+    monkeypatch.setattr(run, "run_full_pipeline", pipeline)
+    asyncio.run(run.run_cycle(SCAN_INTERVAL))  # The error is logged, not raised
+
+    assert warm_start.load() is not None
+    assert run._last_scan is None  # A failed scan is retried, not skipped
+    assert run._failed_scan is not None
+
+
+def test_failed_scan_backs_off_to_resolution_checks(warm_start, monkeypatch):
+    calls = []
+
+    async def pipeline():
+        calls.append("scan")
+        raise RuntimeError("Gamma is down")
+
+    async def resolve():
+        calls.append("resolve")
+        return {"checked": 0}
+
+    monkeypatch.setattr(run, "run_full_pipeline", pipeline)
+    monkeypatch.setattr(run, "run_resolution_check", resolve)
+    for _ in range(3):
+        asyncio.run(run.run_cycle(SCAN_INTERVAL))
+    assert calls == ["scan", "resolve", "resolve"]
+
+    # Once the retry window has passed the scan runs again
+    monkeypatch.setattr(run, "_failed_scan", run._failed_scan - timedelta(minutes=run.SCAN_RETRY_MINUTES))
+    asyncio.run(run.run_cycle(SCAN_INTERVAL))
+    assert calls[-1] == "scan"
@@ -0,0 +1,89 @@
+"""Per-endpoint circuit breakers.
+
+Closed: requests flow. After `failure_threshold` consecutive failures
+(timeouts, connection errors, 5xx) the circuit opens and calls fail fast with
+CircuitOpenError for `reset_seconds`. Then one probe is let through
+(half-open): success closes the circuit, failure re-opens it.
+"""
+from __future__ import annotations
+
+import time
+
+import httpx
+
+from config import CIRCUIT_BREAKER_CONFIG
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, endpoint: str, failure_threshold: int, reset_seconds: float):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self.rejected = 0
+        self.trips = 0
+
+    def before(self):
+        """Admit a call or raise CircuitOpenError."""
+        if self.state == CLOSED:
+            return
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError(f"Circuit open for {self.endpoint}")
+
+    def success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """The call ended without an outcome (e.g. a cancelled hedge) — free the probe slot."""
+        self._probing = False
+
+
+class CircuitBreakers:
+    """Registry of breakers keyed by endpoint."""
+
+    def __init__(self, config: dict | None = None):
+        cfg = {**CIRCUIT_BREAKER_CONFIG, **(config or {})}
+        self._threshold = cfg["failure_threshold"]
+        self._reset = cfg["reset_seconds"]
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(endpoint, self._threshold, self._reset)
+        return breaker
+
+    def stats(self) -> dict[str, dict]:
+        return {
+            endpoint: {"state": b.state, "trips": b.trips, "rejected": b.rejected}
+            for endpoint, b in self._breakers.items()
+            if b.trips or b.state != CLOSED
+        }
+
+
+circuit_breakers = CircuitBreakers()
@@ -0,0 +1,127 @@
+"""Keyword classification of market titles.
+
+All of a table's keywords compile into one regex, factored as a trie (shared
+prefixes are tested once), so a title is scanned once instead of once per
+keyword. The pattern is a lookahead tried at every word start, so matches may
+overlap: "bull market" hits both "bull market" and "market", and "world
+series" both "world series" and "series", exactly as the per-keyword scan
+did. Keywords that are whole-word prefixes of the longest match at a position
+("world" under "world cup") count too. Matches are whole words: a
+keyword must not sit inside a longer word ("eth" no longer fires on
+"whether", "sol" on "resolve"), though a plural s/es is allowed
+("elections", "matches"). A category scores one point per distinct keyword
+found; the highest score wins, ties go to the category listed first, and a
+title with no hits is "other". Results are memoized per title, since the same
+market titles recur across every trader's trades and positions.
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+
+DEFAULT_MEMO_SIZE = 1 << 16
+
+# Shared taxonomy for trader categorization (shadow/trader_discovery.py, backfill_trader_categories.py)
+CATEGORY_KEYWORDS = {
+    "politics": [
+        "election", "president", "congress", "senate", "vote", "biden", "trump",
+        "democrat", "republican", "white house", "governor", "mayor", "campaign",
+        "political", "legislation", "bill", "law", "policy", "government",
+        "supreme court", "impeach", "primary", "nominee", "cabinet",
+    ],
+    "sports": [
+        "nfl", "nba", "mlb", "nhl", "soccer", "football", "basketball", "baseball",
+        "hockey", "championship", "playoff", "super bowl", "world series", "finals",
+        "mvp", "player", "team", "game", "match", "tournament", "olympics",
+        "ufc", "boxing", "tennis", "golf", "f1", "formula 1", "world cup",
+    ],
+    "crypto": [
+        "bitcoin", "btc", "ethereum", "eth", "solana", "sol", "crypto", "coinbase",
+        "binance", "blockchain", "defi", "nft", "token", "coin", "wallet", "mining",
+        "satoshi", "altcoin", "stablecoin", "usdc", "usdt", "doge", "dogecoin", "memecoin",
+        "airdrop", "polymarket",
+    ],
+    "culture": [
+        "movie", "film", "actor", "actress", "box office", "oscar", "grammy",
+        "emmy", "music", "album", "artist", "celebrity", "pop culture", "tv show",
+        "series", "streaming", "netflix", "spotify", "youtube", "influencer",
+        "tiktok", "viral", "meme",
+    ],
+    "finance": [
+        "stock", "market", "nasdaq", "s&p", "dow", "trading", "earnings", "ipo",
+        "acquisition", "merger", "fed", "interest rate", "inflation", "gdp",
+        "unemployment", "bond", "treasury", "recession", "bull market", "bear market",
+    ],
+    "mentions": [
+        "elon musk", "jeff bezos", "mark zuckerberg", "tim cook", "satya nadella",
+        "jensen huang", "sam altman", "vitalik buterin", "cz", "sbf",
+        "tweet", "post", "follower", "x.com", "twitter",
+    ],
+}
+
+
+def _trie_pattern(words) -> str:
+    """Regex matching any of words, with common prefixes factored out (greedy, so longer words win)."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" not in node:
+            return body
+        return f"(?:{body})?" if len(branches) == 1 and len(body) > 1 else body + "?"
+
+    return build(trie)
+
+
+class KeywordClassifier:
+    def __init__(self, categories: dict[str, list[str]], default: str = "other", memo_size: int = DEFAULT_MEMO_SIZE):
+        self.categories = list(categories)
+        self.default = default
+        self._owners: dict[str, list[int]] = {}  # keyword -> indexes of the categories listing it
+        for i, keywords in enumerate(categories.values()):
+            for keyword in dict.fromkeys(kw.lower() for kw in keywords):
+                self._owners.setdefault(keyword, []).append(i)
+        # Zero-width, so findall tries every word start and overlapping keywords are all seen
+        self._pattern = re.compile(rf"(?<![a-z0-9])(?=({_trie_pattern(self._owners)})(?:e?s)?(?![a-z0-9]))")
+        # keyword -> shorter keywords that are whole-word prefixes of it (the trie only reports the longest)
+        self._prefixes = {
+            kw: [p for p in self._owners if len(p) < len(kw) and kw.startswith(p) and not kw[len(p)].isalnum()]
+            for kw in self._owners
+        }
+        self.classify = lru_cache(maxsize=memo_size)(self._classify)
+
+    def keywords(self, title: str) -> set[str]:
+        """Distinct keywords found in a title."""
+        found = set(self._pattern.findall(title.lower()))
+        for keyword in list(found):
+            found.update(self._prefixes[keyword])
+        return found
+
+    def scores(self, title: str) -> dict[str, int]:
+        counts = [0] * len(self.categories)
+        for keyword in self.keywords(title):
+            for i in self._owners[keyword]:
+                counts[i] += 1
+        return dict(zip(self.categories, counts))
+
+    def _classify(self, title: str) -> str:
+        """Best-scoring category for a title (memoized through self.classify)."""
+        if not title:
+            return self.default
+        counts = [0] * len(self.categories)
+        for keyword in self.keywords(title):
+            for i in self._owners[keyword]:
+                counts[i] += 1
+        best = max(counts, default=0)
+        return self.categories[counts.index(best)] if best else self.default
+
+
+category_classifier = KeywordClassifier(CATEGORY_KEYWORDS)
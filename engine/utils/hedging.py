@@ -0,0 +1,90 @@
+"""Hedged requests — bound tail latency on idempotent GETs.
+
+Each endpoint keeps a rolling window of attempt latencies. Once it has
+enough history, a GET still unanswered after the endpoint's p95 (clamped
+to [min_delay, max_delay]) gets one duplicate, and the first success wins.
+Hedges are capped at `budget` x requests so a slow upstream never sees
+load amplification beyond that. Stats report attempt latency next to
+caller-observed latency, so the tail removed is visible.
+"""
+from __future__ import annotations
+
+from collections import deque
+
+from config import HEDGE_CONFIG
+
+
+def _quantile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class HedgePolicy:
+    def __init__(self, config: dict | None = None):
+        cfg = {**HEDGE_CONFIG, **(config or {})}
+        self.enabled = cfg["enabled"]
+        self._percentile = cfg["percentile"]
+        self._min_samples = cfg["min_samples"]
+        self._window = cfg["window"]
+        self._min_delay = cfg["min_delay_seconds"]
+        self._max_delay = cfg["max_delay_seconds"]
+        self._budget = cfg["budget"]
+        self._attempts: dict[str, deque[float]] = {}
+        self._observed: dict[str, deque[float]] = {}
+        self.requests = 0
+        self.hedged = 0
+        self.wins = 0
+        self.denied = 0
+
+    def _samples(self, table: dict, endpoint: str) -> deque[float]:
+        window = table.get(endpoint)
+        if window is None:
+            window = table[endpoint] = deque(maxlen=self._window)
+        return window
+
+    def record_attempt(self, endpoint: str, seconds: float):
+        """Latency of one network attempt (hedges included)."""
+        self._samples(self._attempts, endpoint).append(seconds)
+
+    def record_observed(self, endpoint: str, seconds: float):
+        """Latency the caller saw for a (possibly hedged) GET."""
+        self.requests += 1
+        self._samples(self._observed, endpoint).append(seconds)
+
+    def delay(self, endpoint: str) -> float | None:
+        """Seconds to wait before hedging, or None if this endpoint shouldn't be hedged yet."""
+        if not self.enabled:
+            return None
+        samples = self._attempts.get(endpoint)
+        if not samples or len(samples) < self._min_samples:
+            return None
+        return min(self._max_delay, max(self._min_delay, _quantile(samples, self._percentile)))
+
+    def allow(self) -> bool:
+        """Spend one hedge from the budget."""
+        if self.hedged + 1 > self._budget * max(self.requests, 1):
+            self.denied += 1
+            return False
+        self.hedged += 1
+        return True
+
+    def stats(self) -> dict:
+        endpoints = {}
+        for endpoint, observed in self._observed.items():
+            attempts = self._attempts.get(endpoint) or observed
+            endpoints[endpoint] = {
+                "attempt_p95_ms": round(_quantile(attempts, 0.95) * 1000),
+                "attempt_p99_ms": round(_quantile(attempts, 0.99) * 1000),
+                "observed_p95_ms": round(_quantile(observed, 0.95) * 1000),
+                "observed_p99_ms": round(_quantile(observed, 0.99) * 1000),
+            }
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.wins,
+            "budget_denied": self.denied,
+            "endpoints": endpoints,
+        }
+
+
+hedge_policy = HedgePolicy()
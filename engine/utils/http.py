@@ -0,0 +1,307 @@
+"""Shared HTTP transport — one pooled client per process for every engine module.
+
+Keeps TCP/TLS connections alive across calls, negotiates HTTP/2 when the `h2`
+package is installed, caps concurrent connections per host and applies one set
+of timeouts everywhere. Async requests are paced by the adaptive per-host
+limiter, which learns each upstream's ceiling from 429/Retry-After feedback,
+and identical concurrent GETs are coalesced onto one network call. GETs that
+outlive their endpoint's recent p95 are hedged with one duplicate, and each
+endpoint sits behind a circuit breaker that fails fast while it is down.
+Every call carries a Priority lane: the limiter serves realtime before
+interactive before bulk, and bulk may only hold part of a host's slots.
+`get_cached` additionally serves and revalidates responses from the on-disk
+response cache (utils/response_cache.py). With HTTP_RECORD_DIR set, every
+Polymarket response is also saved as a replay fixture (utils/replay.py).
+Async code uses `transport.get/post`; the few blocking call sites use
+`transport.sync_client()`, which shares the same limits.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import re
+import threading
+import time
+from typing import Callable
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import HTTP_CONFIG
+from utils.circuit_breaker import CircuitBreakers, circuit_breakers
+from utils.hedging import HedgePolicy, hedge_policy
+from utils.rate_limiter import AdaptiveRateLimiter, Priority, host_rate_limiter
+from utils.replay import FixtureRecorder
+from utils.response_cache import ResponseCache, response_cache
+from utils.singleflight import SingleFlight, request_key
+
+
+_ID_SEGMENT = re.compile(r"^(0x[0-9a-fA-F]+|\d+|[0-9a-fA-F-]{32,})$")
+_CONDITIONAL_HEADERS = ("if-none-match", "if-modified-since")
+
+
+def endpoint_key(url: str) -> str:
+    """Host + path with ID-like segments collapsed, e.g. gamma-api.polymarket.com/markets/*."""
+    parts = urlsplit(url)
+    segments = ["*" if _ID_SEGMENT.match(seg) else seg for seg in parts.path.split("/") if seg]
+    return f"{parts.netloc}/{'/'.join(segments)}"
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HttpTransport:
+    def __init__(
+        self,
+        config: dict | None = None,
+        limiter: AdaptiveRateLimiter | None = None,
+        cache: ResponseCache | None = None,
+        hedger: HedgePolicy | None = None,
+        breakers: CircuitBreakers | None = None,
+    ):
+        cfg = {**HTTP_CONFIG, **(config or {})}
+        self._timeout = httpx.Timeout(cfg["timeout_seconds"], connect=cfg["connect_timeout_seconds"])
+        self._limits = httpx.Limits(
+            max_connections=cfg["max_connections"],
+            max_keepalive_connections=cfg["max_keepalive"],
+            keepalive_expiry=cfg["keepalive_expiry_seconds"],
+        )
+        self._per_host = cfg["max_per_host"]
+        self._bulk_per_host = min(cfg["bulk_max_per_host"], self._per_host)
+        self._http2 = cfg["http2"] and _http2_available()
+        self._headers = {"Accept": "application/json"}
+        self.limiter = limiter or host_rate_limiter
+        self.cache = cache or response_cache
+        self.hedger = hedger or hedge_policy
+        self.breakers = breakers or circuit_breakers
+        self.recorder = FixtureRecorder(cfg["record_dir"]) if cfg["record_dir"] else None
+
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        self._bulk_slots: dict[str, asyncio.Semaphore] = {}
+        self.flights = SingleFlight()
+
+        self._sync: httpx.Client | None = None
+        self._sync_lock = threading.Lock()
+
+    # ── Async ────────────────────────────────────────────────
+
+    def client(self) -> httpx.AsyncClient:
+        """Return the pooled async client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            # Pools are bound to the loop that created them; a new asyncio.run() needs a new pool
+            self._client = httpx.AsyncClient(
+                http2=self._http2,
+                timeout=self._timeout,
+                limits=self._limits,
+                headers=self._headers,
+                event_hooks={"response": [self._record_async]},
+            )
+            self._loop = loop
+            self._host_slots = {}
+            self._bulk_slots = {}
+            self.flights = SingleFlight()
+        return self._client
+
+    async def _record_async(self, response: httpx.Response):
+        if self.recorder is not None:
+            await response.aread()
+            self.recorder.record(response)
+
+    @contextlib.asynccontextmanager
+    async def _slot(self, host: str, priority: Priority):
+        """Hold one of the host's connection slots; bulk callers also need one of the bulk lane's slots."""
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self._per_host)
+        if priority < Priority.BULK:
+            async with slot:
+                yield
+            return
+        bulk = self._bulk_slots.get(host)
+        if bulk is None:
+            bulk = self._bulk_slots[host] = asyncio.Semaphore(self._bulk_per_host)
+        async with bulk, slot:
+            yield
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        priority: Priority = Priority.INTERACTIVE,
+        on_dispatch: Callable[[], None] | None = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send a rate-limited request over the shared pool, holding one of the host's connection slots.
+
+        on_dispatch is called once the limiter and the slot let the request onto the wire.
+        """
+        client = self.client()
+        host = urlsplit(url).netloc
+        endpoint = endpoint_key(url)
+        breaker = self.breakers.get(endpoint)
+        breaker.before()  # Raises CircuitOpenError while the endpoint is failing
+        try:
+            await self.limiter.acquire(host, priority)
+            async with self._slot(host, priority):
+                if on_dispatch is not None:
+                    on_dispatch()
+                start = time.monotonic()
+                resp = await client.request(method, url, **kwargs)
+                elapsed = time.monotonic() - start
+        except httpx.TransportError:
+            breaker.failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        self.limiter.observe(host, resp.status_code, resp.headers.get("Retry-After"))
+        if resp.status_code >= 500:
+            breaker.failure()
+        else:
+            breaker.success()
+            self.hedger.record_attempt(endpoint, elapsed)
+        return resp
+
+    async def get(self, url: str, params: dict | None = None, **kwargs) -> httpx.Response:
+        """GET that shares one in-flight response between identical concurrent callers in the same lane.
+
+        Headers are part of "identical": a conditional GET (If-None-Match) may be
+        answered 304 with no body, so it never shares a response with a plain GET.
+        """
+        self.client()
+        headers = tuple(sorted((k.lower(), v) for k, v in (kwargs.get("headers") or {}).items()))
+        return await self.flights.do(
+            (request_key("GET", url, params), headers, kwargs.get("priority", Priority.INTERACTIVE)),
+            lambda: self._hedged_get(url, params=params, **kwargs),
+        )
+
+    async def _hedged_get(self, url: str, **kwargs) -> httpx.Response:
+        """GET with one duplicate sent if the first attempt outlives the endpoint's p95.
+
+        The p95 is measured on the wire, so the hedge delay only starts once the
+        primary is dispatched: time queued in the limiter or for a slot never
+        triggers a hedge.
+        """
+        endpoint = endpoint_key(url)
+        start = time.monotonic()
+        delay = self.hedger.delay(endpoint)
+        dispatched = asyncio.Event()
+        primary = asyncio.ensure_future(self.request("GET", url, on_dispatch=dispatched.set, **kwargs))
+        pending = {primary}
+        try:
+            if delay is not None:
+                waiter = asyncio.ensure_future(dispatched.wait())
+                try:
+                    await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    waiter.cancel()
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done and self.hedger.allow():
+                    pending.add(asyncio.ensure_future(self.request("GET", url, **kwargs)))
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    if fut.exception() is None:
+                        if fut is not primary:
+                            self.hedger.wins += 1
+                        self.hedger.record_observed(endpoint, time.monotonic() - start)
+                        return fut.result()
+                    error = fut.exception()
+            raise error
+        finally:
+            # The slower attempt is abandoned; cancelling it frees its connection slot
+            for fut in pending:
+                fut.cancel()
+
+    async def get_cached(self, url: str, params: dict | None = None, **kwargs) -> httpx.Response:
+        """GET through the response cache: fresh hits skip the network, stale ones revalidate."""
+        ttl = self.cache.ttl_for(url)
+        if ttl <= 0:
+            return await self.get(url, params=params, **kwargs)
+
+        key = self.cache.key(url, params)
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh:
+            return self._cached_response(url, params, entry.body)
+
+        headers = {**kwargs.pop("headers", {}), **(entry.validators() if entry else {})}
+        resp = await self.get(url, params=params, headers=headers, **kwargs)
+        if resp.status_code == 304:
+            if entry is not None:
+                self.cache.refresh(key, ttl)
+                return self._cached_response(url, params, entry.body)
+            # Nothing cached to revalidate (the caller sent its own validators): a 304 has no body, so fetch it
+            headers = {k: v for k, v in headers.items() if k.lower() not in _CONDITIONAL_HEADERS}
+            resp = await self.get(url, params=params, headers=headers, **kwargs)
+        if resp.status_code == 200:
+            self.cache.put(key, resp.content, ttl, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        return resp
+
+    @staticmethod
+    def _cached_response(url: str, params: dict | None, body: bytes) -> httpx.Response:
+        return httpx.Response(
+            200,
+            content=body,
+            headers={"Content-Type": "application/json", "X-Cache": "HIT"},
+            request=httpx.Request("GET", url, params=params),
+        )
+
+    async def post(self, url: str, json: dict | list | None = None, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, json=json, **kwargs)
+
+    def stats(self) -> dict:
+        """Counters from every layer of the transport, for cycle logs."""
+        return {
+            "rate_limits": self.limiter.stats(),
+            "coalesced": self.flights.stats(),
+            "cache": dict(self.cache.stats),
+            "hedging": self.hedger.stats(),
+            "circuits": self.breakers.stats(),
+        }
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+        self._host_slots = {}
+        self._bulk_slots = {}
+        self.flights = SingleFlight()
+
+    # ── Blocking ─────────────────────────────────────────────
+
+    def sync_client(self) -> httpx.Client:
+        """Return the pooled blocking client (same limits and timeouts)."""
+        with self._sync_lock:
+            if self._sync is None or self._sync.is_closed:
+                self._sync = httpx.Client(
+                    http2=self._http2,
+                    timeout=self._timeout,
+                    limits=self._limits,
+                    headers=self._headers,
+                    event_hooks={"response": [self._record_sync]},
+                )
+            return self._sync
+
+    def _record_sync(self, response: httpx.Response):
+        if self.recorder is not None:
+            response.read()
+            self.recorder.record(response)
+
+    def close(self):
+        with self._sync_lock:
+            if self._sync is not None:
+                self._sync.close()
+            self._sync = None
+
+
+transport = HttpTransport()
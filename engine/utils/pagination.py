@@ -0,0 +1,66 @@
+"""Offset pagination with parallel fan-out.
+
+The first page is fetched alone (most wallets and queries fit in one page)
+unless the caller expects many pages and asks for a wider start. While pages
+keep coming back full, up to `fan_out` offsets stay in flight at once; pages
+are yielded in offset order as they arrive, and the first short page cancels
+every outstanding page beyond it. Pacing stays with the shared transport's
+per-host limiter, so fan-out never exceeds the host's rate budget.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+DEFAULT_FAN_OUT = 4
+
+
+async def iter_pages(
+    fetch_page: Callable[[int], Awaitable[list[Any]]],
+    page_size: int,
+    max_items: int | None = None,
+    fan_out: int = DEFAULT_FAN_OUT,
+    initial: int = 1,
+) -> AsyncIterator[list[Any]]:
+    """Yield pages from fetch_page(offset) in offset order; max_items=None walks to the last page."""
+    in_flight: deque[asyncio.Future] = deque()
+    next_offset = 0
+
+    def launch(count: int):
+        nonlocal next_offset
+        while len(in_flight) < count and (max_items is None or next_offset < max_items):
+            in_flight.append(asyncio.ensure_future(fetch_page(next_offset)))
+            next_offset += page_size
+
+    launch(min(initial, fan_out))
+    try:
+        while in_flight:
+            batch = await in_flight.popleft()
+            if batch:
+                yield batch
+            if not batch or len(batch) < page_size:
+                break
+            launch(fan_out)
+    finally:
+        for fut in in_flight:
+            fut.cancel()
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+async def paginate(
+    fetch_page: Callable[[int], Awaitable[list[Any]]],
+    page_size: int,
+    max_items: int | None,
+    fan_out: int = DEFAULT_FAN_OUT,
+) -> list[Any]:
+    """Collect items from fetch_page(offset) for offsets 0, page_size, ... up to max_items."""
+    items: list[Any] = []
+    pages = iter_pages(fetch_page, page_size, max_items, fan_out)
+    try:
+        async for batch in pages:
+            items.extend(batch)
+    finally:
+        await pages.aclose()
+    return items if max_items is None else items[:max_items]
@@ -1,6 +1,23 @@
-"""Rate limiter for API calls."""
+"""Rate limiters for API calls.
+
+RateLimiter is the blocking fixed-interval limiter kept for the synchronous
+Anthropic/Perplexity SDK calls. AdaptiveRateLimiter is the asyncio token bucket
+used by the shared HTTP transport: one bucket per host, whose rate climbs
+additively while responses are clean and is cut multiplicatively on 429.
+Callers share each host's budget through priority lanes (realtime,
+interactive, bulk), so long bulk jobs never starve time-sensitive polls.
+"""
+import asyncio
+import heapq
+import itertools
 import time
 import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+
+from config import RATE_LIMIT_CONFIG
+
 
 class RateLimiter:
     def __init__(self):
@@ -22,4 +39,158 @@ class RateLimiter:
             time.sleep(wait_time)
         self._last_call[service] = time.time()
 
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class Priority(IntEnum):
+    """Lanes sharing a host's budget — lower value is served first."""
+    REALTIME = 0       # Copy-signal polls, pick resolution
+    INTERACTIVE = 1    # Market scan cycle
+    BULK = 2           # Trader discovery, backfills
+
+
+class _Bucket:
+    """Token bucket for one host plus the priority queue of callers waiting on it."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.throttled = 0
+        self.waiters: list[tuple[int, int, asyncio.Future, float]] = []  # heap of (priority, seq, future, queued_at)
+        self.dispatcher: asyncio.Task | None = None
+        self.granted = [0] * len(Priority)
+        self.waited = [0.0] * len(Priority)
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until the next token can be handed out."""
+        return max((1 - self.tokens) / self.rate, self.blocked_until - now, 0.0)
+
+    def grant(self, priority: int, waited: float):
+        self.tokens -= 1
+        self.granted[priority] += 1
+        self.waited[priority] += waited
+
+
+class AdaptiveRateLimiter:
+    """Per-host asyncio token bucket with AIMD rate control and priority lanes.
+
+    Callers that can't take a token immediately queue by (priority, arrival);
+    one dispatcher task per host hands tokens out in that order, so a bulk
+    backlog never delays a realtime request by more than one token interval.
+    """
+
+    def __init__(self, config: dict | None = None):
+        cfg = {**RATE_LIMIT_CONFIG, **(config or {})}
+        self._host_rates = cfg["hosts"]
+        self._default_rate = cfg["default_rps"]
+        self._min_rate = cfg["min_rps"]
+        self._max_rate = cfg["max_rps"]
+        self._increase = cfg["increase_rps"]
+        self._decrease = cfg["decrease_factor"]
+        self._burst = cfg["burst"]
+        self._host_burst = cfg["host_burst"]
+        self._default_retry_after = cfg["default_retry_after"]
+        self._buckets: dict[str, _Bucket] = {}
+        self._seq = itertools.count()
+
+    def _bucket(self, host: str) -> _Bucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate = self._host_rates.get(host, self._default_rate)
+            bucket = self._buckets[host] = _Bucket(rate, self._host_burst.get(host, self._burst))
+        return bucket
+
+    async def acquire(self, host: str, priority: Priority = Priority.INTERACTIVE):
+        """Wait until the host's bucket grants a request slot to this lane."""
+        bucket = self._bucket(host)
+        now = time.monotonic()
+        bucket.refill(now)
+        if not bucket.waiters and bucket.wait_time(now) <= 0:
+            bucket.grant(priority, 0.0)
+            return
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        heapq.heappush(bucket.waiters, (priority, next(self._seq), fut, now))
+        dispatcher = bucket.dispatcher
+        if dispatcher is None or dispatcher.done() or dispatcher.get_loop() is not loop:
+            # Waiters left behind by a previous event loop can never be woken
+            bucket.waiters = [w for w in bucket.waiters if w[2].get_loop() is loop]
+            heapq.heapify(bucket.waiters)
+            bucket.dispatcher = loop.create_task(self._dispatch(bucket))
+        await fut
+
+    async def _dispatch(self, bucket: _Bucket):
+        while bucket.waiters:
+            now = time.monotonic()
+            bucket.refill(now)
+            delay = bucket.wait_time(now)
+            if delay > 0:
+                # A 429 during this sleep moves blocked_until; the next pass re-checks
+                await asyncio.sleep(delay)
+                continue
+            priority, _, fut, queued_at = heapq.heappop(bucket.waiters)
+            if fut.done():  # Waiter was cancelled
+                continue
+            bucket.grant(priority, now - queued_at)
+            fut.set_result(None)
+
+    def observe(self, host: str, status_code: int, retry_after: str | None = None):
+        """Feed a response back: 429 halves the rate and pauses the host, anything else nudges it up."""
+        bucket = self._bucket(host)
+        now = time.monotonic()
+        if status_code == 429:
+            bucket.throttled += 1
+            wait = parse_retry_after(retry_after)
+            bucket.blocked_until = max(bucket.blocked_until, now + (wait if wait is not None else self._default_retry_after))
+            # One cut per second — a burst of concurrent 429s is a single congestion signal
+            if now - bucket.last_decrease >= 1.0:
+                bucket.rate = max(self._min_rate, bucket.rate * self._decrease)
+                bucket.last_decrease = now
+            bucket.refill(now)
+            bucket.tokens = 0.0
+        elif status_code < 500:
+            # +increase_rps per second of clean traffic at the current rate
+            bucket.rate = min(self._max_rate, bucket.rate + self._increase / bucket.rate)
+
+    def stats(self) -> dict[str, dict]:
+        return {
+            host: {
+                "rate": round(b.rate, 2),
+                "throttled": b.throttled,
+                "queued": len(b.waiters),
+                "lanes": {
+                    lane.name.lower(): {
+                        "granted": b.granted[lane],
+                        "avg_wait_ms": round(1000 * b.waited[lane] / b.granted[lane]) if b.granted[lane] else 0,
+                    }
+                    for lane in Priority
+                    if b.granted[lane]
+                },
+            }
+            for host, b in self._buckets.items()
+        }
+
+
 rate_limiter = RateLimiter()
+host_rate_limiter = AdaptiveRateLimiter()
@@ -0,0 +1,603 @@
+"""Record/replay stand-in for the Polymarket Gamma, Data and CLOB APIs.
+
+Recording: with HTTP_RECORD_DIR set (or `python -m utils.replay record`), the
+shared transport writes every Polymarket response it receives to a fixture
+file, one JSON document per distinct request:
+
+    <dir>/<service>/<sha1 of method+path+query>.json
+
+Replaying: `python -m utils.replay serve` runs StandInApp, a plain ASGI app
+(served with uvicorn when installed), under one origin with a prefix per
+service. Point the engine at it with the env overrides it prints:
+
+    GAMMA_API=http://127.0.0.1:8787/gamma
+    DATA_API=http://127.0.0.1:8787/data
+    CLOB_HOST=http://127.0.0.1:8787/clob
+
+Requests with an exact recorded match are served verbatim. Paged list
+endpoints (limit/offset) are also served by slicing the union of all recorded
+pages, so a different page size or fan-out still replays. The stand-in can add
+latency and jitter, cap the page size, inject 429s (randomly, or above a
+requests-per-second ceiling) and answers If-None-Match with 304.
+GET /_standin/stats returns its counters.
+
+Order books: every recorded book (from GET /book or the batched POST /books,
+which the recorder splits per token) can be served through either endpoint,
+so batched fetches replay from single-book recordings and vice versa. With
+synthetic_books (--synthetic-books) unknown tokens get a deterministic
+made-up book instead of being left out.
+
+Market channel: the stand-in also accepts the CLOB websocket market channel at
+/ws/market (CLOB_WS=ws://127.0.0.1:8787/ws). A subscription gets a book
+snapshot per known token, then the recorded channel messages for its tokens
+(<dir>/ws/market.jsonl, written by core/market_stream.py while recording) at
+their recorded pace. With no recording and synthetic_books, every subscribed
+token random-walks instead. It answers PING with PONG. ws_drop_seconds closes
+each connection after that long, so reconnect and resync can be tested.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import time
+from collections import deque
+from urllib.parse import parse_qsl
+
+import msgspec
+
+from config import CLOB_HOST, DATA_API, GAMMA_API, REPLAY_FIXTURES_DIR
+
+PAGING_PARAMS = ("limit", "offset")
+BOOK_PATHS = ("/book", "/books")
+
+
+def _services() -> dict[str, str]:
+    return {"gamma": GAMMA_API, "data": DATA_API, "clob": CLOB_HOST}
+
+
+def fixture_id(method: str, service: str, path: str, query: list[tuple[str, str]]) -> str:
+    """Stable file stem for a request (query order doesn't matter)."""
+    items = "&".join(f"{k}={v}" for k, v in sorted(query))
+    return hashlib.sha1(f"{method.upper()} {service}{path}?{items}".encode()).hexdigest()[:20]
+
+
+def synthetic_book(token_id: str, levels: int = 5) -> dict:
+    """Deterministic CLOB book for a token nobody recorded (mid and sizes derived from the id)."""
+    rng = random.Random(hashlib.sha1(token_id.encode()).digest())
+    mid = rng.randint(5, 95) / 100
+    bids = [{"price": f"{mid - 0.01 * (i + 1):.2f}", "size": f"{rng.uniform(10, 5000):.2f}"} for i in range(levels)]
+    asks = [{"price": f"{mid + 0.01 * (i + 1):.2f}", "size": f"{rng.uniform(10, 5000):.2f}"} for i in range(levels)]
+    return {
+        "market": "", "asset_id": token_id,
+        "bids": [b for b in bids if float(b["price"]) > 0][::-1],   # CLOB order: worst bid first
+        "asks": [a for a in asks if float(a["price"]) < 1][::-1],   # and worst ask first
+        "timestamp": str(int(time.time() * 1000)), "hash": "",
+    }
+
+
+def _group_id(service: str, path: str, query: list[tuple[str, str]]) -> tuple:
+    """Identity of a paged collection: the request minus limit/offset."""
+    return (service, path, tuple(sorted((k, v) for k, v in query if k not in PAGING_PARAMS)))
+
+
+# ── Recording ────────────────────────────────────────────────
+
+
+class FixtureRecorder:
+    """Writes Polymarket responses seen by the shared transport to fixture files."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.recorded = 0
+
+    def _locate(self, url: str) -> tuple[str, str] | None:
+        for service, base in _services().items():
+            if url.startswith(base):
+                return service, url[len(base):] or "/"
+        return None
+
+    def record(self, response) -> None:
+        """Save one httpx.Response (body must already be read).
+
+        Only 2xx responses with a body are fixtures: a 304 has no body and shares its
+        fixture id with the 200 it revalidated, so recording it would overwrite that 200.
+        """
+        if not 200 <= response.status_code < 300 or not response.content:
+            return
+        request = response.request
+        located = self._locate(str(request.url.copy_with(query=None)))
+        if located is None:
+            return
+        service, path = located
+        query = [(k, v) for k, v in request.url.params.multi_items()]
+        try:
+            body = msgspec.json.decode(response.content)
+            text = None
+        except msgspec.DecodeError:
+            body, text = None, response.text
+
+        if service == "clob" and path == "/books" and isinstance(body, list):
+            # A batch only replays for the same token set; one GET /book fixture per token replays any batch
+            for book in body:
+                if isinstance(book, dict) and book.get("asset_id"):
+                    self._write("GET", service, "/book", [("token_id", book["asset_id"])], 200, None, book, None)
+            return
+        self._write(request.method, service, path, query, response.status_code, response.headers.get("ETag"), body, text)
+
+    def record_ws(self, channel: str, raw: str | bytes) -> None:
+        """Append one websocket frame, with its arrival time, to <root>/ws/<channel>.jsonl."""
+        folder = os.path.join(self.root, "ws")
+        os.makedirs(folder, exist_ok=True)
+        text = raw.decode() if isinstance(raw, bytes) else raw
+        with open(os.path.join(folder, f"{channel}.jsonl"), "ab") as f:
+            f.write(msgspec.json.encode({"t": time.time(), "message": text}) + b"\n")
+        self.recorded += 1
+
+    def _write(self, method: str, service: str, path: str, query: list, status: int, etag, body, text):
+        doc = {
+            "method": method,
+            "service": service,
+            "path": path,
+            "query": query,
+            "status": status,
+            "etag": etag,
+            "body": body,
+            "text": text,
+            "recorded_at": time.time(),
+        }
+        folder = os.path.join(self.root, service)
+        os.makedirs(folder, exist_ok=True)
+        target = os.path.join(folder, fixture_id(method, service, path, query) + ".json")
+        tmp = target + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(msgspec.json.encode(doc))
+        os.replace(tmp, target)
+        self.recorded += 1
+
+
+# ── Replay ───────────────────────────────────────────────────
+
+
+class FixtureSet:
+    """Recorded responses indexed for exact lookup and for re-paging list endpoints."""
+
+    def __init__(self, root: str):
+        self.exact: dict[str, dict] = {}
+        self.collections: dict[tuple, list] = {}
+        self.books: dict[str, dict] = {}   # token_id -> recorded CLOB book
+        self.ws: dict[str, list[tuple[float, str]]] = {}   # channel -> [(arrival time, frame)]
+        pages: dict[tuple, dict[int, list]] = {}
+
+        for service in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+            folder = os.path.join(root, service)
+            if service == "ws":
+                for name in sorted(os.listdir(folder)):
+                    if name.endswith(".jsonl"):
+                        with open(os.path.join(folder, name), "rb") as f:
+                            frames = [msgspec.json.decode(line) for line in f if line.strip()]
+                        self.ws[name[:-len(".jsonl")]] = [(fr["t"], fr["message"]) for fr in frames]
+                continue
+            for name in sorted(os.listdir(folder)):
+                if not name.endswith(".json"):
+                    continue
+                with open(os.path.join(folder, name), "rb") as f:
+                    doc = msgspec.json.decode(f.read())
+                query = [tuple(kv) for kv in doc["query"]]
+                doc["payload"] = (
+                    msgspec.json.encode(doc["body"]) if doc.get("text") is None else doc["text"].encode()
+                )
+                self.exact[fixture_id(doc["method"], doc["service"], doc["path"], query)] = doc
+
+                params = dict(query)
+                if doc["status"] == 200 and doc["service"] == "clob" and doc["path"] == "/book":
+                    if isinstance(doc["body"], dict) and params.get("token_id"):
+                        self.books[params["token_id"]] = doc["body"]
+                if doc["status"] == 200 and isinstance(doc["body"], list) and "offset" in params:
+                    group = pages.setdefault(_group_id(doc["service"], doc["path"], query), {})
+                    group[int(params["offset"])] = doc["body"]
+
+        # Stitch pages into one list per collection, stopping at the first gap
+        for group, by_offset in pages.items():
+            rows: list = []
+            for offset in sorted(by_offset):
+                if offset > len(rows):
+                    break
+                rows[offset:] = by_offset[offset]
+            self.collections[group] = rows
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+
+class StandInApp:
+    """ASGI app replaying a FixtureSet with configurable latency, paging and 429 injection."""
+
+    def __init__(
+        self,
+        fixtures: FixtureSet,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        throttle_rate: float = 0.0,
+        rps_limit: float = 0.0,
+        retry_after: float = 1.0,
+        max_page_size: int = 0,
+        synthetic_books: bool = False,
+        ws_drop_seconds: float = 0.0,
+        ws_speed: float = 1.0,
+        ws_tick_ms: float = 250.0,
+        seed: int = 0,
+    ):
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.rps_limit = rps_limit
+        self.retry_after = retry_after
+        self.max_page_size = max_page_size
+        self.synthetic_books = synthetic_books
+        self.ws_drop_seconds = ws_drop_seconds
+        self.ws_speed = ws_speed
+        self.ws_tick_ms = ws_tick_ms
+        self._rng = random.Random(seed)
+        self._window: deque[float] = deque()
+        self.stats = {"requests": 0, "exact": 0, "paged": 0, "not_modified": 0, "throttled": 0, "missing": 0, "books": 0,
+                      "ws_connections": 0, "ws_frames": 0}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] == "websocket":
+            await self._websocket(scope, receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        status, headers, body = await self.handle(
+            scope["method"],
+            scope["path"],
+            parse_qsl(scope["query_string"].decode(), keep_blank_values=True),
+            {k.decode().lower(): v.decode() for k, v in scope["headers"]},
+            b"".join(chunks),
+        )
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(k.encode(), v.encode()) for k, v in headers.items()],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def handle(
+        self, method: str, path: str, query: list, headers: dict, body: bytes = b""
+    ) -> tuple[int, dict, bytes]:
+        json_headers = {"content-type": "application/json"}
+        if path == "/_standin/stats":
+            return 200, json_headers, msgspec.json.encode(self.stats)
+
+        self.stats["requests"] += 1
+        delay = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        if self._throttled():
+            self.stats["throttled"] += 1
+            return 429, {**json_headers, "retry-after": f"{self.retry_after:g}"}, b'{"error":"rate limited"}'
+
+        service, _, rest = path.lstrip("/").partition("/")
+        rest = "/" + rest
+        params = dict(query)
+        if self.max_page_size and "limit" in params:
+            params["limit"] = str(min(int(params["limit"]), self.max_page_size))
+            query = [(k, params[k] if k == "limit" else v) for k, v in query]
+
+        if service == "clob" and rest in BOOK_PATHS:
+            return self._books(method, rest, params, body)
+
+        doc = self.fixtures.exact.get(fixture_id(method, service, rest, query))
+        if doc is not None:
+            self.stats["exact"] += 1
+            etag = doc.get("etag")
+            if etag and headers.get("if-none-match") == etag:
+                self.stats["not_modified"] += 1
+                return 304, {"etag": etag}, b""
+            out = dict(json_headers)
+            if etag:
+                out["etag"] = etag
+            return doc["status"], out, doc["payload"]
+
+        rows = self.fixtures.collections.get(_group_id(service, rest, query))
+        if rows is not None and method == "GET":
+            self.stats["paged"] += 1
+            offset = int(params.get("offset", 0))
+            limit = int(params.get("limit", len(rows)))
+            return 200, json_headers, msgspec.json.encode(rows[offset:offset + limit])
+
+        self.stats["missing"] += 1
+        return 404, json_headers, b'{"error":"no fixture recorded for this request"}'
+
+    def _book(self, token_id: str) -> dict | None:
+        book = self.fixtures.books.get(token_id)
+        if book is None and self.synthetic_books:
+            book = synthetic_book(token_id)
+        if book is not None:
+            self.stats["books"] += 1
+        return book
+
+    def _books(self, method: str, path: str, params: dict, body: bytes) -> tuple[int, dict, bytes]:
+        """GET /book?token_id= or POST /books [{"token_id": ...}, ...] from the recorded (or synthetic) books."""
+        json_headers = {"content-type": "application/json"}
+        if path == "/book" and method == "GET":
+            book = self._book(params.get("token_id", ""))
+            if book is None:
+                self.stats["missing"] += 1
+                return 404, json_headers, b'{"error":"No orderbook exists for the requested token id"}'
+            return 200, json_headers, msgspec.json.encode(book)
+        if path == "/books" and method == "POST":
+            try:
+                wanted = [item["token_id"] for item in msgspec.json.decode(body or b"[]")]
+            except (msgspec.DecodeError, KeyError, TypeError):
+                return 400, json_headers, b'{"error":"expected [{\"token_id\": ...}]"}'
+            books = [book for book in map(self._book, wanted) if book is not None]
+            self.stats["missing"] += len(wanted) - len(books)
+            return 200, json_headers, msgspec.json.encode(books)
+        return 405, json_headers, b'{"error":"method not allowed"}'
+
+    # ── Market channel ──
+
+    async def _websocket(self, scope, receive, send):
+        await receive()  # websocket.connect
+        if scope["path"].rstrip("/") != "/ws/market":
+            await send({"type": "websocket.close", "code": 4404})
+            return
+        await send({"type": "websocket.accept"})
+        self.stats["ws_connections"] += 1
+        inbox: asyncio.Queue = asyncio.Queue()
+
+        async def read():
+            while True:
+                message = await receive()
+                if message["type"] == "websocket.disconnect":
+                    await inbox.put(None)
+                    return
+                await inbox.put(message.get("text") or (message.get("bytes") or b"").decode())
+
+        async def emit(payload):
+            text = payload if isinstance(payload, str) else msgspec.json.encode(payload).decode()
+            self.stats["ws_frames"] += 1
+            await send({"type": "websocket.send", "text": text})
+
+        reader = asyncio.ensure_future(read())
+        subscribed: set[str] = set()
+        mids: dict[str, float] = {}
+        recorded = self.fixtures.ws.get("market", [])
+        cursor = 0
+        started = time.monotonic()
+        next_at = started
+        try:
+            while True:
+                if self.ws_drop_seconds and time.monotonic() - started >= self.ws_drop_seconds:
+                    await send({"type": "websocket.close", "code": 1012})
+                    return
+                try:
+                    text = await asyncio.wait_for(inbox.get(), timeout=max(0.0, next_at - time.monotonic()))
+                except asyncio.TimeoutError:
+                    text = ""
+                if text is None:
+                    return
+                if text == "PING":
+                    await send({"type": "websocket.send", "text": "PONG"})
+                    continue
+                if text:
+                    added = self._ws_subscribe(text, subscribed)
+                    snapshots = [book for book in map(self._book, added) if book is not None]
+                    for book in snapshots:
+                        mids[book["asset_id"]] = _book_mid(book)
+                    if snapshots:
+                        await emit([{**book, "event_type": "book"} for book in snapshots])
+                    continue
+                if time.monotonic() < next_at or not subscribed:
+                    next_at = time.monotonic() + self.ws_tick_ms / 1000
+                    continue
+
+                if recorded:
+                    t, frame = recorded[cursor]
+                    cursor = (cursor + 1) % len(recorded)
+                    gap = recorded[cursor][0] - t if cursor else self.ws_tick_ms / 1000
+                    next_at = time.monotonic() + max(0.0, gap) / self.ws_speed
+                    filtered = _filter_frame(frame, subscribed)
+                    if filtered:
+                        await emit(filtered)
+                elif self.synthetic_books:
+                    next_at = time.monotonic() + self.ws_tick_ms / 1000
+                    token = self._rng.choice(sorted(subscribed))
+                    await emit(self._random_walk(token, mids))
+                else:
+                    next_at = time.monotonic() + 3600
+        finally:
+            reader.cancel()
+
+    @staticmethod
+    def _ws_subscribe(text: str, subscribed: set[str]) -> list[str]:
+        """Apply a subscribe/unsubscribe message; returns newly subscribed tokens."""
+        try:
+            message = msgspec.json.decode(text)
+        except msgspec.DecodeError:
+            return []
+        if not isinstance(message, dict):
+            return []
+        tokens = [t for t in message.get("assets_ids") or [] if isinstance(t, str)]
+        if message.get("operation") == "unsubscribe":
+            subscribed.difference_update(tokens)
+            return []
+        added = [t for t in tokens if t not in subscribed]
+        subscribed.update(added)
+        return added
+
+    def _random_walk(self, token: str, mids: dict[str, float]) -> dict:
+        """One tick of a synthetic market: the midpoint moves a cent and the touch levels follow it."""
+        old = mids.get(token, 0.5)
+        new = min(0.95, max(0.05, round(old + self._rng.choice((-0.01, 0.01)), 2)))
+        mids[token] = new
+        bid, ask = round(new - 0.01, 2), round(new + 0.01, 2)
+        size = f"{self._rng.uniform(10, 5000):.2f}"
+        changes = [
+            {"asset_id": token, "price": f"{bid:.2f}", "size": size, "side": "BUY"},
+            {"asset_id": token, "price": f"{ask:.2f}", "size": size, "side": "SELL"},
+        ]
+        if new > old:   # The old best ask is now inside the spread
+            changes.append({"asset_id": token, "price": f"{old + 0.01:.2f}", "size": "0", "side": "SELL"})
+        elif new < old:
+            changes.append({"asset_id": token, "price": f"{old - 0.01:.2f}", "size": "0", "side": "BUY"})
+        for change in changes:
+            change.update(best_bid=f"{bid:.2f}", best_ask=f"{ask:.2f}")
+        return {"event_type": "price_change", "market": "", "price_changes": changes,
+                "timestamp": str(int(time.time() * 1000))}
+
+    def _throttled(self) -> bool:
+        if self.throttle_rate and self._rng.random() < self.throttle_rate:
+            return True
+        if self.rps_limit:
+            now = time.monotonic()
+            while self._window and now - self._window[0] >= 1.0:
+                self._window.popleft()
+            if len(self._window) >= self.rps_limit:
+                return True
+            self._window.append(now)
+        return False
+
+
+def _book_mid(book: dict) -> float:
+    bids = [float(b["price"]) for b in book.get("bids", [])]
+    asks = [float(a["price"]) for a in book.get("asks", [])]
+    if bids and asks:
+        return round((max(bids) + min(asks)) / 2, 2)
+    return 0.5
+
+
+def _filter_frame(frame: str, tokens: set[str]) -> list:
+    """Events from a recorded market-channel frame that concern the subscribed tokens."""
+    try:
+        payload = msgspec.json.decode(frame)
+    except msgspec.DecodeError:
+        return []
+    out = []
+    for event in payload if isinstance(payload, list) else [payload]:
+        if not isinstance(event, dict):
+            continue
+        if "price_changes" in event:
+            changes = [c for c in event["price_changes"] if c.get("asset_id") in tokens]
+            if changes:
+                out.append({**event, "price_changes": changes})
+        elif event.get("asset_id") in tokens:
+            out.append(event)
+    return out
+
+
+# ── CLI ──────────────────────────────────────────────────────
+
+
+async def _record(target: str, seconds: float):
+    from utils.http import transport
+
+    if target == "stream":
+        from config import BOOK_CACHE_CONFIG
+        from core.market_scanner import MarketScanner
+        from core.market_stream import market_stream
+        markets = await MarketScanner().scan()
+        market_stream.track([m for m in markets if m["liquidity"] >= BOOK_CACHE_CONFIG["warm_min_liquidity"]])
+        await market_stream.start()
+        await asyncio.sleep(seconds)
+        await market_stream.stop()
+    elif target == "scan":
+        from core.market_scanner import MarketScanner
+        await MarketScanner().scan()
+    elif target == "discovery":
+        from shadow.trader_discovery import TraderDiscovery
+        await TraderDiscovery().scan_all()
+    elif target == "copy":
+        from shadow.copy_detector import CopyDetector
+        await CopyDetector().detect_signals()
+    await transport.aclose()
+    transport.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay Polymarket API fixtures")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Run one engine stage against the live APIs and save every response")
+    rec.add_argument("target", choices=["scan", "discovery", "copy", "stream"],
+                     help="discovery and copy also need Supabase credentials, as in production; "
+                          "stream scans, then records the market channel for liquid markets")
+    rec.add_argument("--out", default=REPLAY_FIXTURES_DIR)
+    rec.add_argument("--seconds", type=float, default=60.0, help="How long to record the market channel")
+
+    srv = sub.add_parser("serve", help="Serve recorded fixtures as a local stand-in (needs uvicorn)")
+    srv.add_argument("--fixtures", default=REPLAY_FIXTURES_DIR)
+    srv.add_argument("--host", default="127.0.0.1")
+    srv.add_argument("--port", type=int, default=8787)
+    srv.add_argument("--latency-ms", type=float, default=0.0)
+    srv.add_argument("--jitter-ms", type=float, default=0.0)
+    srv.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    srv.add_argument("--rps-limit", type=float, default=0.0, help="429 above this many requests per second")
+    srv.add_argument("--retry-after", type=float, default=1.0)
+    srv.add_argument("--max-page-size", type=int, default=0)
+    srv.add_argument("--synthetic-books", action="store_true",
+                     help="Make up books for tokens with none recorded (and random-walk them on the market channel)")
+    srv.add_argument("--ws-drop-seconds", type=float, default=0.0, help="Close market-channel connections after this long")
+    srv.add_argument("--ws-speed", type=float, default=1.0, help="Replay speed for recorded market-channel frames")
+    srv.add_argument("--ws-tick-ms", type=float, default=250.0, help="Interval between synthetic price changes")
+    srv.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        from utils.http import transport
+        transport.recorder = FixtureRecorder(args.out)
+        transport.cache.enabled = False  # Cache hits never reach the recorder
+        asyncio.run(_record(args.target, args.seconds))
+        print(f"Recorded {transport.recorder.recorded} responses to {args.out}")
+        return
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("The stand-in server needs uvicorn: pip install uvicorn")
+
+    fixtures = FixtureSet(args.fixtures)
+    app = StandInApp(
+        fixtures,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        throttle_rate=args.throttle_rate,
+        rps_limit=args.rps_limit,
+        retry_after=args.retry_after,
+        max_page_size=args.max_page_size,
+        synthetic_books=args.synthetic_books,
+        ws_drop_seconds=args.ws_drop_seconds,
+        ws_speed=args.ws_speed,
+        ws_tick_ms=args.ws_tick_ms,
+        seed=args.seed,
+    )
+    origin = f"http://{args.host}:{args.port}"
+    print(f"Serving {len(fixtures)} fixtures ({len(fixtures.collections)} paged collections, "
+          f"{len(fixtures.books)} order books). Point the engine at it with:")
+    print(f"  export GAMMA_API={origin}/gamma DATA_API={origin}/data CLOB_HOST={origin}/clob CLOB_WS=ws://{args.host}:{args.port}/ws")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
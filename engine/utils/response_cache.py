@@ -0,0 +1,146 @@
+"""Persistent HTTP response cache — SQLite-backed, per-endpoint TTL, LRU-bounded.
+
+Fresh entries are served straight from disk. Expired entries keep their
+validators (ETag / Last-Modified) so the next fetch can be a conditional GET;
+a 304 re-arms the TTL without re-downloading the body. When the file grows
+past max_bytes the least recently used entries are evicted.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlencode, urlsplit
+
+from config import RESPONSE_CACHE_CONFIG
+from utils.logger import log
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str | None
+    last_modified: str | None
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    def __init__(self, config: dict | None = None):
+        cfg = {**RESPONSE_CACHE_CONFIG, **(config or {})}
+        self.enabled = cfg["enabled"]
+        self.path = cfg["path"]
+        self.max_bytes = cfg["max_bytes"]
+        # Longest prefix first so "/closed-positions" never falls through to a shorter rule
+        self._ttls = sorted(cfg["ttl_seconds"].items(), key=lambda kv: len(kv[0]), reverse=True)
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._size = 0
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, last_modified TEXT,"
+                " expires_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)")
+            self._size = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            self._db = db
+        return self._db
+
+    @staticmethod
+    def key(url: str, params: dict | None = None) -> str:
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted((str(k), str(v)) for k, v in params.items()))}"
+
+    def ttl_for(self, url: str) -> float:
+        """TTL for a URL from the longest matching path prefix (0 = not cacheable)."""
+        if not self.enabled:
+            return 0
+        path = urlsplit(url).path
+        for prefix, ttl in self._ttls:
+            if path.startswith(prefix):
+                return ttl
+        return 0
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        entry = CacheEntry(*row)
+        if entry.fresh:
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+        return entry
+
+    def put(self, key: str, body: bytes, ttl: float, etag: str | None = None, last_modified: str | None = None):
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            old = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, now + ttl, now, len(body)),
+            )
+            self._size += len(body) - (old[0] if old else 0)
+            self.stats["stored"] += 1
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def refresh(self, key: str, ttl: float):
+        """Re-arm an entry's TTL after a 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._conn().execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?", (now + ttl, now, key)
+            )
+            self.stats["revalidated"] += 1
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache is back under 90% of max_bytes."""
+        target = int(self.max_bytes * 0.9)
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC").fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._size <= target:
+                break
+            doomed.append((key,))
+            self._size -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.stats["evicted"] += len(doomed)
+        log("debug", f"Evicted {len(doomed)} cached responses ({self._size / 1e6:.0f}MB kept)", source="response_cache")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,139 @@
+"""Typed decoders for Polymarket payloads.
+
+Responses decode straight from bytes into msgspec Structs — no intermediate
+dicts, no second pass of .get()/float(). Decoding is lax (strict=False) so
+numeric strings such as Gamma's "volume": "1234.5" or CLOB book levels coerce
+to float. Records hold only scalars and are created with gc=False, which keeps
+10k-row pages out of the cyclic garbage collector.
+
+If one row in a page has an unexpected shape, the page falls back to generic
+decoding and the bad rows are dropped individually, matching the old
+per-row `except (ValueError, TypeError): continue` behaviour.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import TypeVar
+
+import msgspec
+
+T = TypeVar("T")
+
+
+class Trade(msgspec.Struct, rename="camel", omit_defaults=True, gc=False):
+    """A single trade on Polymarket (Data API /trades)."""
+    side: str = ""             # BUY or SELL
+    size: float = 0.0          # token amount
+    price: float = 0.0         # price per token in USDC
+    timestamp: int = 0         # unix timestamp
+    condition_id: str = ""     # market condition ID
+    title: str = ""
+    outcome: str = ""          # YES or NO
+    asset: str = ""            # token ID
+    transaction_hash: str = ""
+    market: str = ""           # older payloads carry the condition ID here
+
+    def __post_init__(self):
+        if not self.condition_id:
+            self.condition_id = self.market
+
+    @property
+    def notional(self) -> float:
+        return self.size * self.price
+
+    @property
+    def dt(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
+
+
+class Position(msgspec.Struct, rename="camel", omit_defaults=True, gc=False):
+    """A trader's position in a market (Data API /positions and /closed-positions)."""
+    condition_id: str = ""
+    title: str = ""
+    outcome: str = ""                                         # YES or NO
+    size: float = 0.0                                         # tokens held
+    avg_price: float = 0.0                                    # average entry price
+    current_price: float = msgspec.field(default=-1.0, name="curPrice")  # current market price
+    initial_value: float = 0.0                                # USDC spent to enter
+    current_value: float = 0.0                                # current mark-to-market
+    cash_pnl: float = 0.0                                     # realized + unrealized PnL
+    pct_pnl: float = msgspec.field(default=0.0, name="percentPnl")       # percentage PnL
+    is_closed: bool = False
+    realized_pnl: float = 0.0
+    timestamp: int = 0                                        # closed positions: when it resolved
+    market: str = ""
+    price: float = 0.0                                        # closed positions report the exit price here
+
+    def __post_init__(self):
+        if not self.condition_id:
+            self.condition_id = self.market
+        if self.current_price < 0:
+            self.current_price = self.price
+
+
+class MarketRecord(msgspec.Struct, rename="camel", gc=False):
+    """The Gamma /markets fields MarketScanner reads."""
+    slug: str = ""
+    question: str = ""
+    condition_id: str = ""
+    clob_token_ids: str | None = None    # JSON-encoded list
+    outcome_prices: str | None = None    # JSON-encoded list
+    end_date: str | None = None
+    volume: float = 0.0
+    liquidity: float = 0.0
+    category: str | None = "other"
+    description: str | None = ""
+
+
+class BookLevel(msgspec.Struct, gc=False):
+    price: float
+    size: float
+
+
+class OrderBook(msgspec.Struct):
+    """CLOB /book response."""
+    market: str = ""
+    asset_id: str = ""
+    bids: list[BookLevel] = []
+    asks: list[BookLevel] = []
+    timestamp: str = ""
+    hash: str = ""
+
+
+_decoders: dict[type, msgspec.json.Decoder] = {}
+_generic = msgspec.json.Decoder()
+
+
+def decoder(type_: type) -> msgspec.json.Decoder:
+    """Cached lax JSON decoder for a type (decoders are expensive to build)."""
+    dec = _decoders.get(type_)
+    if dec is None:
+        dec = _decoders[type_] = msgspec.json.Decoder(type_, strict=False)
+    return dec
+
+
+def decode_list(content: bytes | str, record: type[T]) -> list[T]:
+    """Decode a JSON array of records; malformed rows are skipped instead of failing the page."""
+    try:
+        return decoder(list[record]).decode(content)
+    except msgspec.ValidationError:
+        pass
+    rows = _generic.decode(content)
+    if not isinstance(rows, list):
+        return []
+    out = []
+    for row in rows:
+        try:
+            out.append(msgspec.convert(row, record, strict=False))
+        except msgspec.ValidationError:
+            continue
+    return out
+
+
+def decode(content: bytes | str, type_: type[T]) -> T:
+    """Decode a single JSON document into type_ (raises msgspec.ValidationError on mismatch)."""
+    return decoder(type_).decode(content)
+
+
+def encode(obj) -> bytes:
+    return msgspec.json.encode(obj)